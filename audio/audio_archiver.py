@@ -0,0 +1,220 @@
+"""
+录音归档
+
+把采集到的int16音频写入分段的WAV文件，字幕条目记录对应音频在归档中的采样位置，
+有争议的通联可以按字幕取回原始音频。
+
+命令行用法（从JSONL字幕中取出第12条字幕的音频）:
+    python -m audio.audio_archiver Subtitles/subtitle_20240101_120000.jsonl 12 cue12.wav
+"""
+import os
+import sys
+import json
+import wave
+import queue
+import argparse
+import datetime
+import threading
+
+# 默认的归档目录
+DEFAULT_ARCHIVE_DIR = "Recordings"
+
+# int16采样的字节数
+SAMPLE_WIDTH = 2
+
+
+class AudioArchiver:
+    """
+    录音归档器
+
+    采集线程调用 write 交出每块音频，立即得到这块音频在归档中的采样位置，写文件在后台线程中进行。
+    归档按固定的帧数分成多个WAV文件（audio_YYYYmmdd_HHMMSS_000.wav、_001.wav ...），
+    采样位置可以直接换算为文件和文件内的位置，读取一段音频时只需要seek，不需要读取整个文件。
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR, sample_rate=16000, channels=1, file_seconds=600):
+        """
+        参数:
+            directory (str): 归档目录
+            sample_rate (int): 采样率
+            channels (int): 通道数
+            file_seconds (int): 每个WAV文件的时长（秒）
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.part_frames = max(1, int(file_seconds * sample_rate))
+        # 归档路径（不含分段序号和扩展名），start时确定
+        self.base_path = None
+        # 已经交给归档器的帧数，即下一块音频的采样位置
+        self.position = 0
+        self.queue = queue.Queue()
+        self.thread = None
+
+    def start(self):
+        """
+        开始新的归档
+
+        返回:
+            str: 归档路径（不含分段序号和扩展名）
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.base_path = os.path.join(self.directory, f"audio_{timestamp}")
+        self.position = 0
+        # 读取时需要的音频格式和分段大小
+        with open(self.base_path + ".json", 'w', encoding='utf-8') as f:
+            json.dump({
+                "sample_rate": self.sample_rate,
+                "channels": self.channels,
+                "sample_width": SAMPLE_WIDTH,
+                "part_frames": self.part_frames,
+            }, f)
+        self.thread = threading.Thread(target=self._run, name="audio_archiver", daemon=True)
+        self.thread.start()
+        print(f"开始录音归档: {self.base_path}")
+        return self.base_path
+
+    def write(self, data):
+        """
+        追加一块音频，不等待写入文件
+
+        参数:
+            data (bytes): int16音频数据
+
+        返回:
+            int: 这块音频第一帧的采样位置
+        """
+        position = self.position
+        self.position += len(data) // (SAMPLE_WIDTH * self.channels)
+        self.queue.put(data)
+        return position
+
+    def stop(self):
+        """写入所有已提交的音频并关闭文件"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        print(f"录音归档已保存: {self.base_path}，共 {self.position / self.sample_rate:.1f} 秒")
+
+    def _run(self):
+        """写入线程：按顺序把音频写入分段文件"""
+        frame_bytes = SAMPLE_WIDTH * self.channels
+        part = -1
+        part_file = None
+        part_frames = 0
+        try:
+            while True:
+                data = self.queue.get()
+                if data is None:
+                    break
+                try:
+                    offset = 0
+                    while offset < len(data):
+                        if part_file is None or part_frames >= self.part_frames:
+                            if part_file is not None:
+                                part_file.close()
+                            part += 1
+                            part_file = wave.open(get_part_path(self.base_path, part), 'wb')
+                            part_file.setnchannels(self.channels)
+                            part_file.setsampwidth(SAMPLE_WIDTH)
+                            part_file.setframerate(self.sample_rate)
+                            part_frames = 0
+                        take = min(self.part_frames - part_frames, (len(data) - offset) // frame_bytes)
+                        if take <= 0:
+                            break
+                        part_file.writeframes(data[offset:offset + take * frame_bytes])
+                        part_frames += take
+                        offset += take * frame_bytes
+                except Exception as e:
+                    print(f"写入录音归档时出错: {str(e)}")
+        finally:
+            if part_file is not None:
+                part_file.close()
+
+
+def get_part_path(base_path, part):
+    """归档中第part个WAV文件的路径"""
+    return f"{base_path}_{part:03d}.wav"
+
+
+def read_archived_audio(base_path, offset, frames):
+    """
+    按采样位置读取归档中的一段音频
+
+    参数:
+        base_path (str): 归档路径（不含分段序号和扩展名）
+        offset (int): 第一帧的采样位置
+        frames (int): 帧数
+
+    返回:
+        tuple: (int16音频数据 bytes, 音频格式 dict)
+    """
+    with open(base_path + ".json", 'r', encoding='utf-8') as f:
+        audio_format = json.load(f)
+    part_frames = audio_format["part_frames"]
+    chunks = []
+    while frames > 0:
+        part, part_offset = divmod(offset, part_frames)
+        take = min(frames, part_frames - part_offset)
+        part_path = get_part_path(base_path, part)
+        # 请求的范围超出了归档末尾
+        if not os.path.exists(part_path):
+            break
+        with wave.open(part_path, 'rb') as part_file:
+            part_file.setpos(part_offset)
+            chunk = part_file.readframes(take)
+        chunks.append(chunk)
+        # 归档的最后一个文件可能比请求的短
+        if len(chunk) < take * audio_format["sample_width"] * audio_format["channels"]:
+            break
+        offset += take
+        frames -= take
+    return b"".join(chunks), audio_format
+
+
+def extract_audio(base_path, offset, frames, output_path):
+    """
+    把归档中的一段音频保存为WAV文件
+
+    参数:
+        base_path (str): 归档路径
+        offset (int): 第一帧的采样位置
+        frames (int): 帧数
+        output_path (str): 输出的WAV文件路径
+
+    返回:
+        float: 保存的音频时长（秒）
+    """
+    data, audio_format = read_archived_audio(base_path, offset, frames)
+    with wave.open(output_path, 'wb') as output:
+        output.setnchannels(audio_format["channels"])
+        output.setsampwidth(audio_format["sample_width"])
+        output.setframerate(audio_format["sample_rate"])
+        output.writeframes(data)
+    return len(data) / (audio_format["sample_width"] * audio_format["channels"] * audio_format["sample_rate"])
+
+
+def main(argv=None):
+    """命令行入口：按JSONL字幕的序号取出对应的音频"""
+    parser = argparse.ArgumentParser(description="从录音归档中取出字幕对应的音频")
+    parser.add_argument("subtitle", help="JSONL字幕文件")
+    parser.add_argument("index", type=int, help="字幕序号")
+    parser.add_argument("output", help="输出的WAV文件")
+    args = parser.parse_args(argv)
+
+    with open(args.subtitle, 'r', encoding='utf-8') as f:
+        record = next((record for record in map(json.loads, f) if record["index"] == args.index), None)
+    if record is None or record.get("audio_file") is None:
+        print(f"第 {args.index} 条字幕没有归档的音频")
+        return 1
+    seconds = extract_audio(record["audio_file"], record["audio_offset"], record["audio_samples"], args.output)
+    print(f"已保存 {seconds:.2f} 秒音频到 {args.output}: {record['original']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
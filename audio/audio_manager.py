@@ -2,6 +2,7 @@ import os
 import time
 import threading
 import queue
+import itertools
 import numpy as np
 import whisper
 import sounddevice as sd
@@ -10,13 +11,12 @@ from pydub import AudioSegment
 from collections import deque, namedtuple
 import logging
 from translation.subtitle_file_manager import SubtitleFileManager
+from translation.subtitle_index import SubtitleIndex
 import torch
 from audio.audio_processor import AudioProcessor
+from audio.audio_archiver import AudioArchiver
 from config import config  # 添加 config 导入
 
-# 添加UI线程分离的队列
-ui_update_queue = queue.Queue()
-
 # 调试开关，控制是否输出调试信息到控制台
 DEBUG_MODE = True
 
@@ -36,7 +36,8 @@ file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 
 # 用于存储识别结果和时间信息的数据结构
-RecognitionResult = namedtuple('RecognitionResult', ['text', 'language', 'delay_ms'])
+# segment_id 是采集音频时分配的识别分段ID，译文、字幕显示和字幕文件都通过它对应到这条识别结果
+RecognitionResult = namedtuple('RecognitionResult', ['text', 'language', 'delay_ms', 'segment_id'])
 
 # 添加语音活动检测相关常量
 SILENCE_THRESHOLD = 0.01  # 静音阈值
@@ -52,6 +53,10 @@ class AudioManager:
         self.audio_queue = queue.Queue()
         self.text_queue = deque(maxlen=5)  # 保存最近5条识别的文本
         self.result_queue = deque(maxlen=5)  # 保存最近5条识别结果（含延迟信息）
+        self.segment_counter = itertools.count(1)  # 识别分段ID，每个提交识别的音频段分配一个
+        self.result_listeners = []  # 识别结果监听器，新结果产生时在识别回调线程中调用
+        self.audio_archiver = None  # 录音归档器，启用录音归档时创建
+        self.segment_audio = {}  # 识别分段在录音归档中的位置 {分段ID: (归档路径, 采样位置, 帧数)}
         self.recording_thread = None
         self.recognition_thread = None
         self.playback_thread = None  # 新增：专门用于音频播放的线程
@@ -83,7 +88,14 @@ class AudioManager:
         self.record_seconds = 3  # 每次处理3秒的音频
         
         # 字幕文件管理器
-        self.subtitle_manager = SubtitleFileManager()
+        self.subtitle_manager = SubtitleFileManager(
+            config.get("subtitle_formats", ["srt"]),
+            self._open_subtitle_index(),
+            max_file_bytes=int(config.get("subtitle_max_file_mb", 0) * 1024 * 1024),
+            max_file_seconds=config.get("subtitle_max_file_minutes", 0) * 60,
+            compression=config.get("subtitle_compression", "none"),
+            translation_wait_seconds=config.get("subtitle_translation_wait_ms", 15000) / 1000.0
+        )
         
         # 音频延迟缓冲区
         self.audio_delay_enabled = False
@@ -96,10 +108,6 @@ class AudioManager:
         # 初始化 PyAudio
         self._init_pyaudio()
         
-        # 添加UI更新标志和时间控制
-        self.last_ui_update_time = time.time()
-        self.ui_update_interval = 0.1  # 100ms更新一次UI
-        
         # 添加语音活动检测相关变量
         self.current_segment = []
         self.last_voice_time = time.time()
@@ -392,6 +400,20 @@ class AudioManager:
         # 启动字幕记录
         self.subtitle_manager.start_recording()
         
+        # 启动录音归档（可选），字幕条目记录对应音频在归档中的位置
+        self.segment_audio = {}
+        if config.get("audio_archive_enabled", False):
+            try:
+                self.audio_archiver = AudioArchiver(
+                    sample_rate=self.sample_rate,
+                    channels=self.channels,
+                    file_seconds=config.get("audio_archive_file_minutes", 10) * 60
+                )
+                self.audio_archiver.start()
+            except Exception as e:
+                print(f"启动录音归档失败: {str(e)}")
+                self.audio_archiver = None
+        
         # 启动录音线程 - 只负责录制音频并送入队列
         self.recording_thread = threading.Thread(target=self._record_audio)
         self.recording_thread.daemon = True
@@ -435,6 +457,11 @@ class AudioManager:
                 except Exception as e:
                     print(f"等待线程结束时出错: {str(e)}")
         
+        # 写完已采集的音频并关闭录音归档
+        if self.audio_archiver:
+            self.audio_archiver.stop()
+            self.audio_archiver = None
+        
         # 确保音频处理器的线程池停止
         if hasattr(self.audio_processor, 'thread_pool'):
             try:
@@ -538,6 +565,11 @@ class AudioManager:
                     # 检查是否为信号报告的数字单词序列
                     audio_array = np.frombuffer(audio_data, dtype=np.int16)
                     
+                    # 写入录音归档，记录这块音频结束时的采样位置
+                    archiver = self.audio_archiver
+                    if archiver:
+                        archive_end = archiver.write(audio_data) + len(audio_array) // self.channels
+                    
                     # 检查音频音量是否超过阈值
                     current_volume = np.max(np.abs(audio_array))
                     
@@ -620,7 +652,12 @@ class AudioManager:
                                 # 队列大小限制，避免堆积太多待处理任务
                                 if self.audio_queue.qsize() < 5:  # 增加允许的待处理任务数量
                                     print(f"提交音频段到识别队列: 长度={audio_length_sec:.2f}秒, 队列大小={self.audio_queue.qsize()}, 最大音量={audio_max_volume:.4f}")
-                                    self.audio_queue.put((recognition_data, time.time()))
+                                    segment_id = next(self.segment_counter)
+                                    if archiver:
+                                        # 识别缓冲区是连续的音频，结束位置减去长度就是开始位置
+                                        frames = len(recognition_data) // self.channels
+                                        self.segment_audio[segment_id] = (archiver.base_path, archive_end - frames, frames)
+                                    self.audio_queue.put((recognition_data, time.time(), segment_id))
                                     
                                     # 重置缓冲区和状态
                                     recognition_buffer = []
@@ -804,7 +841,8 @@ class AudioManager:
                     dropped_count = 0
                     while self.audio_queue.qsize() > 2:  # 保留最新的两条，以保持连续性
                         try:
-                            self.audio_queue.get_nowait()
+                            dropped = self.audio_queue.get_nowait()
+                            self.segment_audio.pop(dropped[2], None)
                             self.audio_queue.task_done()
                             dropped_count += 1
                         except queue.Empty:
@@ -814,7 +852,7 @@ class AudioManager:
                 
                 # 尝试从队列获取音频数据和开始时间（等待最多0.5秒）
                 try:
-                    audio_data, start_time = self.audio_queue.get(timeout=0.5)
+                    audio_data, start_time, segment_id = self.audio_queue.get(timeout=0.5)
                     wait_time = time.time() - start_time
                     print(f"从队列获取到音频数据，等待时间: {wait_time:.2f}秒, 数据形状: {audio_data.shape}, 大小: {audio_data.size}, 最大值: {np.max(np.abs(audio_data)):.4f}")
                     processed_count += 1
@@ -872,6 +910,9 @@ class AudioManager:
                         try:
                             print(f"收到识别结果回调: result_id={result.get('task_id')}")
                             
+                            # 识别分段在录音归档中的位置（识别出错时也要移除）
+                            audio_span = self.segment_audio.pop(result.get("segment_id"), None)
+                            
                             # 检查是否有错误
                             if "error" in result:
                                 error_msg = f"音频识别错误: {result['error']}"
@@ -884,8 +925,9 @@ class AudioManager:
                             text = result.get("text", "")
                             detected_language = result.get("language")
                             proc_time = result.get("delay_ms", 0)
+                            segment_id = result.get("segment_id")
                             
-                            print(f"解析识别结果: text='{text[:30]}...', language={detected_language}, delay={proc_time}ms")
+                            print(f"解析识别结果: segment={segment_id}, text='{text[:30]}...', language={detected_language}, delay={proc_time}ms")
                             
                             # 保存检测到的语言代码
                             self.detected_language = detected_language
@@ -901,17 +943,25 @@ class AudioManager:
                                 
                                 # 保存识别结果 - 使用线程安全的方式
                                 try:
-                                    result_obj = RecognitionResult(text=text, language=detected_language, delay_ms=proc_time)
+                                    result_obj = RecognitionResult(text=text, language=detected_language, delay_ms=proc_time,
+                                                                   segment_id=segment_id)
                                     self.result_queue.append(result_obj)
                                     self.text_queue.append(text)
                                     print(f"已保存到文本队列，当前队列长度: {len(self.text_queue)}")
                                     
                                     # 添加到字幕管理器
-                                    self.subtitle_manager.add_subtitle(text)
+                                    metadata = {
+                                        "language": detected_language,
+                                        "recognition_delay_ms": proc_time,
+                                        "confidence": result.get("confidence")
+                                    }
+                                    if audio_span:
+                                        metadata["audio_file"], metadata["audio_offset"], metadata["audio_samples"] = audio_span
+                                    self.subtitle_manager.add_subtitle(text, metadata=metadata, segment_id=segment_id)
                                     print(f"已添加到字幕管理器")
                                     
-                                    # 将UI更新任务放入UI更新队列，不直接在这里更新
-                                    ui_update_queue.put(("text_update", text))
+                                    # 通知界面有新的识别结果，不直接在这里更新
+                                    self._notify_result_listeners(result_obj)
                                     
                                     # 记录日志
                                     if DEBUG_MODE:
@@ -931,7 +981,7 @@ class AudioManager:
                     
                     # 直接使用新的接口，传递回调函数
                     # 不再需要事先设置全局回调
-                    task_id = self.audio_processor.process_audio_async(audio_np, on_recognition_complete)
+                    task_id = self.audio_processor.process_audio_async(audio_np, on_recognition_complete, segment_id)
                     if DEBUG_MODE:
                         print(f"提交异步处理任务，ID: {task_id}")
                 
@@ -978,6 +1028,54 @@ class AudioManager:
         latest_text = self.text_queue[-1]
         print(f"从文本队列获取最新文本: '{latest_text[:30]}...'")
         return latest_text
+    
+    def get_latest_result(self):
+        """
+        获取最新的识别结果
+        
+        返回:
+            RecognitionResult: 识别结果（包含识别分段ID），没有结果时返回None
+        """
+        try:
+            return self.result_queue[-1]
+        except IndexError:
+            return None
+        
+    def add_result_listener(self, listener):
+        """
+        注册识别结果监听器
+        
+        监听器在识别回调线程中被调用，参数为 RecognitionResult，不能直接操作界面，
+        应尽快返回（例如只发出排队的Qt信号）。
+        
+        参数:
+            listener (callable): 监听函数 listener(result)
+        """
+        if listener not in self.result_listeners:
+            self.result_listeners.append(listener)
+    
+    def remove_result_listener(self, listener):
+        """取消注册识别结果监听器"""
+        if listener in self.result_listeners:
+            self.result_listeners.remove(listener)
+    
+    def _notify_result_listeners(self, result):
+        """把新的识别结果交给所有监听器，单个监听器出错不影响其他监听器"""
+        for listener in list(self.result_listeners):
+            try:
+                listener(result)
+            except Exception as e:
+                print(f"通知识别结果监听器时出错: {str(e)}")
+    
+    def _open_subtitle_index(self):
+        """打开字幕全文索引，未启用或打开失败时返回None（不影响字幕文件的保存）"""
+        if not config.get("subtitle_index_enabled", True):
+            return None
+        try:
+            return SubtitleIndex()
+        except Exception as e:
+            print(f"打开字幕索引失败: {str(e)}")
+            return None
         
     def get_detected_language(self):
         """获取检测到的语言代码"""
@@ -987,25 +1085,23 @@ class AudioManager:
         """获取语音识别的延迟（毫秒）"""
         return self.recognition_delay
 
-    def add_translated_text(self, original_text, translated_text):
+    def add_translated_text(self, segment_ids, translated_text, extra_translations=None, translation_delay_ms=None,
+                            continued=False):
         """
-        添加翻译后的文本到字幕管理器
+        将译文保存到识别分段对应的字幕
         
         参数:
-            original_text (str): 原始文本
+            segment_ids (list): 译文所属的识别分段ID（RecognitionResult.segment_id），
+                                句子由多个识别分段拼成时，译文保存到最后一个分段的字幕
             translated_text (str): 翻译后的文本
+            extra_translations (dict): 其他目标语言的译文 {语言代码: 译文}
+            translation_delay_ms (int): 翻译延迟（毫秒），保存到字幕的识别信息中
+            continued (bool): 最后一个分段的剩余部分还在句子缓冲区中，下一个句子的译文会追加到同一条字幕
         """
-        if self.is_running and translated_text and original_text:
-            # 检查原文是否匹配当前最新文本
-            latest_text = self.get_latest_text()
-            if latest_text and original_text == latest_text:
-                self.subtitle_manager.add_subtitle(original_text, translated_text)
-            else:
-                # 如果不是最新文本，尝试查找匹配的原文进行更新
-                for i in range(len(self.text_queue)):
-                    if self.text_queue[i] == original_text:
-                        self.subtitle_manager.add_subtitle(original_text, translated_text)
-                        break
+        if self.is_running and translated_text:
+            metadata = {"translation_delay_ms": translation_delay_ms} if translation_delay_ms is not None else None
+            self.subtitle_manager.update_sentence_translation(segment_ids, translated_text, extra_translations,
+                                                              metadata, continued)
             
     def is_subtitle_recording(self):
         """检查是否正在记录字幕"""
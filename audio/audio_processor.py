@@ -5,8 +5,25 @@ from config import config
 import threading
 import queue
 import time
+import math
 from concurrent.futures import ThreadPoolExecutor, Future
 
+def estimate_confidence(result):
+    """
+    根据Whisper各分段的平均对数概率估计识别置信度
+    
+    参数:
+        result (dict): model.transcribe 的结果
+        
+    返回:
+        float: 0-1之间的置信度，没有分段信息时返回None
+    """
+    segments = [segment for segment in result.get("segments") or [] if "avg_logprob" in segment]
+    if not segments:
+        return None
+    avg_logprob = sum(segment["avg_logprob"] for segment in segments) / len(segments)
+    return round(min(1.0, math.exp(avg_logprob)), 3)
+
 class WhisperThreadPool:
     """Whisper模型线程池，用于在后台线程中处理音频识别任务"""
     
@@ -26,6 +43,7 @@ class WhisperThreadPool:
         self.task_count = 0
         self.futures = {}  # 存储任务ID到Future的映射
         self.callbacks = {}  # 存储任务ID到回调函数的映射
+        self.segment_ids = {}  # 存储任务ID到识别分段ID的映射，结果中带回分段ID
     
     def start(self):
         """启动线程池工作线程"""
@@ -73,6 +91,7 @@ class WhisperThreadPool:
         
         # 清空回调和任务映射
         self.callbacks.clear()
+        self.segment_ids.clear()
         self.futures.clear()
     
     def _process_tasks(self):
@@ -95,7 +114,7 @@ class WhisperThreadPool:
                     continue
                 
                 # 提取任务信息
-                audio_data, processor, task_id, source_language, callback = task
+                audio_data, processor, task_id, source_language, callback, segment_id = task
                 
                 try:
                     # 提交任务到线程池执行，但不等待结果
@@ -109,6 +128,7 @@ class WhisperThreadPool:
                     
                     # 存储Future对象和回调函数
                     self.futures[task_id] = future
+                    self.segment_ids[task_id] = segment_id
                     if callback:
                         self.callbacks[task_id] = callback
                         print(f"已为任务 {task_id} 设置回调函数")
@@ -168,6 +188,8 @@ class WhisperThreadPool:
                     
                     # 使用对应任务的回调函数处理结果
                     callback = self.callbacks.get(task_id) or self.result_callback
+                    if result:
+                        result["segment_id"] = self.segment_ids.get(task_id)
                     if callback and result:
                         print(f"调用回调函数处理任务 {task_id} 的结果")
                         callback(result)
@@ -201,7 +223,8 @@ class WhisperThreadPool:
                         # 创建错误结果
                         error_result = {
                             "error": "任务运行超时",
-                            "task_id": task_id
+                            "task_id": task_id,
+                            "segment_id": self.segment_ids.get(task_id)
                         }
                         
                         # 调用回调通知
@@ -224,8 +247,9 @@ class WhisperThreadPool:
         # 移除已完成的任务
         for task_id in completed_tasks:
             self.futures.pop(task_id, None)
-            # 同时移除回调映射
+            # 同时移除回调和分段ID映射
             self.callbacks.pop(task_id, None)
+            self.segment_ids.pop(task_id, None)
         
         # 报告已完成的任务数
         if completed_tasks:
@@ -301,6 +325,7 @@ class WhisperThreadPool:
                 "text": text,
                 "language": detected_lang,
                 "delay_ms": proc_time,
+                "confidence": estimate_confidence(result),
                 "task_id": task_id
             }
             
@@ -313,7 +338,7 @@ class WhisperThreadPool:
                 "task_id": task_id
             }
     
-    def process_audio(self, audio_data, processor, source_language="auto", callback=None):
+    def process_audio(self, audio_data, processor, source_language="auto", callback=None, segment_id=None):
         """将音频处理任务提交到线程池
         
         参数:
@@ -321,6 +346,7 @@ class WhisperThreadPool:
             processor (AudioProcessor): 音频处理器实例
             source_language (str): 源语言
             callback (function): 针对此任务的回调函数
+            segment_id (int): 识别分段ID，随识别结果返回
             
         返回:
             str: 任务ID
@@ -349,7 +375,7 @@ class WhisperThreadPool:
                 print(f"警告: 音频任务 {task_id} 似乎是静音或信号很弱")
         
         # 提交任务到队列，包含回调函数
-        self.task_queue.put((audio_data, processor, task_id, source_language, callback))
+        self.task_queue.put((audio_data, processor, task_id, source_language, callback, segment_id))
         
         print(f"已将任务 {task_id} 提交到队列，当前队列大小: {self.task_queue.qsize()}")
         return task_id
@@ -379,8 +405,11 @@ class AudioProcessor:
     def __init__(self):
         self.model = None
         self.current_model_name = None
+        # 配置快照，配置变化时整体替换，识别线程读取时不查询配置字典
+        self.settings = config.snapshot()
+        config.subscribe(self._on_config_changed)
         # 检查CUDA是否可用
-        self.device = "cuda" if config.get("use_gpu", True) and torch.cuda.is_available() else "cpu"
+        self.device = "cuda" if self.settings.use_gpu and torch.cuda.is_available() else "cpu"
         print(f"使用设备: {self.device}")
         if self.device == "cuda":
             # 打印GPU信息
@@ -393,15 +422,20 @@ class AudioProcessor:
         self.thread_pool.start()
         print("AudioProcessor初始化完成，Whisper线程池已启动")
     
+    def _on_config_changed(self, settings):
+        """配置变化时替换配置快照"""
+        self.settings = settings
+    
     def get_model(self):
         """获取当前配置的模型，如果需要则加载"""
         try:
-            model_name = config.get("whisper_model", "base")
+            settings = self.settings
+            model_name = settings.whisper_model
             # 检查是否需要重新加载模型
             need_reload = (self.model is None or self.current_model_name != model_name)
             
             # 检查设备选择
-            desired_device = config.get("device", "cuda" if config.get("use_gpu", True) else "cpu")
+            desired_device = settings.device
             device_changed = hasattr(self, 'device') and self.device != desired_device
             
             if need_reload or device_changed:
@@ -475,7 +509,7 @@ class AudioProcessor:
         """
         try:
             # 获取源语言设置
-            source_language = config.get("source_language", "auto")
+            source_language = self.settings.source_language
             
             # 打印源语言设置
             print(f"当前源语言设置: {source_language}")
@@ -532,7 +566,7 @@ class AudioProcessor:
                 print(f"音频信号强度 RMS = {rms:.6f}")
             
             # 记录音频数据的统计信息，但仅在启用时显示
-            if config.get("show_audio_stats", False):
+            if self.settings.show_audio_stats:
                 print(f"音频数据统计: 类型={audio_data.dtype}, 形状={audio_data.shape}, 最小值={np.min(audio_data)}, 最大值={np.max(audio_data)}")
             
             # 总是打印处理后的音频信息
@@ -608,25 +642,27 @@ class AudioProcessor:
             return {
                 "text": transcribed_text,
                 "language": detected_language,
-                "delay_ms": proc_time
+                "delay_ms": proc_time,
+                "confidence": estimate_confidence(result)
             }
             
         except Exception as e:
             print(f"处理音频数据时出错: {str(e)}")
             return {"error": str(e)}
     
-    def process_audio_async(self, audio_data, callback=None):
+    def process_audio_async(self, audio_data, callback=None, segment_id=None):
         """异步处理音频数据，不阻塞调用线程
         
         参数:
             audio_data (np.ndarray): 音频数据
             callback (function): 可选的回调函数，处理完成后调用
+            segment_id (int): 识别分段ID，回调收到的结果中包含 "segment_id"
             
         返回:
             str: 任务ID
         """
         # 获取源语言设置
-        source_language = config.get("source_language", "auto")
+        source_language = self.settings.source_language
         
         # 预处理音频数据
         try:
@@ -657,7 +693,8 @@ class AudioProcessor:
                         "error": "音频信号太弱，无法识别",
                         "text": "",
                         "language": None,
-                        "delay_ms": 0
+                        "delay_ms": 0,
+                        "segment_id": segment_id
                     })
                 return None
             
@@ -684,7 +721,7 @@ class AudioProcessor:
         except Exception as e:
             print(f"预处理音频数据时出错: {str(e)}")
             if callback:
-                callback({"error": str(e)})
+                callback({"error": str(e), "segment_id": segment_id})
             return None
         
         # 记录回调函数信息
@@ -698,7 +735,8 @@ class AudioProcessor:
             audio_data, 
             self, 
             source_language, 
-            callback  # 直接传递回调函数
+            callback,  # 直接传递回调函数
+            segment_id
         )
         
         print(f"已提交异步任务: {task_id}, 回调函数: {'已设置' if callback else '未设置'}")
@@ -715,6 +753,7 @@ class AudioProcessor:
     
     def cleanup(self):
         """清理资源"""
+        config.unsubscribe(self._on_config_changed)
         if hasattr(self, 'thread_pool'):
             self.thread_pool.stop()
         # 释放模型
@@ -0,0 +1,89 @@
+"""
+术语匹配性能测试：比较逐个术语正则匹配（旧方法）与Aho-Corasick单次扫描（新方法）
+
+用法:
+    python benchmark_term_matcher.py
+"""
+import random
+import re
+import string
+import time
+from translation.term_matcher import AhoCorasickMatcher
+
+SAMPLE_TEXT = ("CQ CQ this is BG7YYK calling, QRZ? Roger, your signal is 59, QSL via the bureau. "
+               "QTH is Shenzhen, rig is running QRP today. 73 and good DX, over.")
+
+def legacy_preprocess(text, terms, lang_code):
+    """旧的预处理方法：逐个术语构建正则、search后再sub"""
+    replacements = {}
+    processed_text = text
+    for term, translations in terms.items():
+        if lang_code in translations:
+            translation = translations[lang_code]
+            pattern = r'\b' + re.escape(term) + r'\b'
+            if re.search(pattern, processed_text, re.IGNORECASE):
+                placeholder = f"__TERM_{len(replacements)}__"
+                replacements[placeholder] = translation
+                processed_text = re.sub(pattern, placeholder, processed_text, flags=re.IGNORECASE)
+    return processed_text, replacements
+
+def matcher_preprocess(text, terms, lang_code, matcher):
+    """新的预处理方法：一次扫描完成匹配和替换"""
+    replacements = {}
+    placeholders = {}
+
+    def replace_term(term, matched_text):
+        placeholder = placeholders.get(term)
+        if placeholder is None:
+            placeholder = f"__TERM_{len(replacements)}__"
+            placeholders[term] = placeholder
+            replacements[placeholder] = terms[term][lang_code]
+        return placeholder
+
+    return matcher.replace(text, replace_term), replacements
+
+def make_terms(count, seed=0):
+    """生成测试术语：真实的常用术语加随机生成的呼号和词语"""
+    rng = random.Random(seed)
+    terms = {term: {"zh-cn": f"{term}（译文）"} for term in
+             ["CQ", "QRZ", "73", "ROGER", "QSL", "QTH", "QRP", "DX", "OVER"]}
+    while len(terms) < count:
+        length = rng.randint(3, 8)
+        term = ''.join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(length))
+        terms[term] = {"zh-cn": f"{term}（译文）"}
+    return dict(list(terms.items())[:count])
+
+def bench(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def main():
+    print(f"测试文本: {SAMPLE_TEXT}\n")
+    print(f"{'术语数':>8} | {'旧方法(ms/次)':>14} | {'构建自动机(ms)':>14} | {'新方法(ms/次)':>14} | {'加速比':>8}")
+    print("-" * 72)
+    for count in (50, 5000, 100000):
+        terms = make_terms(count)
+        legacy_repeat = 50 if count <= 50 else (3 if count <= 5000 else 1)
+
+        legacy_ms, legacy_result = bench(lambda: legacy_preprocess(SAMPLE_TEXT, terms, "zh-cn"), legacy_repeat)
+
+        build_start = time.perf_counter()
+        matcher = AhoCorasickMatcher(terms.keys())
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        new_ms, new_result = bench(lambda: matcher_preprocess(SAMPLE_TEXT, terms, "zh-cn", matcher), 200)
+
+        # 占位符编号顺序可能不同，比较还原后的结果
+        def restore(result):
+            text, replacements = result
+            for placeholder, translation in replacements.items():
+                text = text.replace(placeholder, translation)
+            return text
+        assert restore(legacy_result) == restore(new_result), "新旧方法结果不一致"
+
+        print(f"{count:>8} | {legacy_ms:>14.3f} | {build_ms:>14.1f} | {new_ms:>14.3f} | {legacy_ms / new_ms:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+大型术语库加载测试：比较解析JSON并构建内存索引（普通后端）与映射编译好的紧凑术语库（紧凑后端）
+
+每种情况在单独的子进程中运行，分别报告加载耗时和加载后增加的常驻内存（RSS）。
+
+用法:
+    python benchmark_term_store.py [术语数量]
+"""
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+
+SAMPLE_TEXT = ("CQ CQ this is BG7YYK calling, QRZ? Roger, your signal is 59, QSL via the bureau. "
+               "QTH is Shenzhen, rig is running QRP today. 73 and good DX, over.")
+
+def make_terms(count, seed=0):
+    """生成测试术语：常用术语加随机呼号（模拟俱乐部名单、比赛交换信息）"""
+    rng = random.Random(seed)
+    terms = {term: {"zh-cn": f"{term}（译文）", "en": term} for term in
+             ["CQ", "QRZ", "73", "ROGER", "QSL", "QTH", "QRP", "DX", "OVER"]}
+    while len(terms) < count:
+        callsign = (rng.choice(["B", "W", "K", "JA", "DL", "VK"]) + rng.choice(string.ascii_uppercase)
+                    + str(rng.randint(0, 9)) + ''.join(rng.choice(string.ascii_uppercase) for _ in range(3)))
+        terms[callsign] = {"zh-cn": f"{callsign}（会员）", "en": f"{callsign} (member)"}
+    return terms
+
+def run_case(work_dir, mode):
+    """在子进程中加载术语并输出统计信息"""
+    code = f"""
+import json, os, sys, time
+sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+os.chdir({work_dir!r})
+import translation.term_manager as tm_module
+from translation.term_store import get_rss_bytes
+if {mode!r} == 'dict':
+    tm_module.COMPACT_STORE_MIN_TERMS = float('inf')
+rss_before = get_rss_bytes()
+start = time.perf_counter()
+manager = tm_module.TermManager()
+load_ms = (time.perf_counter() - start) * 1000
+manager.preprocess_ham_radio_terms({SAMPLE_TEXT!r}, 'zh-cn')
+start = time.perf_counter()
+for _ in range(100):
+    manager.preprocess_ham_radio_terms({SAMPLE_TEXT!r}, 'zh-cn')
+query_ms = (time.perf_counter() - start) * 10
+stats = manager.get_load_stats()
+print(json.dumps({{"backend": stats["backend"], "terms": stats["terms"], "load_ms": load_ms,
+                  "rss_mb": (get_rss_bytes() - rss_before) / 1024 / 1024, "query_ms": query_ms}}))
+"""
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as work_dir:
+        resource_dir = os.path.join(work_dir, "translation", "resources")
+        os.makedirs(resource_dir)
+        with open(os.path.join(resource_dir, "ham_radio_terms.json"), 'w', encoding='utf-8') as f:
+            json.dump(make_terms(count), f, ensure_ascii=False, indent=4)
+
+        print(f"术语数: {count}\n")
+        print(f"{'情况':<16} | {'后端':>8} | {'加载(ms)':>10} | {'增加内存(MB)':>12} | {'预处理(ms/次)':>14}")
+        print("-" * 74)
+        cases = [("普通索引", 'dict'), ("编译缓存", 'compact'), ("映射已有缓存", 'compact')]
+        for name, mode in cases:
+            result = run_case(work_dir, mode)
+            print(f"{name:<16} | {result['backend']:>8} | {result['load_ms']:>10.1f} | "
+                  f"{result['rss_mb']:>12.1f} | {result['query_ms']:>14.3f}")
+
+if __name__ == "__main__":
+    main()
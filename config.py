@@ -1,40 +1,123 @@
+import copy
 import json
 import os
+import atexit
+import threading
 import traceback
+from dataclasses import dataclass, fields
+
+# 修改配置后延迟写入文件的时间（秒），这段时间内的多次修改合并为一次写入
+FLUSH_DELAY_SECONDS = 1.0
+
+# 默认设置，配置文件中缺少的设置项和配置快照的默认值都取自这里
+DEFAULT_SETTINGS = {
+    "whisper_model": "base",  # 默认使用base模型
+    "font_size": 24,          # 兼容旧版本
+    "original_font_size": 24, # 原文字体大小
+    "translation_font_size": 24, # 译文字体大小
+    "font_color": "white",     # 译文颜色
+    "original_font_color": "#FFFF99",  # 原文颜色，默认浅黄色
+    "original_font_family": "Arial",  # 原文字体类型
+    "translation_font_family": "黑体",  # 译文字体类型，默认黑体
+    "position": "bottom",
+    "use_gpu": True,  # 默认使用GPU
+    "device": "cuda",  # 默认使用CUDA
+    "source_language": "auto",  # 源语言，默认自动检测
+    "target_language": "zh",  # 目标语言，默认中文
+    "window_width": 800,  # 字幕窗口宽度
+    "window_height": 200,   # 字幕窗口高度
+    "subtitle_mode": "translated",  # 字幕显示模式：original=只显示原文，translated=只显示译文，both=同时显示
+    "input_device": "",  # 输入设备
+    "output_device": "",  # 输出设备
+    "monitor_enabled": False,  # 是否监听系统声音
+    "audio_delay_enabled": False,  # 是否启用音频延迟
+    "audio_delay_ms": 0,  # 音频延迟毫秒数
+    "main_window_width": 800,  # 主窗口宽度
+    "main_window_height": 600,   # 主窗口高度
+    "show_audio_stats": True,  # 是否显示音频数据统计信息 - 修改为默认开启
+    "translation_timeout_ms": 3000,  # 单次翻译请求的截止时间（毫秒）
+    "translation_hedge_enabled": True,  # 翻译请求慢于p95延迟时是否发出对冲请求
+    "sentence_buffer_enabled": True,  # 是否将识别片段拼接成完整句子后再翻译
+    "sentence_buffer_timeout_ms": 2500,  # 片段等待句子结束的最长时间（毫秒）
+    "extra_target_languages": [],  # 同时翻译的其他目标语言（如["日语", "英语"]），每种语言单独显示和保存
+    "term_hot_reload_enabled": True,  # 术语文件保存后是否自动重新加载
+    "term_correction_enabled": True,  # 是否纠正语音识别拆开或拼错的术语和呼号（如 "Q are Z" -> "QRZ"）
+    "known_callsigns": [],  # 术语之外的已知呼号，用于纠正识别错误的呼号
+    "subtitle_formats": ["srt"],  # 同时保存的字幕格式，可选 "srt"、"vtt"、"ass"、"jsonl"
+    "subtitle_index_enabled": True,  # 录制字幕时是否同时写入全文索引（Subtitles/subtitle_index.db）
+    "subtitle_max_file_mb": 0,  # 字幕文件达到该大小（MB）后换用新文件，0表示不限制
+    "subtitle_max_file_minutes": 0,  # 字幕文件达到该时长（分钟）后换用新文件，0表示不限制
+    "subtitle_translation_wait_ms": 15000,  # 字幕等待译文的最长时间（毫秒），超时后不带译文写入文件
+    "subtitle_compression": "none",  # 关闭的字幕文件在后台压缩：none、gzip、zstd（需要安装zstandard）
+    "audio_archive_enabled": False,  # 是否把采集的原始音频保存到 Recordings 目录，字幕记录对应的音频位置
+    "audio_archive_file_minutes": 10,  # 录音归档每个WAV文件的时长（分钟）
+}
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    识别和显示热路径使用的配置快照
+    
+    快照不可修改，配置变化时 Config 创建新的快照并通知订阅者。工作线程持有快照的引用，
+    收到通知时整体替换，每次使用时不再查询配置字典，也不会读到只更新了一半的设置。
+    """
+    whisper_model: str = DEFAULT_SETTINGS["whisper_model"]
+    device: str = DEFAULT_SETTINGS["device"]
+    use_gpu: bool = DEFAULT_SETTINGS["use_gpu"]
+    source_language: str = DEFAULT_SETTINGS["source_language"]
+    target_language: str = DEFAULT_SETTINGS["target_language"]
+    subtitle_mode: str = DEFAULT_SETTINGS["subtitle_mode"]
+    show_audio_stats: bool = DEFAULT_SETTINGS["show_audio_stats"]
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        根据配置字典创建快照
+        
+        参数:
+            settings (dict): 配置字典
+            
+        返回:
+            ConfigSnapshot: 快照
+        """
+        def get(key):
+            # 缺少的设置项使用 DEFAULT_SETTINGS 中的默认值，与 Config.get 补全的值一致
+            return settings.get(key, DEFAULT_SETTINGS[key])
+        
+        use_gpu = bool(get("use_gpu"))
+        return cls(
+            whisper_model=get("whisper_model"),
+            device=settings.get("device") or ("cuda" if use_gpu else "cpu"),
+            use_gpu=use_gpu,
+            source_language=get("source_language"),
+            target_language=get("target_language"),
+            subtitle_mode=get("subtitle_mode"),
+            show_audio_stats=bool(get("show_audio_stats")),
+        )
+
+# 快照包含的配置项，修改其他配置项时不需要重新创建快照
+SNAPSHOT_KEYS = frozenset(field.name for field in fields(ConfigSnapshot))
 
 class Config:
     def __init__(self):
-        self.config_file = "settings.json"
-        self.default_settings = {
-            "whisper_model": "base",  # 默认使用base模型
-            "font_size": 24,          # 兼容旧版本
-            "original_font_size": 24, # 原文字体大小
-            "translation_font_size": 24, # 译文字体大小
-            "font_color": "white",     # 译文颜色
-            "original_font_color": "#FFFF99",  # 原文颜色，默认浅黄色
-            "original_font_family": "Arial",  # 原文字体类型
-            "translation_font_family": "黑体",  # 译文字体类型，默认黑体
-            "position": "bottom",
-            "use_gpu": True,  # 默认使用GPU
-            "device": "cuda",  # 默认使用CUDA
-            "source_language": "auto",  # 源语言，默认自动检测
-            "target_language": "zh",  # 目标语言，默认中文
-            "window_width": 800,  # 字幕窗口宽度
-            "window_height": 200,   # 字幕窗口高度
-            "subtitle_mode": "translated",  # 字幕显示模式：original=只显示原文，translated=只显示译文，both=同时显示
-            "input_device": "",  # 输入设备
-            "output_device": "",  # 输出设备
-            "monitor_enabled": False,  # 是否监听系统声音
-            "audio_delay_enabled": False,  # 是否启用音频延迟
-            "audio_delay_ms": 0,  # 音频延迟毫秒数
-            "main_window_width": 800,  # 主窗口宽度
-            "main_window_height": 600,   # 主窗口高度
-            "show_audio_stats": True,  # 是否显示音频数据统计信息 - 修改为默认开启
-        }
+        # 创建时确定配置文件的绝对路径，之后切换工作目录也写回同一个文件
+        self.config_file = os.path.abspath("settings.json")
+        # 保护 settings 的修改和序列化；写文件使用单独的锁，写入期间不阻塞 set
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        # 是否有尚未写入文件的修改，以及等待执行的延迟写入
+        self._dirty = False
+        self._flush_timer = None
+        # 快照变化时的回调，通知按顺序进行，保证最后收到的总是最新的快照
+        self._subscribers = []
+        self._notify_lock = threading.RLock()
+        # 每个实例使用单独的副本，修改列表类型的设置不会影响默认值
+        self.default_settings = copy.deepcopy(DEFAULT_SETTINGS)
         self.settings = self.load_settings()
         
-        # 确保所有默认设置项都存在于加载的设置中
+        # 确保所有默认设置项都存在于加载的设置中（只修改内存，导入模块时不写文件）
         self.ensure_all_settings_exist()
+        self._snapshot = ConfigSnapshot.from_settings(self.settings)
 
     def load_settings(self):
         """加载配置文件"""
@@ -47,37 +130,119 @@ class Config:
         return self.default_settings.copy()
 
     def save_settings(self):
-        """保存配置到文件"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"保存配置文件时出错: {e}")
+        """
+        保存配置到文件
+        
+        先写入临时文件再替换原文件，写入过程中程序退出也不会留下不完整的配置文件。
+        多个线程同时保存时按顺序写入，文件内容总是最后一次保存时的设置。
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._flush_timer:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                content = json.dumps(self.settings, ensure_ascii=False, indent=4)
+                self._dirty = False
+            temp_file = self.config_file + ".tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.config_file)
+            except Exception as e:
+                print(f"保存配置文件时出错: {e}")
+                with self._lock:
+                    self._dirty = True
 
     def ensure_all_settings_exist(self):
-        """确保所有默认设置项都存在于当前设置中"""
-        needs_save = False
+        """
+        确保所有默认设置项都存在于当前设置中
+        
+        只补全内存中的设置，不写入文件：创建全局配置实例（导入 config 模块）时不应修改配置文件，
+        补全的设置项在下一次保存设置时一起写入。
+        """
         for key, value in self.default_settings.items():
             if key not in self.settings:
                 self.settings[key] = value
-                needs_save = True
-        
-        # 如果有缺失项，立即保存更新后的设置
-        if needs_save:
-            self.save_settings()
 
     def get(self, key, default=None):
         """获取配置项，如果不存在则返回默认值"""
+        # 单次字典读取是原子的，不需要加锁
         return self.settings.get(key, default)
 
     def set(self, key, value):
-        """设置配置项"""
-        self.settings[key] = value
-        self.save_settings()  # 立即保存到文件
+        """
+        设置配置项
+        
+        只修改内存中的设置，文件在 FLUSH_DELAY_SECONDS 秒后由后台定时器写入，
+        期间的多次修改（如拖动滑块）合并为一次写入。可以在任意线程中调用。
+        """
+        snapshot_changed = False
+        with self._lock:
+            self.settings[key] = value
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_DELAY_SECONDS, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            if key in SNAPSHOT_KEYS:
+                snapshot = ConfigSnapshot.from_settings(self.settings)
+                if snapshot != self._snapshot:
+                    self._snapshot = snapshot
+                    snapshot_changed = True
+        if snapshot_changed:
+            self._notify_subscribers()
+    
+    def snapshot(self):
+        """
+        获取当前的配置快照
+        
+        返回:
+            ConfigSnapshot: 不可修改的快照
+        """
+        return self._snapshot
+    
+    def subscribe(self, callback):
+        """
+        订阅配置快照的变化
+        
+        参数:
+            callback (callable): 签名为 (ConfigSnapshot) -> None，在修改配置的线程中调用，应只保存新的快照
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """取消订阅配置快照的变化"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def _notify_subscribers(self):
+        """把当前快照发送给所有订阅者"""
+        with self._notify_lock:
+            with self._lock:
+                snapshot = self._snapshot
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"通知配置变化时出错: {e}")
+    
+    def flush(self):
+        """如果有尚未写入文件的修改，立即写入"""
+        with self._lock:
+            if not self._dirty:
+                return
+        self.save_settings()
     
     def sync_to_file(self):
         """强制将所有设置同步到文件"""
-        self.save_settings()
+        self.flush()
 
 # 创建全局配置实例
-config = Config() 
\ No newline at end of file
+config = Config()
+# 程序退出前写入尚未保存的修改
+atexit.register(config.flush)
@@ -1,23 +1,152 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QComboBox, QLabel, QSlider, QColorDialog,
                             QGroupBox, QCheckBox, QSpinBox, QFileDialog, QMessageBox)
-from PySide6.QtCore import Qt, QTimer, Slot
+from PySide6.QtCore import Qt, QTimer, QObject, Signal, Slot
 from PySide6.QtGui import QFont, QColor
 import os
 import whisper
 import torch
 import threading
 import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from PySide6.QtWidgets import QApplication
 
 from audio.audio_manager import AudioManager
 from translation.subtitle_manager import SubtitleManager
+from translation.sentence_buffer import SentenceBuffer
 from gui.subtitle_window import SubtitleWindow
 from config import config
 
 # 调试开关，控制是否输出调试信息到控制台
 DEBUG_MODE = False
 
+class RecognitionSignals(QObject):
+    """
+    把识别线程中产生的识别结果转发到界面线程
+
+    识别线程把结果放入队列并发出信号，信号通过排队连接在界面线程中处理。
+    界面处理上一个信号之前到达的新结果只排队、不再发出信号，处理信号时一次取出全部结果：
+    每条结果都送入句子缓冲区和翻译线程，只有最新的一条用于刷新界面，信号不会在事件队列中堆积。
+    """
+    result_ready = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._pending_results = deque()
+        self._signal_pending = False
+
+    def post(self, result):
+        """
+        提交新的识别结果（在识别线程中调用）
+
+        参数:
+            result (RecognitionResult): 识别结果
+        """
+        with self._lock:
+            self._pending_results.append(result)
+            if self._signal_pending:
+                # 上一个信号还没有被处理，处理时会一起取出这条结果
+                return
+            self._signal_pending = True
+        self.result_ready.emit()
+
+    def take(self):
+        """
+        取出全部待处理的识别结果（在界面线程中调用）
+
+        返回:
+            list: 按识别顺序排列的识别结果，没有待处理的结果时为空列表
+        """
+        with self._lock:
+            results = list(self._pending_results)
+            self._pending_results.clear()
+            self._signal_pending = False
+            return results
+
+# 交给翻译线程的任务：sentence 为None时只查询 text 中的呼号，
+# segment_ids 为译文所属的全部识别分段（句子可能由多个识别分段拼成），
+# continued 表示最后一个分段的剩余部分还在句子缓冲区中
+TranslationRequest = namedtuple('TranslationRequest', ['segment_id', 'segment_ids', 'text', 'sentence',
+                                                       'target_language', 'source_language', 'extra_languages',
+                                                       'continued'])
+# 翻译线程的结果：translation 为None表示没有翻译或翻译出错，extra_translations 为 {语言名称: 译文}
+TranslationResult = namedtuple('TranslationResult', ['request', 'translation', 'extra_translations', 'delay_ms',
+                                                     'stations'])
+
+class TranslationWorker(QObject):
+    """
+    在翻译线程中翻译句子和查询呼号，结果通过排队的信号送回界面线程
+
+    翻译最长会等待到翻译后端的截止时间，不能在界面线程中执行。
+    任务在单个线程中按提交顺序执行，译文按识别顺序写入字幕文件。
+    """
+    result_ready = Signal(object)
+
+    def __init__(self, subtitle_manager, parent=None):
+        super().__init__(parent)
+        self.subtitle_manager = subtitle_manager
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui_translate")
+
+    def submit(self, request):
+        """
+        提交翻译任务（在界面线程中调用）
+
+        参数:
+            request (TranslationRequest): 翻译任务
+        """
+        self.executor.submit(self._run, request)
+
+    def _run(self, request):
+        """在翻译线程中执行任务并发出结果信号"""
+        term_manager = self.subtitle_manager.get_term_manager()
+        stations = []
+        try:
+            # 规范化结果有缓存，字母解释法呼号也能识别
+            stations = term_manager.lookup_callsigns(term_manager.normalize_text(request.text))
+        except Exception as e:
+            print(f"查询呼号出错: {e}")
+
+        translation = None
+        extra_translations = {}
+        delay_ms = 0
+        if request.sentence is not None:
+            try:
+                translation, extra_translations = self._translate(request)
+                delay_ms = self.subtitle_manager.translation_delay
+            except Exception as e:
+                print(f"翻译错误: {e}")
+        self.result_ready.emit(TranslationResult(request, translation, extra_translations, delay_ms, stations))
+
+    def _translate(self, request):
+        """
+        翻译任务中的文本
+
+        返回:
+            tuple: (目标语言译文, {额外目标语言名称: 译文})
+        """
+        print(f"开始翻译文本到 {request.target_language}")
+        if not request.extra_languages:
+            translation = self.subtitle_manager.translate(
+                request.sentence, request.target_language, source_language=request.source_language
+            )
+            extra_translations = {}
+        else:
+            # 同时翻译到所有目标语言，术语预处理只执行一次
+            translations = self.subtitle_manager.translate_multi(
+                request.sentence, [request.target_language] + list(request.extra_languages),
+                source_language=request.source_language
+            )
+            translation = translations.pop(request.target_language)
+            extra_translations = translations
+        print(f"翻译结果: '{translation[:30]}...'")
+        return translation, extra_translations
+
+    def shutdown(self):
+        """停止翻译线程，取消还没开始的任务"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -29,6 +158,10 @@ class MainWindow(QMainWindow):
         saved_height = config.get("main_window_height", 600)
         self.resize(saved_width, saved_height)
         
+        # 配置快照，配置变化时整体替换，定时更新字幕时不查询配置字典
+        self.settings = config.snapshot()
+        config.subscribe(self._on_config_changed)
+        
         # 初始化音频和字幕管理器
         self.audio_manager = AudioManager()
         self.subtitle_manager = SubtitleManager()
@@ -39,19 +172,33 @@ class MainWindow(QMainWindow):
         # 初始化UI
         self.init_ui()
         
-        # 启动定时器定期更新翻译结果
-        self.timer = QTimer()
-        self.timer.setInterval(500)  # 增加到500ms，减少UI更新频率
-        self.timer.timeout.connect(self.update_subtitles)
+        # 识别结果产生后通过排队的信号立即送到界面线程更新字幕，不再定时轮询
+        self.recognition_signals = RecognitionSignals(self)
+        self.recognition_signals.result_ready.connect(self._on_recognition_result_ready, Qt.QueuedConnection)
+        self.audio_manager.add_result_listener(self.recognition_signals.post)
         
-        # 记录上次更新UI的时间，避免过于频繁的更新
-        self.last_update_time = 0
-        self.ui_update_interval = 500  # 500ms最小UI更新间隔，减少UI更新频率
+        # 翻译和呼号查询在翻译线程中执行，译文同样通过排队的信号送回界面线程
+        self.translation_worker = TranslationWorker(self.subtitle_manager, self)
+        self.translation_worker.result_ready.connect(self._on_translation_ready, Qt.QueuedConnection)
         
-        # 记录当前显示的文本，避免重复更新相同内容
+        # 记录当前显示的识别分段和文本，避免重复更新同一条识别结果
+        self.current_segment_id = None
         self.current_displayed_text = ""
         self.current_displayed_translation = ""
         
+        # 多目标语言同时翻译：每种额外的目标语言使用单独的字幕窗口和字幕轨道
+        self.extra_target_languages = config.get("extra_target_languages", [])
+        self.extra_subtitle_windows = {}
+        self.latest_extra_translations = {}
+        
+        # 句子缓冲区：把被静音或最大时长截断的片段拼成完整句子后再翻译
+        self.sentence_buffer_enabled = config.get("sentence_buffer_enabled", True)
+        self.sentence_buffer = SentenceBuffer(timeout=config.get("sentence_buffer_timeout_ms", 2500) / 1000.0)
+        # 缓冲区有未结束的片段时，在超时的时刻检查一次
+        self.sentence_timer = QTimer(self)
+        self.sentence_timer.setSingleShot(True)
+        self.sentence_timer.timeout.connect(self.flush_expired_sentence)
+        
         # 创建初始化标志，避免重复初始化模型
         self.model_initialized = False
         
@@ -63,6 +210,10 @@ class MainWindow(QMainWindow):
         # 检查并确保所有设置项存在，处理旧版本兼容性
         self.check_and_update_settings()
         
+    def _on_config_changed(self, settings):
+        """配置变化时替换配置快照（可能在其他线程中调用，只保存引用）"""
+        self.settings = settings
+    
     def check_and_update_settings(self):
         """检查并更新设置，处理旧版本兼容性问题"""
         # 处理旧版本中单一字体大小设置的迁移
@@ -176,6 +327,11 @@ class MainWindow(QMainWindow):
         self.detected_language_label.setStyleSheet("color: blue;")
         self.detected_language_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)  # 右对齐
         
+        # 添加呼号所属国家或地区标签
+        self.station_label = QLabel("")
+        self.station_label.setStyleSheet("color: green;")
+        self.station_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)  # 右对齐
+        
         # 添加识别延迟标签
         self.recognition_delay_label = QLabel("")
         self.recognition_delay_label.setStyleSheet("color: gray;")
@@ -184,6 +340,7 @@ class MainWindow(QMainWindow):
         
         # 创建一个弹性占位符来推动内容向右对齐
         source_info_layout.addStretch(1)  # 添加弹性空间在左侧
+        source_info_layout.addWidget(self.station_label)
         source_info_layout.addWidget(self.detected_language_label)
         source_info_layout.addWidget(self.recognition_delay_label)
         
@@ -436,9 +593,13 @@ class MainWindow(QMainWindow):
             # 保存所有设置
             self.save_all_settings()
             
-            # 停止定时器
-            if hasattr(self, 'timer') and self.timer:
-                self.timer.stop()
+            # 停止接收识别结果和句子缓冲区的超时检查
+            if hasattr(self, 'sentence_timer') and self.sentence_timer:
+                self.sentence_timer.stop()
+            if hasattr(self, 'recognition_signals') and hasattr(self, 'audio_manager') and self.audio_manager:
+                self.audio_manager.remove_result_listener(self.recognition_signals.post)
+            if hasattr(self, 'translation_worker') and self.translation_worker:
+                self.translation_worker.shutdown()
             
             # 确保录音停止
             if hasattr(self, 'audio_manager') and self.audio_manager:
@@ -459,10 +620,16 @@ class MainWindow(QMainWindow):
                         print("停止Whisper线程池...")
                         self.audio_manager.audio_processor.thread_pool.stop()
             
+            # 停止术语文件监视
+            if hasattr(self, 'subtitle_manager') and self.subtitle_manager:
+                self.subtitle_manager.get_term_manager().stop_watching()
+            
             # 关闭字幕窗口
             if hasattr(self, 'subtitle_window') and self.subtitle_window:
                 print("关闭字幕窗口...")
                 self.subtitle_window.close()
+                for window in self.extra_subtitle_windows.values():
+                    window.close()
             
             # 强制清理资源
             import gc
@@ -670,8 +837,6 @@ class MainWindow(QMainWindow):
         config.set("font_color", color)
         config.set("original_font_color", original_color)
         config.set("position", position)
-        # 手动触发配置同步写入
-        config.sync_to_file()
         
         # 更新预览区域样式
         self.original_preview.setFont(QFont("Arial", original_font_size))
@@ -727,9 +892,12 @@ class MainWindow(QMainWindow):
         if self.audio_manager.is_running:
             # 停止翻译
             self.audio_manager.stop_recording()
-            self.timer.stop()
+            self.sentence_timer.stop()
+            self.sentence_buffer.clear()
             self.start_button.setText("开始翻译")
             self.subtitle_window.hide()
+            for window in self.extra_subtitle_windows.values():
+                window.hide()
             
             # 保存字幕文件
             if self.audio_manager.is_subtitle_recording():
@@ -754,9 +922,6 @@ class MainWindow(QMainWindow):
             # 设置音频延迟（如果启用）
             self.update_audio_delay_settings()
             
-            # 启动定时器
-            self.timer.start()
-            
             # 更新按钮文本
             self.start_button.setText("停止翻译")
             
@@ -785,125 +950,259 @@ class MainWindow(QMainWindow):
         
         # 清除检测到的语言标签和延迟信息（因为是预览）
         self.detected_language_label.setText("")
+        self.station_label.setText("")
         self.recognition_delay_label.setText("")
         self.translation_delay_label.setText("")
         
         # 5秒后自动隐藏字幕窗口
         QTimer.singleShot(5000, self.subtitle_window.hide)
     
-    def update_subtitles(self):
-        """更新字幕内容"""
-        # 检查距离上次更新UI的时间间隔
-        current_time = time.time() * 1000  # 转换为毫秒
-        if current_time - self.last_update_time < self.ui_update_interval:
-            # 如果更新太频繁，跳过此次更新
-            return
+    @Slot()
+    def _on_recognition_result_ready(self):
+        """在界面线程中处理识别线程送来的全部识别结果，只用最新的一条刷新界面"""
+        results = self.recognition_signals.take()
+        for i, result in enumerate(results):
+            self.update_subtitles(result, repaint=(i == len(results) - 1))
+    
+    def update_subtitles(self, result=None, repaint=True):
+        """
+        更新字幕内容
         
-        # 获取最新识别的文本
-        text = self.audio_manager.get_latest_text()
+        原文立即显示；翻译和呼号查询交给翻译线程，完成后在 _on_translation_ready 中显示译文。
         
-        # 调试: 打印从音频管理器获取的文本
-        print(f"从AudioManager获取的最新文本: {text}")
+        参数:
+            result (RecognitionResult): 要显示的识别结果，为None时使用最新的识别结果
+            repaint (bool): 是否刷新界面。之后还有更新的识别结果时为False，
+                            只把结果送入句子缓冲区和翻译线程
+        """
+        if result is None:
+            result = self.audio_manager.get_latest_result()
         
         # 如果没有文本，不进行更新
-        if not text:
+        if result is None or not result.text:
             print("没有获取到文本，跳过更新")
             return
+        text = result.text
             
-        # 检查文本是否与当前显示的相同，避免重复更新
-        if text == self.current_displayed_text:
+        # 检查是否已经显示过这条识别结果（按识别分段ID判断，相同内容的新识别结果也会更新）
+        if result.segment_id == self.current_segment_id:
             # 只更新延迟信息，不进行完整UI更新
-            print(f"文本未变化，跳过更新: '{text[:30]}...'")
+            print(f"识别结果未变化，跳过更新: '{text[:30]}...'")
             self.update_delay_info()
             return
             
-        # 更新最后一次UI更新时间戳
-        self.last_update_time = current_time
-        # 保存当前显示的文本
+        # 保存当前显示的识别分段和文本
+        self.current_segment_id = result.segment_id
         self.current_displayed_text = text
         
         print(f"准备更新UI，新文本: '{text[:30]}...'")
             
         # 更新原文预览，只有当确实需要显示时才更新
-        if self.original_preview.isVisible():
+        if repaint and self.original_preview.isVisible():
             self.original_preview.setText(text)
             print("已更新原文预览")
         
-        # 获取当前字幕模式
-        subtitle_mode = config.get("subtitle_mode", "translated")
-        
         # 检查是否选择了"不翻译"
         target_language = self.target_language_combo.currentText()
         is_translation_disabled = target_language == "不翻译"
         
-        # 优化：创建一个本地变量存储字幕文本，避免多次更新窗口
-        original_text_for_subtitle = ""
-        translation_text_for_subtitle = ""
-        
+        sentence = None
+        segment_ids = (result.segment_id,)
         if is_translation_disabled:
             # 不翻译模式：直接使用原文，清空译文
             print("不翻译模式，直接使用原文")
-            if self.subtitle_preview.isVisible():
-                self.subtitle_preview.setText("")
-            original_text_for_subtitle = text
-        else:
-            try:
-                # 翻译文本
-                print(f"开始翻译文本到 {target_language}")
-                translation = self.subtitle_manager.translate(text, target_language)
-                print(f"翻译结果: '{translation[:30]}...'")
-                
-                # 检查翻译是否与当前显示的相同
-                if translation == self.current_displayed_translation:
-                    # 翻译没有变化，只更新原文和延迟信息
-                    print("翻译结果未变化，只更新原文")
-                    if subtitle_mode == "both" and self.original_preview.isVisible():
-                        self.original_preview.setText(text)
-                    self.update_delay_info()
-                    return
-                    
-                # 保存当前显示的翻译
-                self.current_displayed_translation = translation
-                
-                # 将译文保存到音频管理器的字幕管理器中
-                self.audio_manager.add_translated_text(text, translation)
-                
-                # 更新译文预览，只有当需要显示时才更新
+            if repaint:
                 if self.subtitle_preview.isVisible():
-                    self.subtitle_preview.setText(translation)
-                    print("已更新译文预览")
-                
-                # 根据当前字幕模式准备字幕文本
-                if subtitle_mode == "translated":
-                    translation_text_for_subtitle = translation
-                elif subtitle_mode == "original":
-                    original_text_for_subtitle = text
-                else:  # both
-                    original_text_for_subtitle = text
-                    translation_text_for_subtitle = translation
-                
-                print(f"字幕模式: {subtitle_mode}, 原文: '{original_text_for_subtitle[:20]}...', 译文: '{translation_text_for_subtitle[:20]}...'")
-                
-            except Exception as e:
-                print(f"翻译错误: {e}")
-                # 翻译出错时使用原文
-                original_text_for_subtitle = text
+                    self.subtitle_preview.setText("")
+                self.show_subtitle_text(text, "")
+        elif self.sentence_buffer_enabled:
+            # 句子未结束时先显示未翻译的片段，句子完整后只翻译一次
+            buffered = self.sentence_buffer.add_segment(text, result.segment_id)
+            if buffered is None:
+                if repaint:
+                    pending_text = self.sentence_buffer.get_pending_text()
+                    print(f"句子未结束，先显示原文片段: '{pending_text[:30]}...'")
+                    self.show_translation(pending_text)
+            else:
+                sentence, segment_ids = buffered
+            # 缓冲区中还有未结束的片段时，安排超时检查
+            self.schedule_sentence_flush()
+        else:
+            sentence = text
+        
+        # 翻译（如果需要）和呼号查询在翻译线程中执行
+        self.request_translation(result.segment_id, segment_ids, text, sentence, target_language)
+        if not repaint:
+            return
+        
+        # 更新语言识别标签
+        self.update_detected_language_label()
+        
+        # 更新延迟信息
+        self.update_delay_info()
+    
+    def request_translation(self, segment_id, segment_ids, text, sentence, target_language):
+        """
+        把翻译任务交给翻译线程
+        
+        参数:
+            segment_id (int): 提交任务时显示的识别分段ID
+            segment_ids (tuple): 译文所属的全部识别分段ID
+            text (str): 查询呼号的文本
+            sentence (str): 要翻译的文本，为None时只查询呼号
+            target_language (str): 目标语言名称
+        """
+        extra_languages = tuple(language for language in self.extra_target_languages
+                                if language != target_language and language != "不翻译")
+        # 分段中间有句子结束时，分段的剩余部分留在缓冲区，下一个句子的译文还要保存到同一条字幕
+        continued = (sentence is not None and self.sentence_buffer_enabled and bool(segment_ids)
+                     and segment_ids[-1] in self.sentence_buffer.pending_segment_ids())
+        self.translation_worker.submit(TranslationRequest(
+            segment_id=segment_id,
+            segment_ids=segment_ids,
+            text=text,
+            sentence=sentence,
+            target_language=target_language,
+            source_language=self.audio_manager.get_detected_language(),
+            extra_languages=extra_languages,
+            continued=continued
+        ))
+    
+    @Slot(object)
+    def _on_translation_ready(self, result):
+        """
+        在界面线程中显示翻译线程送来的译文，并写入字幕文件
+        
+        参数:
+            result (TranslationResult): 翻译结果
+        """
+        request = result.request
+        # 呼号标签只显示最新识别分段的查询结果
+        if request.segment_id == self.current_segment_id:
+            self.update_station_label(result.stations)
+        
+        if request.sentence is None:
+            return
+        if result.translation is None:
+            # 翻译出错时使用原文
+            if request.segment_id == self.current_segment_id:
+                self.show_subtitle_text(self.current_displayed_text, "")
+            return
         
-        # 只在需要时更新字幕窗口，并且只更新一次
+        translation = result.translation
+        extra_translations = {}
+        for language, extra_translation in result.extra_translations.items():
+            lang_code = self.subtitle_manager.get_language_code(language) or language
+            extra_translations[lang_code] = extra_translation
+            self.update_extra_subtitle_window(language, extra_translation)
+        self.latest_extra_translations = extra_translations
+        
+        # 将译文保存到句子所属的每个识别分段的字幕中
+        self.audio_manager.add_translated_text(request.segment_ids, translation, extra_translations, result.delay_ms,
+                                               request.continued)
+        
+        # 检查翻译是否与当前显示的相同
+        if translation == self.current_displayed_translation:
+            print("翻译结果未变化，只更新延迟信息")
+        else:
+            self.show_translation(translation)
+        self.update_delay_info()
+    
+    def show_translation(self, translation):
+        """
+        显示译文（或尚未翻译的句子片段），原文使用当前显示的识别文本
+        
+        参数:
+            translation (str): 要显示的译文
+        """
+        self.current_displayed_translation = translation
+        
+        # 更新译文预览，只有当需要显示时才更新
+        if self.subtitle_preview.isVisible():
+            self.subtitle_preview.setText(translation)
+            print("已更新译文预览")
+        
+        # 根据当前字幕模式准备字幕文本
+        subtitle_mode = self.settings.subtitle_mode
+        original_text_for_subtitle = ""
+        translation_text_for_subtitle = ""
+        if subtitle_mode == "translated":
+            translation_text_for_subtitle = translation
+        elif subtitle_mode == "original":
+            original_text_for_subtitle = self.current_displayed_text
+        else:  # both
+            original_text_for_subtitle = self.current_displayed_text
+            translation_text_for_subtitle = translation
+        
+        print(f"字幕模式: {subtitle_mode}, 原文: '{original_text_for_subtitle[:20]}...', 译文: '{translation_text_for_subtitle[:20]}...'")
+        self.show_subtitle_text(original_text_for_subtitle, translation_text_for_subtitle)
+    
+    def show_subtitle_text(self, original_text, translation_text):
+        """只在字幕窗口可见时更新字幕窗口内容，并且只更新一次"""
         if self.subtitle_window.isVisible():
             print("更新字幕窗口内容")
             self.subtitle_window.update_text(
-                original_text=original_text_for_subtitle,
-                translation_text=translation_text_for_subtitle
+                original_text=original_text,
+                translation_text=translation_text
             )
         else:
             print("字幕窗口不可见，跳过更新")
+    
+    def update_extra_subtitle_window(self, language, translation):
+        """
+        更新额外目标语言的字幕窗口
+        
+        参数:
+            language (str): 目标语言名称
+            translation (str): 译文
+        """
+        window = self.extra_subtitle_windows.get(language)
+        if window is None:
+            window = SubtitleWindow(stack_index=len(self.extra_subtitle_windows) + 1)
+            window.set_subtitle_mode("translated")
+            self.extra_subtitle_windows[language] = window
         
-        # 更新语言识别标签
-        self.update_detected_language_label()
+        if self.subtitle_window.isVisible():
+            window.update_text(original_text="", translation_text=translation)
+    
+    def flush_expired_sentence(self):
+        """句子缓冲区超时后把已缓冲的片段交给翻译线程"""
+        if not self.sentence_buffer_enabled:
+            return
+        target_language = self.target_language_combo.currentText()
+        if target_language == "不翻译":
+            self.sentence_buffer.clear()
+            return
         
-        # 更新延迟信息
-        self.update_delay_info()
+        sentence = self.sentence_buffer.pop_expired_sentence()
+        if not sentence:
+            # 缓冲区中的片段还没有超时（第一个片段之后又输出过句子），重新安排检查
+            self.schedule_sentence_flush()
+            return
+        
+        self.request_translation(self.current_segment_id, sentence.segment_ids, self.current_displayed_text,
+                                 sentence.text, target_language)
+    
+    def schedule_sentence_flush(self):
+        """在句子缓冲区超时的时刻触发一次 flush_expired_sentence，缓冲区为空时取消"""
+        remaining = self.sentence_buffer.time_until_expired()
+        if remaining is None:
+            self.sentence_timer.stop()
+        elif not self.sentence_timer.isActive():
+            # 多等待10ms，避免因计时误差在超时前检查
+            self.sentence_timer.start(int(remaining * 1000) + 10)
+    
+    def update_station_label(self, stations):
+        """
+        显示文本中呼号所属的国家或地区
+        
+        参数:
+            stations (list): 翻译线程查询到的呼号信息
+        """
+        if stations:
+            self.station_label.setText(" ".join(f"[{s['callsign']}: {s['name']}]" for s in stations))
+        else:
+            self.station_label.setText("")
     
     def update_detected_language_label(self):
         """更新检测到的语言标签"""
@@ -8,9 +8,12 @@ from PySide6.QtWidgets import QApplication
 DEBUG_MODE = False
 
 class SubtitleWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, stack_index=0):
         super().__init__()
         
+        # 多语言字幕窗口的堆叠序号，0为主字幕窗口，其他窗口依次错开显示避免重叠
+        self.stack_index = stack_index
+        
         # 设置窗口无边框和始终置顶，但使用Tool类型避免在任务栏显示
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool)
         
@@ -201,6 +204,9 @@ class SubtitleWindow(QMainWindow):
             x = (screen.width() - window_width) // 2
             y = screen.height() - window_height - 100  # 距离底部100像素
         
+        # 多语言字幕窗口错开显示
+        y += self.get_stack_offset(position, window_height)
+        
         # 移动窗口
         self.move(x, y)
     
@@ -308,8 +314,6 @@ class SubtitleWindow(QMainWindow):
         # 保存设置到配置
         from config import config
         config.set("window_width", width)
-        # 强制同步到文件
-        config.sync_to_file()
         
         # 直接应用新宽度(保持当前高度)
         current_height = self.height()
@@ -326,8 +330,6 @@ class SubtitleWindow(QMainWindow):
         # 保存设置到配置
         from config import config
         config.set("window_height", height)
-        # 强制同步到文件
-        config.sync_to_file()
         
         # 直接应用新高度(保持当前宽度)
         current_width = self.width()
@@ -544,6 +546,9 @@ class SubtitleWindow(QMainWindow):
             if y < 0 or y >= screen_height:
                 y = screen_height - window_height - 10
         
+        # 多语言字幕窗口错开显示
+        y += self.get_stack_offset(self.position, window_height)
+        
         # 确保窗口位置在屏幕内
         x = max(0, min(x, screen_width - window_width))
         y = max(0, min(y, screen_height - window_height))
@@ -554,6 +559,11 @@ class SubtitleWindow(QMainWindow):
         if DEBUG_MODE:
             print(f"字幕窗口定位: 位置={self.position}, 坐标=({x},{y})")
     
+    def get_stack_offset(self, position, window_height):
+        """获取多语言字幕窗口的垂直偏移量，底部位置向上堆叠，其他位置向下堆叠"""
+        offset = self.stack_index * (window_height + 10)
+        return -offset if position not in ("top", "middle") else offset
+    
     def showEvent(self, event):
         """窗口显示时的事件处理"""
         # 首先调用父类方法
@@ -0,0 +1,50 @@
+import os
+import json
+import wave
+import tempfile
+import unittest
+from array import array
+from audio.audio_archiver import AudioArchiver, extract_audio, main, read_archived_audio
+
+class TestAudioArchiver(unittest.TestCase):
+    """测试录音归档"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_archive_and_read_across_files(self):
+        """测试写入时返回采样位置，按位置读取跨越多个WAV文件的音频"""
+        archiver = AudioArchiver(sample_rate=100, file_seconds=1)
+        base_path = archiver.start()
+        samples = array('h', range(-500, 500))
+        positions = [archiver.write(samples[i:i + 64].tobytes()) for i in range(0, len(samples), 64)]
+        archiver.stop()
+
+        self.assertEqual(positions[:3], [0, 64, 128])
+        self.assertEqual(len([name for name in os.listdir("Recordings") if name.endswith(".wav")]), 10)
+        data, audio_format = read_archived_audio(base_path, 250, 300)
+        self.assertEqual(data, samples[250:550].tobytes())
+        self.assertEqual(audio_format["sample_rate"], 100)
+        # 超出归档末尾时只返回已有的部分
+        self.assertEqual(read_archived_audio(base_path, 950, 100)[0], samples[950:].tobytes())
+
+        self.assertAlmostEqual(extract_audio(base_path, 100, 150, "clip.wav"), 1.5)
+        with wave.open("clip.wav", 'rb') as clip:
+            self.assertEqual(clip.readframes(clip.getnframes()), samples[100:250].tobytes())
+
+        with open("cues.jsonl", 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"index": 1, "original": "QRZ?", "audio_file": base_path,
+                                "audio_offset": 0, "audio_samples": 50}) + "\n")
+        self.assertEqual(main(["cues.jsonl", "1", "cue1.wav"]), 0)
+        self.assertEqual(main(["cues.jsonl", "2", "cue2.wav"]), 1)
+        with wave.open("cue1.wav", 'rb') as clip:
+            self.assertEqual(clip.getnframes(), 50)
+
+if __name__ == "__main__":
+    unittest.main()
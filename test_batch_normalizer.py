@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import translation.term_manager as term_manager_module
+from translation.term_manager import TermManager
+
+SAMPLE_LINES = [
+    "cq cq this is bravo golf seven yankee yankee kilo",
+    "your signal is five nine, qrz?",
+    "",
+    "roger, 73",
+    "cq cq this is bravo golf seven yankee yankee kilo",
+    "this is ja1abc over",
+]
+
+class TestNormalizeMany(unittest.TestCase):
+    """测试批量规范化"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.old_min_lines = term_manager_module.PROCESS_POOL_MIN_LINES_PER_WORKER
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.term_manager = TermManager()
+
+    def tearDown(self):
+        term_manager_module.PROCESS_POOL_MIN_LINES_PER_WORKER = self.old_min_lines
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_same_as_per_line(self):
+        """测试批量结果与逐行调用normalize_text相同，并记录处理速度"""
+        for target in (None, "zh-cn", "en"):
+            expected = [self.term_manager.normalize_text(text, target) for text in SAMPLE_LINES]
+            self.assertEqual(self.term_manager.normalize_many(SAMPLE_LINES, target), expected)
+        stats = self.term_manager.get_batch_stats()
+        self.assertEqual((stats["lines"], stats["workers"]), (len(SAMPLE_LINES), 1))
+        self.assertGreater(stats["lines_per_second"], 0)
+
+    def test_process_pool(self):
+        """测试使用进程池时结果保持输入顺序"""
+        term_manager_module.PROCESS_POOL_MIN_LINES_PER_WORKER = 2
+        texts = SAMPLE_LINES * 3
+        expected = [self.term_manager.normalize_text(text, "zh-cn") for text in texts]
+        self.assertEqual(self.term_manager.normalize_many(texts, "zh-cn", workers=2), expected)
+        self.assertEqual(self.term_manager.get_batch_stats()["workers"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from translation.callsign_index import CallsignPrefixIndex, get_callsign_index
+from translation.term_manager import TermManager
+
+class TestCallsignPrefixIndex(unittest.TestCase):
+    """测试ITU呼号前缀索引"""
+
+    def setUp(self):
+        self.index = get_callsign_index()
+
+    def test_lookup_entity(self):
+        """测试按最长已分配前缀查询实体"""
+        cases = {
+            "BG7YYK": ("B", "China"),
+            "bv2aa": ("B", "China"),
+            "K1A": ("K", "United States"),
+            "JA1ABC": ("JA", "Japan"),
+            "A61XX": ("A6", "United Arab Emirates"),
+            "3D2AG": ("3D", "Fiji"),
+            "3DA0XX": ("3DA", "Eswatini"),
+            "2E0ABC": ("2", "United Kingdom"),
+            "VR2XMT": ("VR", "Hong Kong"),
+        }
+        for callsign, (prefix, entity) in cases.items():
+            info = self.index.lookup(callsign)
+            self.assertIsNotNone(info, callsign)
+            self.assertEqual((info["callsign"], info["prefix"], info["entity"]), (callsign.upper(), prefix, entity))
+        self.assertEqual(self.index.get_entity_name("China"), "中国")
+        self.assertEqual(self.index.get_entity_name("China", "ja"), "China")
+
+    def test_rejects_non_callsigns(self):
+        """测试不符合呼号结构或前缀未分配的单词"""
+        for word in ["QRZ", "73", "H2O", "MP3", "4TH", "2ND", "R2D2", "COVID19", "22ABC", "X5"]:
+            self.assertFalse(self.index.is_callsign(word), word)
+
+    def test_ranges_and_replace(self):
+        """测试前缀范围展开和一次扫描替换"""
+        index = CallsignPrefixIndex({"AA-AC": "Test", "B": "Other"}, {"Test": {"en": "Test"}})
+        self.assertEqual(index.longest_prefix("AB1X"), ("AB", "Test"))
+        self.assertEqual(index.longest_prefix("AD1X"), (None, None))
+        self.assertEqual(index.replace("ab1x, ad1x and B2BC.", lambda info, matched: f"<{info['callsign']}>"),
+                         "<AB1X>, ad1x and <B2BC>.")
+
+class TestTermManagerCallsigns(unittest.TestCase):
+    """测试术语处理中使用呼号前缀索引"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.term_manager = TermManager()
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_callsigns_protected_and_described(self):
+        """测试呼号在预处理时被保护，并能查询所属国家或地区"""
+        processed, replacements = self.term_manager.preprocess_ham_radio_terms("JA1ABC de bg7yyk, QRZ?", "zh-cn")
+        self.assertEqual(processed, "__TERM_1__ de __TERM_2__, __TERM_0__?")
+        self.assertEqual(self.term_manager.restore_ham_radio_terms(processed, replacements),
+                         "JA1ABC de BG7YYK, QRZ（谁在呼叫我）?")
+        stations = self.term_manager.lookup_callsigns("JA1ABC de BG7YYK, BG7YYK")
+        self.assertEqual([(s["callsign"], s["name"]) for s in stations], [("JA1ABC", "日本"), ("BG7YYK", "中国")])
+        self.assertEqual(self.term_manager.lookup_callsigns("JA1ABC", "en-US")[0]["name"], "Japan")
+
+if __name__ == "__main__":
+    unittest.main()
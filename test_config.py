@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+import dataclasses
+import config as config_module
+from config import Config, ConfigSnapshot
+
+class TestConfigWriteBehind(unittest.TestCase):
+    """测试配置的延迟合并写入"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.old_delay = config_module.FLUSH_DELAY_SECONDS
+        self.config = Config()
+        self.config.save_settings()
+
+    def tearDown(self):
+        config_module.FLUSH_DELAY_SECONDS = self.old_delay
+        self.config.flush()
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def read_settings(self):
+        with open("settings.json", encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_set_is_coalesced(self):
+        """测试连续修改只在内存中生效，flush时一次写入最后的值"""
+        config_module.FLUSH_DELAY_SECONDS = 60
+        for width in range(600, 700):
+            self.config.set("window_width", width)
+        self.assertEqual(self.config.get("window_width"), 699)
+        self.assertEqual(self.read_settings()["window_width"], 800)
+
+        self.config.sync_to_file()
+        self.assertEqual(self.read_settings()["window_width"], 699)
+        self.assertFalse(os.path.exists("settings.json.tmp"))
+        self.assertIsNone(self.config._flush_timer)
+
+    def test_missing_defaults_not_written_on_load(self):
+        """测试加载时补全的默认设置只在内存中，下一次保存时才写入文件"""
+        with open("settings.json", "w", encoding='utf-8') as f:
+            json.dump({"window_width": 640}, f)
+        config = Config()
+        self.assertEqual(config.get("window_width"), 640)
+        self.assertEqual(config.get("subtitle_mode"), "translated")
+        self.assertEqual(self.read_settings(), {"window_width": 640})
+
+        config_module.FLUSH_DELAY_SECONDS = 60
+        config.set("window_height", 300)
+        config.flush()
+        settings = self.read_settings()
+        self.assertEqual((settings["window_width"], settings["window_height"]), (640, 300))
+        self.assertEqual(settings["subtitle_mode"], "translated")
+
+    def test_timer_flush_from_threads(self):
+        """测试多个线程同时修改后由定时器写入文件"""
+        config_module.FLUSH_DELAY_SECONDS = 0.05
+        threads = [threading.Thread(target=lambda i=i: [self.config.set(f"key_{i}", n) for n in range(100)])
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        deadline = time.time() + 5
+        while self.config._dirty and time.time() < deadline:
+            time.sleep(0.01)
+        # 等待正在进行的写入完成
+        with self.config._write_lock:
+            pass
+        settings = self.read_settings()
+        self.assertEqual([settings[f"key_{i}"] for i in range(4)], [99] * 4)
+
+class TestConfigSnapshot(unittest.TestCase):
+    """测试配置快照和变化通知"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.config = Config()
+
+    def tearDown(self):
+        # 写入等待中的修改，不在临时目录删除后由定时器写入
+        self.config.flush()
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_snapshot_and_subscribers(self):
+        """测试快照不可修改，只在快照中的配置项变化时发布新快照"""
+        snapshot = self.config.snapshot()
+        self.assertIsInstance(snapshot, ConfigSnapshot)
+        self.assertEqual((snapshot.whisper_model, snapshot.subtitle_mode), ("base", "translated"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.subtitle_mode = "both"
+
+        received = []
+        self.config.subscribe(received.append)
+        self.config.set("subtitle_mode", "both")
+        self.config.set("subtitle_mode", "both")
+        self.config.set("window_width", 640)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].subtitle_mode, "both")
+        self.assertIs(self.config.snapshot(), received[0])
+        # 旧快照保持不变
+        self.assertEqual(snapshot.subtitle_mode, "translated")
+
+        self.config.set("use_gpu", False)
+        self.config.set("device", "")
+        self.assertEqual(received[-1].device, "cpu")
+
+        self.config.unsubscribe(received.append)
+        self.config.set("source_language", "en")
+        self.assertEqual(len(received), 3)
+        self.assertEqual(self.config.snapshot().source_language, "en")
+
+    def test_snapshot_defaults_match_settings(self):
+        """测试快照的默认值与默认设置一致（show_audio_stats 默认开启）"""
+        for snapshot in (ConfigSnapshot(), ConfigSnapshot.from_settings({}), self.config.snapshot()):
+            self.assertTrue(snapshot.show_audio_stats)
+            for field in dataclasses.fields(ConfigSnapshot):
+                self.assertEqual(getattr(snapshot, field.name), config_module.DEFAULT_SETTINGS[field.name])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from translation.cue_store import CueStore
+from translation import subtitle_file_manager
+from translation.subtitle_file_manager import SubtitleFileManager
+
+class TestCueStore(unittest.TestCase):
+    """测试按列存储的字幕条目"""
+
+    def test_append_and_metadata(self):
+        """测试按ID读取和更新译文与识别信息"""
+        store = CueStore()
+        first = store.append("CQ CQ", 1000, "")
+        second = store.append("BG7YYK", 2000, "BG7YYK")
+        self.assertEqual((first, second, len(store)), (0, 1, 2))
+        self.assertEqual(store.get_metadata(first), {
+            "language": None, "recognition_delay_ms": None, "translation_delay_ms": None, "confidence": None,
+            "audio_file": None, "audio_offset": None, "audio_samples": None})
+
+        store.set_translation(first, "呼叫")
+        store.set_metadata(first, {"language": "en", "recognition_delay_ms": 850, "confidence": 0.875})
+        self.assertEqual(store.translations[first], "呼叫")
+        metadata = store.get_metadata(first)
+        self.assertEqual((metadata["language"], metadata["recognition_delay_ms"]), ("en", 850))
+        self.assertEqual(metadata["confidence"], 0.875)
+        self.assertIsNone(metadata["translation_delay_ms"])
+
+        store.set_metadata(second, {"audio_file": "Recordings/audio_20240101_120000", "audio_offset": 48000,
+                                    "audio_samples": 16000})
+        metadata = store.get_metadata(second)
+        self.assertEqual((metadata["audio_file"], metadata["audio_offset"], metadata["audio_samples"]),
+                         ("Recordings/audio_20240101_120000", 48000, 16000))
+
+    def test_extra_translations(self):
+        """测试其他语言的译文轨道按需创建，空译文不覆盖已有的译文"""
+        store = CueStore()
+        store.append("hello", 0)
+        store.append("world", 1)
+        store.set_extra_translation(1, "ja", "世界")
+        self.assertEqual(store.get_extra_translations(0), {})
+        self.assertEqual(store.get_extra_translations(1), {"ja": "世界"})
+        store.set_extra_translation(1, "ja", "")
+        self.assertEqual(store.get_extra_translations(1), {"ja": "世界"})
+
+    def test_discard_before(self):
+        """测试丢弃已写入的字幕后，其余字幕的ID不变"""
+        store = CueStore()
+        for i in range(5):
+            store.append(f"CQ {i}", i * 1000)
+        store.set_extra_translation(1, "ja", "一")
+        store.set_extra_translation(3, "ja", "三")
+        store.discard_before(3)
+        self.assertEqual((len(store), store.first_id, len(store.originals)), (5, 3, 2))
+        self.assertEqual((store.get_original(3), store.get_timestamp_ns(4)), ("CQ 3", 4000))
+        self.assertEqual(store.get_extra_translations(3), {"ja": "三"})
+        self.assertEqual(store.append("CQ 5", 5000), 5)
+        with self.assertRaises(IndexError):
+            store.get_original(2)
+
+class TestSubtitleFileManagerCueIds(unittest.TestCase):
+    """测试SubtitleFileManager返回的字幕ID"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def test_cue_ids(self):
+        """测试相同原文返回同一个ID，识别信息写入JSONL"""
+        manager = SubtitleFileManager(["jsonl"])
+        manager.start_recording()
+        first = manager.add_subtitle("hello", None, metadata={"language": "en", "confidence": 0.5})
+        self.assertEqual(manager.add_subtitle("hello", "你好"), first)
+        second = manager.add_subtitle("world", "世界")
+        self.assertEqual((first, second), (0, 1))
+        manager.stop_recording()
+
+        with open(manager.base_path + ".jsonl", encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["translation"] for r in records], ["你好", "世界"])
+        self.assertEqual((records[0]["language"], records[0]["confidence"]), ("en", 0.5))
+
+    def test_written_cues_discarded_on_rotation(self):
+        """测试换用新文件时丢弃已写入关闭文件的字幕和识别分段映射"""
+        old_limit = subtitle_file_manager.MAX_FILE_CUES
+        subtitle_file_manager.MAX_FILE_CUES = 3
+        try:
+            manager = SubtitleFileManager()
+            manager.start_recording()
+            for segment_id in range(1, 11):
+                manager.add_subtitle(f"CQ {segment_id}", f"呼叫 {segment_id}", segment_id=segment_id)
+            self.assertEqual(manager.cues.first_id, manager.file_first_cue)
+            self.assertLessEqual(len(manager.cues.originals), 4)
+            self.assertEqual(min(manager.segment_cues.values()), manager.file_first_cue)
+            self.assertIsNone(manager.update_translation(1, "late"))
+            manager.stop_recording()
+        finally:
+            subtitle_file_manager.MAX_FILE_CUES = old_limit
+
+        content = ""
+        for name in os.listdir("Subtitles"):
+            with open(os.path.join("Subtitles", name), encoding='utf-8') as f:
+                content += f.read()
+        self.assertEqual(content.count(" --> "), 10)
+        self.assertIn("CQ 10\n呼叫 10\n", content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from translation.lru_cache import LRUCache
+from translation.term_manager import TermManager
+
+class TestLRUCache(unittest.TestCase):
+    """测试有界LRU缓存"""
+
+    def test_eviction_order(self):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        stats = cache.get_stats()
+        self.assertEqual((stats["size"], stats["hits"], stats["misses"], stats["evictions"]), (2, 3, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.75)
+
+    def test_get_or_compute(self):
+        """测试只在未命中时计算，包括计算结果为None的情况"""
+        cache = LRUCache(max_size=4)
+        calls = []
+        def compute():
+            calls.append(1)
+            return None
+        self.assertIsNone(cache.get_or_compute("k", compute))
+        self.assertIsNone(cache.get_or_compute("k", compute))
+        self.assertEqual(len(calls), 1)
+        cache.clear()
+        cache.get_or_compute("k", compute)
+        self.assertEqual(len(calls), 2)
+
+class TestTermManagerNormalizationCache(unittest.TestCase):
+    """测试TermManager的规范化结果缓存"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.term_manager = TermManager()
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_cached_by_text_and_target(self):
+        """测试规范化结果按文本和目标语言缓存，术语更新后失效"""
+        text, replacements = self.term_manager.preprocess_ham_radio_terms("QRZ? 73", "zh-cn")
+        replacements.clear()
+        self.assertEqual(self.term_manager.preprocess_ham_radio_terms("QRZ? 73", "zh-CN")[1],
+                         {"__TERM_0__": "QRZ（谁在呼叫我）", "__TERM_1__": "73（最好的祝福）"})
+        self.assertEqual(self.term_manager.normalize_text("cq cq", "en"), self.term_manager.normalize_text("cq cq", "en"))
+        stats = self.term_manager.get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+        self.term_manager.add_term("QRZ", {"zh-cn": "QRZ（谁在叫我）"})
+        self.assertEqual(self.term_manager.get_cache_stats()["size"], 0)
+        self.assertEqual(self.term_manager.preprocess_ham_radio_terms("QRZ? 73", "zh-cn")[1]["__TERM_0__"], "QRZ（谁在叫我）")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import threading
+import time
+import unittest
+from translation.resilience import (GuardedBackend, CircuitBreaker, CircuitOpenError,
+                                    TranslationTimeoutError, LatencyTracker)
+
+class TestGuardedBackend(unittest.TestCase):
+    """测试翻译后端的超时、对冲和熔断"""
+
+    def test_timeout_bounds_latency(self):
+        """测试后端卡住时请求在截止时间内返回"""
+        release = threading.Event()
+
+        def stalled(text, dest):
+            release.wait(5)
+            return text
+
+        backend = GuardedBackend(stalled, timeout=0.2, hedge_enabled=False)
+        start = time.time()
+        with self.assertRaises(TranslationTimeoutError):
+            backend.call("CQ", "zh-cn")
+        self.assertLess(time.time() - start, 1.0)
+        release.set()
+        backend.shutdown()
+
+    def test_hedged_request_wins(self):
+        """测试主请求慢于p95时发出对冲请求并使用先返回的结果"""
+        calls = []
+
+        def primary(text, dest):
+            calls.append(text)
+            if len(calls) == 1:
+                time.sleep(1.0)  # 第一次请求卡住
+                return "slow"
+            return "fast"
+
+        backend = GuardedBackend(primary, timeout=2.0, min_hedge_samples=3, min_hedge_delay=0.05)
+        for _ in range(3):
+            backend.latency.add(10)
+        start = time.time()
+        self.assertEqual(backend.call("QRZ", "zh-cn"), "fast")
+        self.assertLess(time.time() - start, 0.8)
+        self.assertEqual(backend.get_stats()["hedge_wins"], 1)
+        backend.shutdown()
+
+    def test_stalled_primary_does_not_block_fallback(self):
+        """测试主后端卡住占满线程时，后续请求直接使用备用后端而不是排队等待"""
+        release = threading.Event()
+
+        def stalled(text, dest):
+            release.wait(5)
+            return text
+
+        backend = GuardedBackend(stalled, secondary=lambda text, dest: "backup:" + text,
+                                 timeout=0.2, hedge_enabled=False, max_workers=1)
+        with self.assertRaises(TranslationTimeoutError):
+            backend.call("CQ", "zh-cn")
+        self.assertEqual(backend.get_stats()["abandoned"], 1)
+
+        start = time.time()
+        self.assertEqual(backend.call("73", "zh-cn"), "backup:73")
+        self.assertLess(time.time() - start, 0.1)
+        self.assertEqual(backend.get_stats()["busy"], 1)
+        release.set()
+        backend.shutdown()
+
+    def test_latency_records_primary_only(self):
+        """测试对冲请求先返回时不记录总耗时，主请求完成后记录它自己的耗时"""
+        primary_done = threading.Event()
+
+        def primary(text, dest):
+            time.sleep(0.3)
+            primary_done.set()
+            return "slow"
+
+        backend = GuardedBackend(primary, secondary=lambda text, dest: "fast",
+                                 timeout=2.0, min_hedge_samples=3, min_hedge_delay=0.05)
+        for _ in range(3):
+            backend.latency.add(10)
+        self.assertEqual(backend.call("QRZ", "zh-cn"), "fast")
+        self.assertEqual(backend.latency.count(), 3)
+
+        primary_done.wait(2)
+        time.sleep(0.05)
+        self.assertEqual(backend.latency.count(), 4)
+        self.assertGreaterEqual(backend.latency.percentile(100), 300)
+        backend.shutdown()
+
+    def test_circuit_opens_and_falls_back(self):
+        """测试连续失败后熔断并切换到备用后端"""
+        def failing(text, dest):
+            raise RuntimeError("service unavailable")
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        backend = GuardedBackend(failing, timeout=1.0, hedge_enabled=False, breaker=breaker)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                backend.call("73", "zh-cn")
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+
+        # 熔断期间没有备用后端，直接拒绝
+        with self.assertRaises(CircuitOpenError):
+            backend.call("73", "zh-cn")
+
+        # 设置备用后端后使用备用后端
+        backend.secondary = lambda text, dest: "backup:" + text
+        self.assertEqual(backend.call("73", "zh-cn"), "backup:73")
+        backend.shutdown()
+
+    def test_half_open_probe_closes_circuit(self):
+        """测试冷却后探测请求成功则恢复"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        # 半开状态只允许一个探测请求
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_latency_percentile(self):
+        """测试延迟百分位计算"""
+        tracker = LatencyTracker()
+        self.assertIsNone(tracker.percentile(95))
+        for value in range(1, 101):
+            tracker.add(value)
+        self.assertEqual(tracker.percentile(95), 95)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from translation.sentence_buffer import SentenceBuffer
+
+class TestSentenceBuffer(unittest.TestCase):
+    """测试跨识别片段的句子缓冲"""
+
+    def setUp(self):
+        """初始化测试环境"""
+        self.buffer = SentenceBuffer(timeout=2.0, max_chars=200)
+
+    def test_fragments_joined_until_sentence_end(self):
+        """测试片段拼接到句子结束后才输出"""
+        self.assertIsNone(self.buffer.add("CQ CQ this is BG7YYK", now=0))
+        self.assertEqual(self.buffer.get_pending_text(), "CQ CQ this is BG7YYK")
+        self.assertIsNone(self.buffer.add("calling from", now=1))
+        self.assertEqual(self.buffer.add("Shenzhen.", now=1.5), "CQ CQ this is BG7YYK calling from Shenzhen.")
+        self.assertEqual(self.buffer.get_pending_text(), "")
+        self.assertEqual(self.buffer.get_stats(), {"fragments": 3, "sentences": 1})
+
+    def test_segment_ids_tracked(self):
+        """测试跨多个识别分段的句子返回全部分段ID，剩余部分只保留最新的分段"""
+        self.assertIsNone(self.buffer.add_segment("CQ CQ this is BG7YYK", 1, now=0))
+        self.assertIsNone(self.buffer.add_segment("calling from", 2, now=1))
+        sentence = self.buffer.add_segment("Shenzhen. QRZ", 3, now=1.5)
+        self.assertEqual(sentence.text, "CQ CQ this is BG7YYK calling from Shenzhen.")
+        self.assertEqual(sentence.segment_ids, (1, 2, 3))
+
+        self.assertIsNone(self.buffer.add_segment("who is", 4, now=2))
+        self.assertEqual(self.buffer.pop_expired_sentence(now=4), ("QRZ who is", (3, 4)))
+        self.assertIsNone(self.buffer.pop_expired_sentence(now=5))
+
+    def test_sentence_end_in_middle(self):
+        """测试句子结束标点在片段中间时，剩余部分继续缓冲"""
+        self.assertIsNone(self.buffer.add("Roger, your signal", now=0))
+        self.assertEqual(self.buffer.add("is five nine. Name here", now=1), "Roger, your signal is five nine.")
+        self.assertEqual(self.buffer.get_pending_text(), "Name here")
+
+    def test_end_word_over(self):
+        """测试以over结尾的发言视为结束"""
+        self.assertEqual(self.buffer.add("back to you over", now=0), "back to you over")
+
+    def test_timeout_flush(self):
+        """测试超时后输出未结束的缓冲文本"""
+        self.buffer.add("QRZ who is", now=0)
+        self.assertIsNone(self.buffer.pop_expired(now=1.0))
+        self.assertEqual(self.buffer.pop_expired(now=2.5), "QRZ who is")
+        self.assertIsNone(self.buffer.pop_expired(now=5.0))
+
+    def test_time_until_expired(self):
+        """测试剩余等待时间从第一个片段开始计算"""
+        self.assertIsNone(self.buffer.time_until_expired(now=0))
+        self.buffer.add("QRZ who is", now=0)
+        self.buffer.add("calling", now=1.5)
+        self.assertAlmostEqual(self.buffer.time_until_expired(now=1.5), 0.5)
+        self.assertEqual(self.buffer.time_until_expired(now=3.0), 0.0)
+        self.buffer.pop_expired(now=3.0)
+        self.assertIsNone(self.buffer.time_until_expired(now=3.0))
+
+    def test_decimal_not_sentence_end(self):
+        """测试频率中的小数点不作为句子结束"""
+        self.assertIsNone(self.buffer.add("QSY to 14.230", now=0))
+
+    def test_max_chars(self):
+        """测试缓冲文本过长时直接输出"""
+        buffer = SentenceBuffer(max_chars=20)
+        self.assertIsNone(buffer.add("this is a long", now=0))
+        self.assertEqual(buffer.add("fragment without end", now=0), "this is a long fragment without end")
+
+if __name__ == "__main__":
+    unittest.main()
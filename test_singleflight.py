@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+from translation.singleflight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    """测试并发请求合并功能"""
+
+    def setUp(self):
+        """初始化测试环境"""
+        self.flight = SingleFlight()
+
+    def test_concurrent_calls_share_result(self):
+        """测试并发的相同请求只执行一次后端调用"""
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def backend():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return "CQ（通用呼叫）"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(self.flight.do(("CQ", "zh-cn"), backend)))
+        leader.start()
+        started.wait(2)
+
+        followers = [threading.Thread(target=lambda: results.append(self.flight.do(("CQ", "zh-cn"), backend)))
+                     for _ in range(4)]
+        for t in followers:
+            t.start()
+        # 等待所有跟随者进入等待状态
+        deadline = time.time() + 2
+        while self.flight.get_stats()["shared"] < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+
+        for t in [leader] + followers:
+            t.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["CQ（通用呼叫）"] * 5)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    def test_different_keys_not_merged(self):
+        """测试不同的 (文本, 目标语言) 不会被合并"""
+        self.assertEqual(self.flight.do(("73", "zh-cn"), lambda: "a"), "a")
+        self.assertEqual(self.flight.do(("73", "en"), lambda: "b"), "b")
+        self.assertEqual(self.flight.get_stats()["executed"], 2)
+
+    def test_error_propagates_and_key_released(self):
+        """测试异常传递给调用者，且调用结束后键被释放"""
+        def failing():
+            raise RuntimeError("backend down")
+
+        with self.assertRaises(RuntimeError):
+            self.flight.do(("QRZ", "zh-cn"), failing)
+
+        # 完成后再次调用应重新执行
+        self.assertEqual(self.flight.do(("QRZ", "zh-cn"), lambda: "ok"), "ok")
+        self.assertEqual(self.flight.in_flight(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
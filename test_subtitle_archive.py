@@ -0,0 +1,67 @@
+import os
+import gzip
+import tempfile
+import unittest
+from translation.subtitle_archive import FileCompressor, compress_file, open_subtitle_file
+from translation.subtitle_file_manager import SubtitleFileManager
+from translation.subtitle_index import SubtitleIndex, parse_srt
+
+class TestSubtitleArchive(unittest.TestCase):
+    """测试字幕文件轮换和压缩"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_compress_and_read(self):
+        """测试压缩后删除原文件，读取时流式解压"""
+        with open("sample.srt", 'w', encoding='utf-8') as f:
+            f.write("1\n00:00:01,000 --> 00:00:04,000\nQRZ?\n谁在呼叫我?\n\n")
+        path = compress_file("sample.srt")
+        self.assertEqual(path, "sample.srt.gz")
+        self.assertFalse(os.path.exists("sample.srt"))
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith("1\n"))
+        self.assertEqual(parse_srt(path), [(1, 1000, 4000, "QRZ?", "谁在呼叫我?")])
+
+        compressor = FileCompressor("gzip")
+        with open("other.txt", 'w', encoding='utf-8') as f:
+            f.write("73\n")
+        compressor.submit(["other.txt"])
+        compressor.wait()
+        with open_subtitle_file("other.txt.gz") as f:
+            self.assertEqual(f.read(), "73\n")
+
+    def test_rotation_and_index(self):
+        """测试字幕文件达到大小限制后轮换，关闭的文件压缩后仍能导入索引"""
+        manager = SubtitleFileManager(max_file_bytes=100, compression="gzip")
+        manager.start_recording()
+        for i in range(6):
+            manager.add_subtitle(f"CQ CQ this is BG7YYK calling number {i}")
+        manager.stop_recording()
+        manager.compressor.wait()
+
+        names = sorted(os.listdir("Subtitles"))
+        self.assertTrue(all(name.endswith(".srt.gz") for name in names))
+        self.assertGreater(len(names), 1)
+        # 每个文件的字幕从序号1开始，时间相对于文件起点
+        cues = [cue for name in names for cue in parse_srt(os.path.join("Subtitles", name))]
+        self.assertEqual(len(cues), 6)
+        self.assertTrue(all(cue[1] < 1000 for cue in cues))
+
+        index = SubtitleIndex(os.path.join(self.temp_dir.name, "index.db"))
+        try:
+            self.assertEqual(index.index_directory("Subtitles"), (len(names), 6))
+            results = index.search("number 5")
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0]["session"] + ".srt.gz", names[-1])
+        finally:
+            index.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+import json
+import tempfile
+import threading
+import unittest
+from translation.subtitle_file_manager import SubtitleFileManager
+from translation.sentence_buffer import SentenceBuffer
+
+class TestSubtitleFileManager(unittest.TestCase):
+    """测试字幕文件保存"""
+
+    def setUp(self):
+        """在临时目录中初始化字幕文件管理器"""
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.manager = SubtitleFileManager()
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_extra_translation_tracks(self):
+        """测试其他目标语言的译文保存为单独的字幕文件"""
+        self.manager.start_recording()
+        main_file = self.manager.current_file
+        self.manager.add_subtitle("CQ CQ this is BG7YYK")
+        self.manager.add_subtitle("CQ CQ this is BG7YYK", "CQ CQ 这里是BG7YYK", {"ja": "CQ CQ こちらはBG7YYK"})
+        self.manager.add_subtitle("QRZ?", "QRZ（谁在呼叫我）?")
+        self.manager.stop_recording()
+
+        base_name, ext = os.path.splitext(main_file)
+        main_content = self.read(main_file)
+        ja_content = self.read(f"{base_name}.ja{ext}")
+
+        self.assertIn("CQ CQ 这里是BG7YYK", main_content)
+        self.assertIn("QRZ（谁在呼叫我）?", main_content)
+        self.assertIn("CQ CQ こちらはBG7YYK", ja_content)
+        self.assertNotIn("这里是", ja_content)
+        # 日语轨道仍包含所有原文条目
+        self.assertEqual(ja_content.count(" --> "), 2)
+
+    def test_streaming_multiple_formats(self):
+        """测试多种格式同时写入，字幕确定后立即写入文件"""
+        manager = SubtitleFileManager(["srt", "vtt", "ass", "jsonl"])
+        manager.start_recording()
+        base_name = os.path.splitext(manager.current_file)[0]
+        manager.add_subtitle("CQ <test>", metadata={"language": "en", "recognition_delay_ms": 320, "confidence": 0.9})
+        manager.add_subtitle("CQ <test>", "CQ（测试）", metadata={"translation_delay_ms": 150})
+        manager.add_subtitle("QRZ?")
+
+        # 第一条字幕已经确定并写入，第二条的译文还可能更新
+        self.assertEqual(self.read(base_name + ".srt").count(" --> "), 1)
+        record = json.loads(self.read(base_name + ".jsonl").splitlines()[0])
+        self.assertEqual((record["original"], record["translation"], record["language"]), ("CQ <test>", "CQ（测试）", "en"))
+        self.assertEqual((record["recognition_delay_ms"], record["translation_delay_ms"], record["confidence"]), (320, 150, 0.9))
+
+        manager.add_subtitle("QRZ?", "QRZ（谁在呼叫我）?", {"ja": "QRZ（誰ですか）?"})
+        manager.stop_recording()
+
+        vtt = self.read(base_name + ".vtt")
+        self.assertTrue(vtt.startswith("WEBVTT\n\n"))
+        self.assertIn("CQ &lt;test&gt;\nCQ（测试）\n", vtt)
+        self.assertIn("00:00:00.000 --> 00:00:03.000", vtt)
+        ass = self.read(base_name + ".ass")
+        self.assertIn(",Original,,0,0,0,,QRZ?\n", ass)
+        self.assertIn(",Translation,,0,0,0,,QRZ（谁在呼叫我）?\n", ass)
+        # 日语轨道补写了之前的字幕，JSONL只有一个文件
+        self.assertEqual(self.read(base_name + ".ja.ass").count("Dialogue: 0,"), 3)
+        self.assertFalse(os.path.exists(base_name + ".ja.jsonl"))
+        lines = self.read(base_name + ".jsonl").splitlines()
+        self.assertEqual(json.loads(lines[1])["translations"], {"ja": "QRZ（誰ですか）?"})
+
+    def test_segment_ids(self):
+        """测试按识别分段ID记录：相同原文分别记录，较早字幕的译文在写入前到达也能保存"""
+        self.manager.start_recording()
+        main_file = self.manager.current_file
+        self.assertEqual(self.manager.add_subtitle("QRZ?", segment_id=1), 0)
+        self.assertEqual(self.manager.add_subtitle("QRZ?", segment_id=2), 1)
+        self.manager.add_subtitle("73", segment_id=3)
+        # 第一条还在等待译文，没有写入文件
+        self.assertEqual(self.manager.written_count, 0)
+        self.assertEqual(self.manager.update_translation(2, "谁在呼叫我（第二次）?"), 1)
+        self.assertEqual(self.manager.update_translation(1, "谁在呼叫我?"), 0)
+        self.assertEqual(self.manager.written_count, 2)
+        # 已经写入文件的字幕不再更新
+        self.assertIsNone(self.manager.update_translation(1, "changed"))
+        self.assertIsNone(self.manager.update_translation(99, "unknown"))
+
+        # 没有译文的字幕在等待时间内不写入，停止记录时全部写入
+        for segment_id in range(4, 10):
+            self.manager.add_subtitle(f"CQ {segment_id}", segment_id=segment_id)
+        self.assertEqual(self.manager.written_count, 2)
+        self.manager.stop_recording()
+
+        content = self.read(main_file)
+        self.assertEqual(content.count(" --> "), 9)
+        self.assertIn("QRZ?\n谁在呼叫我?\n", content)
+        self.assertIn("QRZ?\n谁在呼叫我（第二次）?\n", content)
+        self.assertNotIn("changed", content)
+
+    def test_late_translation_saved(self):
+        """测试之后已有多条字幕时才到达的译文仍然保存，等待超时的字幕不带译文写入"""
+        self.manager.start_recording()
+        main_file = self.manager.current_file
+        for segment_id in range(1, 11):
+            self.manager.add_subtitle(f"CQ {segment_id}", segment_id=segment_id)
+        self.assertEqual(self.manager.written_count, 0)
+        self.assertEqual(self.manager.update_translation(1, "CQ 1（晚到的译文）"), 0)
+        self.assertEqual(self.manager.written_count, 1)
+
+        # 超过等待时间后，没有译文的字幕在下一条字幕到达时写入
+        self.manager.translation_wait_ns = 0
+        self.manager.add_subtitle("QRZ?", segment_id=11)
+        self.assertEqual(self.manager.written_count, 10)
+        self.assertIsNone(self.manager.update_translation(2, "too late"))
+        self.manager.stop_recording()
+
+        content = self.read(main_file)
+        self.assertIn("CQ 1\nCQ 1（晚到的译文）\n", content)
+        self.assertNotIn("too late", content)
+        self.assertEqual(content.count(" --> "), 11)
+
+    def test_concurrent_add_and_update(self):
+        """测试识别线程添加字幕、界面线程同时更新译文时每条字幕只写入一次"""
+        manager = SubtitleFileManager(max_file_bytes=2000)
+        manager.start_recording()
+        added = threading.Event()
+
+        def add():
+            for segment_id in range(1, 301):
+                manager.add_subtitle(f"CQ {segment_id}", segment_id=segment_id)
+            added.set()
+
+        def update():
+            segment_id = 1
+            while segment_id <= 300:
+                if manager.update_translation(segment_id, f"译文 {segment_id}") is not None or added.is_set():
+                    segment_id += 1
+
+        threads = [threading.Thread(target=add), threading.Thread(target=update)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        manager.stop_recording()
+
+        content = "".join(self.read(os.path.join("Subtitles", name)) for name in os.listdir("Subtitles"))
+        self.assertEqual(content.count(" --> "), 300)
+        for segment_id in (1, 150, 300):
+            self.assertEqual(content.count(f"CQ {segment_id}\n"), 1)
+
+    def test_multi_segment_sentence_translation(self):
+        """测试由多个识别分段拼成的句子，译文只保存到最后一个分段的字幕"""
+        buffer = SentenceBuffer()
+        self.manager.start_recording()
+        main_file = self.manager.current_file
+        sentence = None
+        for segment_id, fragment in enumerate(["CQ CQ this is", "BG7YYK calling."], start=1):
+            self.manager.add_subtitle(fragment, segment_id=segment_id)
+            sentence = buffer.add_segment(fragment, segment_id, now=0)
+        self.assertEqual(sentence.segment_ids, (1, 2))
+        self.assertEqual(buffer.pending_segment_ids(), ())
+        self.assertIsNotNone(self.manager.update_sentence_translation(sentence.segment_ids, "CQ CQ 这里是BG7YYK在呼叫。"))
+        # 第一个分段的字幕不再等待译文
+        self.assertEqual(self.manager.written_count, 1)
+        self.manager.stop_recording()
+
+        content = self.read(main_file)
+        self.assertEqual(content.count("CQ CQ 这里是BG7YYK在呼叫。"), 1)
+        self.assertIn("BG7YYK calling.\nCQ CQ 这里是BG7YYK在呼叫。\n", content)
+
+    def test_segment_spanning_sentences(self):
+        """测试分段中间有句子结束时，两个句子的译文都保存到该分段的字幕"""
+        buffer = SentenceBuffer()
+        translations = {"Hello there.": "你好。", "How are you?": "你好吗？", "I am": "我是"}
+        self.manager.start_recording()
+        main_file = self.manager.current_file
+
+        def translate(sentence):
+            continued = sentence.segment_ids[-1] in buffer.pending_segment_ids()
+            self.manager.update_sentence_translation(sentence.segment_ids, translations[sentence.text],
+                                                     extra_translations={"ja": sentence.text},
+                                                     continued=continued)
+
+        for segment_id, fragment in enumerate(["Hello there. How", "are you? I am"], start=1):
+            self.manager.add_subtitle(fragment, segment_id=segment_id)
+            translate(buffer.add_segment(fragment, segment_id, now=0))
+        self.manager.add_subtitle("fine", segment_id=3)
+        # 第二个分段的剩余部分还在缓冲区中，字幕等待下一个句子的译文
+        self.assertEqual(self.manager.written_count, 1)
+        translate(buffer.pop_expired_sentence(now=100))
+        self.assertEqual(self.manager.written_count, 2)
+        self.manager.stop_recording()
+
+        content = self.read(main_file)
+        self.assertIn("Hello there. How\n你好。\n", content)
+        self.assertIn("are you? I am\n你好吗？ 我是\n", content)
+        self.assertIn("are you? I am\nHow are you? I am\n", self.read(main_file.replace(".srt", ".ja.srt")))
+
+if __name__ == "__main__":
+    unittest.main()
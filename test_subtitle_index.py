@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from translation.subtitle_file_manager import SubtitleFileManager
+from translation.subtitle_index import SubtitleIndex, main, parse_srt
+
+SAMPLE_SRT = """1
+00:00:01,000 --> 00:00:04,000
+CQ CQ this is BG7YYK
+CQ CQ 这里是BG7YYK
+
+2
+00:01:00,500 --> 00:01:03,500
+QRZ?
+
+"""
+
+class TestSubtitleIndex(unittest.TestCase):
+    """测试字幕全文索引"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.index = SubtitleIndex()
+
+    def tearDown(self):
+        self.index.close()
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def write_srt(self, name, content=SAMPLE_SRT):
+        path = os.path.join("Subtitles", name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_index_directory_incrementally(self):
+        """测试导入字幕目录，未变化的文件和其他语言轨道不重复导入"""
+        self.assertEqual(parse_srt(self.write_srt("subtitle_20240101_120000.srt"))[1], (2, 60500, 63500, "QRZ?", ""))
+        self.write_srt("subtitle_20240101_120000.ja.srt")
+        self.assertEqual(self.index.index_directory(), (1, 2))
+        self.assertEqual(self.index.index_directory(), (0, 0))
+
+        results = self.index.search("bg7yyk")
+        self.assertEqual(len(results), 1)
+        self.assertEqual((results[0]["session"], results[0]["cue_index"]), ("subtitle_20240101_120000", 1))
+        self.assertEqual(results[0]["translation"], "CQ CQ 这里是BG7YYK")
+        # 中文和短查询
+        self.assertEqual(len(self.index.search("这里是")), 1)
+        self.assertEqual([r["original"] for r in self.index.search("CQ")], ["CQ CQ this is BG7YYK"])
+        self.assertEqual(self.index.search('"quoted" %'), [])
+
+    def test_recording_ingests_cues(self):
+        """测试录制字幕时每条字幕写入文件的同时写入索引"""
+        manager = SubtitleFileManager(index=self.index)
+        manager.start_recording()
+        manager.add_subtitle("CQ CQ this is JA1ABC", metadata={"language": "en"})
+        manager.add_subtitle("", "")
+        manager.add_subtitle("QRZ?", "QRZ（谁在呼叫我）?")
+        self.assertEqual(self.index.get_stats()["cues"], 1)
+        manager.stop_recording()
+
+        results = self.index.search("谁在呼叫", language=None)
+        self.assertEqual([(r["cue_index"], r["original"]) for r in results], [(2, "QRZ?")])
+        self.assertEqual(self.index.search("ja1abc", language="en")[0]["cue_index"], 1)
+        self.assertEqual(self.index.search("ja1abc", language="zh"), [])
+        # 再导入录制生成的文件时不会重复
+        self.index.index_directory()
+        self.assertEqual(self.index.get_stats(), {"sessions": 1, "cues": 2})
+
+    def test_cli(self):
+        """测试命令行导入和查找"""
+        self.write_srt("subtitle_20240101_120000.srt")
+        self.index.close()
+        self.assertEqual(main(["index"]), 0)
+        self.assertEqual(main(["search", "BG7YYK", "--limit", "5"]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
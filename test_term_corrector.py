@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from translation.term_corrector import SymSpellIndex, TermCorrector, edit_distance
+from translation.term_manager import TermManager
+
+class TestTermCorrector(unittest.TestCase):
+    """测试识别错误的术语和呼号纠正"""
+
+    def setUp(self):
+        self.corrector = TermCorrector(["CQ", "QRZ", "QRM", "QRN", "73", "ROGER", "BG7YYK", "QSL CARD"])
+
+    def test_merge_split_terms(self):
+        """测试合并被拆开的术语和呼号"""
+        self.assertEqual(self.corrector.correct("Q are Z? this is BG 7 YYK."), "QRZ? this is BG7YYK.")
+        self.assertEqual(self.corrector.correct("B G seven Y Y K calling"), "BG7YYK calling")
+        self.assertEqual(self.corrector.correct("Q R M is heavy"), "QRM is heavy")
+        # 没有单个字母或大写单词时不合并普通短语
+        self.assertEqual(self.corrector.correct("see you later"), "see you later")
+        # 分开的数字不合并成纯数字术语
+        self.assertEqual(self.corrector.correct("it is 7 3 degrees"), "it is 7 3 degrees")
+        self.assertEqual(self.corrector.correct("seven three degrees"), "seven three degrees")
+
+    def test_correct_misspelled_terms(self):
+        """测试只在唯一最近候选时纠正拼写"""
+        self.assertEqual(self.corrector.correct("QZR please"), "QRZ please")
+        self.assertEqual(self.corrector.correct("ROGERR, over"), "ROGER, over")
+        # QRX 与 QRZ、QRM、QRN 距离相同，不纠正
+        self.assertEqual(self.corrector.correct("QRX"), "QRX")
+        # 符合呼号格式的单词和纯数字不纠正
+        self.assertEqual(self.corrector.correct("BG7YYX 599"), "BG7YYX 599")
+        self.assertEqual(self.corrector.get_stats(), {"merged": 0, "corrected": 2})
+
+    def test_symspell_index(self):
+        """测试删除字典与逐个计算编辑距离的结果相同"""
+        words = ["QRZ", "QRM", "QSL", "ROGER", "BG7YYK", "BA1AA"]
+        index = SymSpellIndex(words, max_distance=2)
+        for query in ["QRS", "RGOER", "BG7YK", "BA1", "XYZ"]:
+            distances = {word: edit_distance(query, word, 2) for word in words}
+            best = min(distances.values())
+            expected = [] if best > 2 else [(best, word) for word in sorted(words) if distances[word] == best]
+            self.assertEqual(index.lookup(query), expected)
+
+    def test_updated_index(self):
+        """测试增删单词得到的新索引与重新构建的结果相同，原索引不变"""
+        index = SymSpellIndex(["QRZ", "QSL", "ROGER"])
+        updated = index.updated(["QTH"], ["QSL"])
+        self.assertIs(updated.base, index)
+        self.assertEqual(index.lookup("QSK"), [(1, "QSL")])
+        self.assertEqual(updated.lookup("QSK"), [])
+        self.assertEqual(updated.lookup("QTX"), [(1, "QTH")])
+        again = updated.updated(["QSL"], ["QTH"])
+        self.assertIs(again.base, index)
+        self.assertEqual(again.lookup("QSK"), [(1, "QSL")])
+        self.assertEqual(again.lookup("QTX"), [])
+
+class TestTermManagerCorrection(unittest.TestCase):
+    """测试TermManager使用当前术语和已知呼号纠正"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.term_manager = TermManager()
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_corrector_built_with_snapshot(self):
+        """测试纠正器在加载术语时构建，与快照一起替换"""
+        snapshot = self.term_manager._snapshot
+        self.assertIsNotNone(snapshot.corrector)
+        with open(self.term_manager.term_file, 'w', encoding='utf-8') as f:
+            f.write('{"QTH": {"zh-cn": "QTH（位置）"}}')
+        self.assertTrue(self.term_manager.reload_terms())
+        self.assertIsNot(self.term_manager._snapshot.corrector, snapshot.corrector)
+        self.assertEqual(self.term_manager.correct_terms("Q T H"), "QTH")
+        self.assertEqual(self.term_manager.correct_terms("Q are Z"), "Q are Z")
+
+    def test_known_callsigns_and_term_updates(self):
+        """测试已知呼号和新增术语立即成为纠错目标"""
+        self.assertEqual(self.term_manager.correct_terms("Q are Z"), "QRZ")
+        self.assertEqual(self.term_manager.correct_terms("it is 7 3 degrees"), "it is 7 3 degrees")
+        self.assertEqual(self.term_manager.correct_terms("BG 7 YYK"), "BG 7 YYK")
+        self.term_manager.set_known_callsigns(["bg7yyk"])
+        self.assertEqual(self.term_manager.correct_terms("BG 7 YYK"), "BG7YYK")
+        self.term_manager.add_term("QTH", {"zh-cn": "QTH（位置）"})
+        self.assertEqual(self.term_manager.correct_terms("Q T H"), "QTH")
+        self.term_manager.remove_term("QRZ")
+        self.assertEqual(self.term_manager.correct_terms("Q are Z"), "Q are Z")
+        self.assertEqual(self.term_manager.correct_terms("BG 7 YYK"), "BG7YYK")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from translation.term_manager import TermManager
+
+class TestTermHotReload(unittest.TestCase):
+    """测试术语文件的热重载和快照替换"""
+
+    def setUp(self):
+        """在临时目录中初始化术语管理器（使用默认术语）"""
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.term_manager = TermManager()
+
+    def tearDown(self):
+        self.term_manager.stop_watching()
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def write_terms(self, terms):
+        with open(self.term_manager.term_file, 'w', encoding='utf-8') as f:
+            json.dump(terms, f, ensure_ascii=False)
+        # 确保修改时间与之前不同
+        stat = os.stat(self.term_manager.term_file)
+        os.utime(self.term_manager.term_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def test_watcher_reloads_after_file_settles(self):
+        """测试文件变化并稳定后重新加载术语"""
+        self.term_manager.start_watching(interval=60)
+        watcher = self.term_manager.watcher
+        version = self.term_manager.term_version
+        self.assertEqual(self.term_manager.direct_translate("CQ", "zh-cn"), "CQ（通用呼叫）")
+
+        self.write_terms({"CQ": {"zh-cn": "CQ（呼叫所有电台）"}, "QTH": {"zh-cn": "QTH（位置）"}})
+        # 第一次检查只记录变化，等待文件写完
+        self.assertFalse(watcher.check())
+        self.assertTrue(watcher.check())
+
+        self.assertGreater(self.term_manager.term_version, version)
+        self.assertEqual(self.term_manager.direct_translate("CQ qth", "zh-cn"), "CQ（呼叫所有电台） QTH（位置）")
+        self.assertFalse(watcher.check())
+
+    def test_invalid_file_keeps_previous_terms(self):
+        """测试文件格式错误时保留之前的术语"""
+        with open(self.term_manager.term_file, 'w', encoding='utf-8') as f:
+            f.write('{"CQ": ')
+        self.assertFalse(self.term_manager.reload_terms())
+        self.assertEqual(self.term_manager.direct_translate("CQ", "zh-cn"), "CQ（通用呼叫）")
+
+    def test_own_save_does_not_trigger_reload(self):
+        """测试程序自身保存术语文件不会触发重新加载"""
+        self.term_manager.start_watching(interval=60)
+        self.term_manager.add_term("qth", {"zh-cn": "QTH（位置）"})
+        version = self.term_manager.term_version
+        self.assertFalse(self.term_manager.watcher.check())
+        self.assertFalse(self.term_manager.watcher.check())
+        self.assertEqual(self.term_manager.term_version, version)
+        self.assertEqual(self.term_manager.direct_translate("qth", "zh-cn"), "QTH（位置）")
+
+    def test_edit_copies_only_affected_index(self):
+        """测试修改术语只复制受影响语言的索引，旧快照保持不变"""
+        old_indexes = dict(self.term_manager.term_indexes)
+        self.term_manager.add_term("qth", {"zh-cn": "QTH（位置）"})
+        indexes = self.term_manager.term_indexes
+        self.assertIs(indexes["en"], old_indexes["en"])
+        self.assertIsNot(indexes["zh-cn"], old_indexes["zh-cn"])
+        self.assertNotIn("QTH", old_indexes["zh-cn"])
+        self.assertEqual(indexes["zh-cn"].replace("my qth"), "my QTH（位置）")
+
+        self.term_manager.remove_term("cq")
+        self.assertIsNone(self.term_manager.get_term_index("en").lookup("CQ"))
+        self.assertEqual(self.term_manager.direct_translate("CQ QTH", "zh-cn"), "CQ QTH（位置）")
+
+    def test_translation_during_reload(self):
+        """测试翻译线程在术语不断替换时只看到完整的新旧快照"""
+        old_terms = {"CQ": {"zh-cn": "旧CQ"}, "QRZ": {"zh-cn": "旧QRZ"}}
+        new_terms = {"CQ": {"zh-cn": "新CQ"}, "QRZ": {"zh-cn": "新QRZ"}}
+        self.write_terms(old_terms)
+        self.term_manager.reload_terms()
+
+        results = set()
+        errors = []
+        stop = threading.Event()
+
+        def translate():
+            while not stop.is_set():
+                try:
+                    text, replacements = self.term_manager.preprocess_ham_radio_terms("CQ QRZ", "zh-cn")
+                    results.add(self.term_manager.restore_ham_radio_terms(text, replacements))
+                except Exception as e:
+                    errors.append(e)
+
+        thread = threading.Thread(target=translate)
+        thread.start()
+        for i in range(50):
+            self.write_terms(new_terms if i % 2 == 0 else old_terms)
+            self.term_manager.reload_terms()
+        stop.set()
+        thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(results <= {"旧CQ 旧QRZ", "新CQ 新QRZ"}, results)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from translation.term_index import TermIndex
+
+class TestTermIndex(unittest.TestCase):
+    """测试按目标语言构建的术语索引"""
+
+    def setUp(self):
+        """初始化测试环境"""
+        self.terms = {
+            "CQ": {"zh-cn": "CQ（通用呼叫）", "en": "CQ (general call)"},
+            "QRZ": {"zh-cn": "QRZ（谁在呼叫我）", "en": "QRZ (who is calling me)"},
+            "ROGER": {"zh-cn": "收到，明白", "en": "Roger"},
+            "QSL": {"en": "QSL (I confirm receipt)"},
+        }
+        self.index = TermIndex("zh-cn", self.terms)
+
+    def test_only_terms_with_translation(self):
+        """测试索引只包含有该语言译文的术语"""
+        self.assertEqual(len(self.index), 3)
+        self.assertNotIn("QSL", self.index)
+        self.assertEqual(self.index.lookup("roger"), "收到，明白")
+        self.assertIsNone(self.index.lookup("hello"))
+
+    def test_replace(self):
+        """测试一次扫描替换文本中的术语"""
+        self.assertEqual(self.index.replace("cq cq, QRZ? roger"),
+                         "CQ（通用呼叫） CQ（通用呼叫）, QRZ（谁在呼叫我）? 收到，明白")
+
+    def test_incremental_add(self):
+        """测试添加术语后无需重建即可查找和匹配"""
+        self.index.add("QTH", {"zh-cn": "QTH（位置）"})
+        self.assertEqual(self.index.lookup("qth"), "QTH（位置）")
+        self.assertEqual(self.index.replace("my qth is"), "my QTH（位置） is")
+
+        # 更新已有术语的译文
+        self.index.add("CQ", {"zh-cn": "CQ"})
+        self.assertEqual(self.index.replace("CQ CQ"), "CQ CQ")
+
+        # 译文中没有该语言时从索引中移除
+        self.index.add("ROGER", {"en": "Roger"})
+        self.assertNotIn("ROGER", self.index)
+        self.assertEqual(self.index.replace("roger"), "roger")
+
+    def test_remove_translations(self):
+        """测试去掉已翻译的术语译文时不切开单词，删除术语后不再去掉其译文"""
+        index = TermIndex("en", self.terms)
+        self.assertEqual(index.remove_translations("CQ (general call) Rogers", "|"), "| Rogers")
+        self.assertEqual(index.remove_translations("__TERM_0__ (who is calling me)?", "|"), "__TERM_0__ |?")
+        index.remove("ROGER")
+        self.assertEqual(index.remove_translations("Roger", "|"), "Roger")
+
+    def test_incremental_remove(self):
+        """测试删除术语后不再匹配"""
+        self.index.remove("QRZ")
+        self.assertIsNone(self.index.lookup("QRZ"))
+        self.assertEqual(self.index.replace("QRZ? CQ"), "QRZ? CQ（通用呼叫）")
+        # 删除后重新添加
+        self.index.add("QRZ", {"zh-cn": "谁在呼叫"})
+        self.assertEqual(self.index.replace("QRZ?"), "谁在呼叫?")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import re
+import unittest
+from translation.term_matcher import AhoCorasickMatcher, LayeredMatcher
+from translation.term_manager import TermManager
+
+class TestAhoCorasickMatcher(unittest.TestCase):
+    """测试Aho-Corasick术语匹配"""
+
+    def test_word_boundary_and_case(self):
+        """测试单词边界和大小写不敏感"""
+        matcher = AhoCorasickMatcher(["QRZ", "73", "CQ"])
+        text = "qrz? CQ73 cq 73, ACQ"
+        self.assertEqual([text[s:e] for s, e, _ in matcher.find(text)], ["qrz", "cq", "73"])
+
+    def test_longest_match_preferred(self):
+        """测试重叠时优先选择最长的术语"""
+        matcher = AhoCorasickMatcher(["QSL", "QSL CARD", "CARD"])
+        self.assertEqual([term for _, _, term in matcher.find("send QSL card please")], ["QSL CARD"])
+
+    def test_terms_with_punctuation(self):
+        """测试以非单词字符开头或结尾的术语与正则\\b语义一致"""
+        for term in ["5/9", "R.S.T", "+10"]:
+            pattern = re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE)
+            matcher = AhoCorasickMatcher([term])
+            for text in ["report 5/9 ok", "r.s.t is", "a+10", "+10 db", "x 5/9x"]:
+                expected = [(m.start(), m.end()) for m in pattern.finditer(text)]
+                actual = [(s, e) for s, e, _ in matcher.find(text)]
+                self.assertEqual(actual, expected, f"{term!r} in {text!r}")
+
+    def test_matches_regex_on_random_text(self):
+        """测试随机文本上与逐个术语正则匹配的结果一致"""
+        rng = random.Random(1)
+        alphabet = "ab1 _.,"
+        terms = sorted({''.join(rng.choice("ab1") for _ in range(rng.randint(1, 3))) for _ in range(10)})
+        matcher = AhoCorasickMatcher(terms)
+        for _ in range(300):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            expected = set()
+            for term in terms:
+                for m in re.finditer(r'\b' + re.escape(term) + r'\b', text, re.IGNORECASE):
+                    expected.add((m.start(), m.end(), term))
+            self.assertEqual(set(matcher.find_all(text)), expected, f"text={text!r}")
+
+    def test_layered_matches_rebuilt_matcher(self):
+        """测试增量添加和删除术语后与重新构建的自动机结果相同，副本互不影响"""
+        rng = random.Random(2)
+        words = sorted({''.join(rng.choice("ab1") for _ in range(rng.randint(1, 3))) for _ in range(30)})
+        terms = set(words[:10])
+        matcher = LayeredMatcher(AhoCorasickMatcher(terms))
+        matcher.MIN_COMPACT_SIZE = 4
+        for _ in range(200):
+            word = rng.choice(words)
+            if word in terms:
+                terms.discard(word)
+                self.assertTrue(matcher.remove(word))
+            else:
+                terms.add(word)
+                matcher.add(word)
+            previous, matcher = matcher, matcher.copy()
+            matcher.build()
+            expected = AhoCorasickMatcher(terms)
+            text = ' '.join(rng.choice(words) for _ in range(8))
+            self.assertEqual(sorted(matcher.find_all(text)), sorted(expected.find_all(text)))
+            self.assertEqual(matcher.term_count, len(terms))
+        # 修改副本不影响原匹配器
+        snapshot = previous.find_all(' '.join(words))
+        matcher.add("zzz")
+        for word in words:
+            matcher.remove(word)
+        self.assertEqual(previous.find_all(' '.join(words)), snapshot)
+
+    def test_preprocess_restores_same_text(self):
+        """测试术语预处理再还原后结果正确"""
+        term_manager = TermManager()
+        text = "CQ CQ this is BG7YYK calling, QRZ? Roger, 73"
+        processed, replacements = term_manager.preprocess_ham_radio_terms(text, "zh-cn")
+        self.assertNotIn("QRZ", processed)
+        # 呼号 BG7YYK 也被替换为占位符
+        self.assertNotIn("BG7YYK", processed)
+        self.assertEqual(processed.count("__TERM_"), 7)
+        self.assertEqual(len(replacements), 6)
+        restored = term_manager.restore_ham_radio_terms(processed, replacements)
+        self.assertEqual(restored, "CQ CQ this is BG7YYK 呼叫, QRZ（谁在呼叫我）? 收到，明白, 73（最好的祝福）")
+
+if __name__ == "__main__":
+    unittest.main()
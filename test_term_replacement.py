@@ -58,6 +58,29 @@ class TestTermReplacement(unittest.TestCase):
             result = self.term_manager.restore_ham_radio_terms(text, replacements)
             self.assertEqual(result, expected, f"Failed for input: '{text}'")
     
+    def test_placeholder_variants_in_one_pass(self):
+        """测试一次替换各种变形的占位符"""
+        replacements = {
+            "__TERM_0__": "QRZ（谁在呼叫我）",
+            "__TERM_1__": "呼叫",
+            "__TERM_10__": "73（最好的祝福）"
+        }
+        test_cases = [
+            ("__ TERM_0 __？谁是__TERM_1___？", "QRZ（谁在呼叫我）？谁是呼叫？"),
+            ("__TERM_10__ 和 __TERM_1__", "73（最好的祝福） 和 呼叫"),
+            # 未知的占位符保持原样
+            ("__TERM_9__ __TERM_0_", "__TERM_9__ QRZ（谁在呼叫我）"),
+        ]
+        for text, expected in test_cases:
+            result = self.term_manager.restore_ham_radio_terms(text, replacements)
+            self.assertEqual(result, expected, f"Failed for input: '{text}'")
+        
+        # 译文中的反斜杠按原样保留
+        self.assertEqual(
+            self.term_manager.restore_ham_radio_terms("__TERM_0__", {"__TERM_0__": "A\\1B"}),
+            "A\\1B"
+        )
+    
     def test_term_replacement_edge_cases(self):
         """测试术语替换的边缘情况"""
         # 测试空字典
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+import translation.term_manager as term_manager_module
+from translation.term_index import TermIndex
+from translation.term_manager import TermManager
+from translation.term_store import CompactTermStore, CompactTermIndex, EditedTermStore, compile_term_store
+
+class TestCompactTermStore(unittest.TestCase):
+    """测试内存映射的紧凑术语库"""
+
+    def setUp(self):
+        """在临时目录中编译测试术语"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.terms = {
+            "CQ": {"zh-cn": "CQ（通用呼叫）", "en": "CQ (general call)"},
+            "QSL": {"zh-cn": "QSL（确认收到）"},
+            "QSL CARD": {"zh-cn": "QSL卡片"},
+            "Roger": {"zh-cn": "收到，明白", "description": "表示已经收到"},
+            "73": {"en": "73 (best regards)"},
+        }
+        self.path = os.path.join(self.temp_dir.name, "terms.termstore")
+        compile_term_store(self.terms, self.path, (1, 2))
+        self.store = CompactTermStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_mapping_interface(self):
+        """测试作为只读术语词典使用，保持原始顺序"""
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(list(self.store), list(self.terms))
+        self.assertEqual(self.store["Roger"], self.terms["Roger"])
+        self.assertIn("QSL CARD", self.store)
+        self.assertNotIn("ROGER", self.store)
+        self.assertEqual(CompactTermStore.read_source_state(self.path), (1, 2))
+
+    def test_same_results_as_term_index(self):
+        """测试查找和最长匹配的结果与TermIndex相同"""
+        text = "cq cq, send qsl card via roger? 73 QSL"
+        for lang in ("zh-cn", "en", "ja"):
+            expected = TermIndex(lang, self.terms)
+            index = CompactTermIndex(self.store, lang)
+            self.assertEqual(len(index), len(expected))
+            self.assertEqual(index.find(text), expected.find(text))
+            self.assertEqual(index.replace(text), expected.replace(text))
+            self.assertEqual(index.lookup("roger"), expected.lookup("roger"))
+            self.assertEqual(dict(index.translations.items()), dict(expected.translations.items()))
+            translated = expected.replace(text) + " QSL卡片们"
+            self.assertEqual(index.remove_translations(translated, "|"), expected.remove_translations(translated, "|"))
+
+    def test_edits_override_store(self):
+        """测试编译之后的修改覆盖术语库中的条目，结果与用修改后的词典构建的TermIndex相同"""
+        edits = {"QTH": {"zh-cn": "QTH（位置）"}, "QSL CARD": None, "CQ": {"en": "CQ"}}
+        edited = EditedTermStore(self.store, edits)
+        terms = {term: translations for term, translations in self.terms.items() if term != "QSL CARD"}
+        terms.update(QTH=edits["QTH"], CQ=edits["CQ"])
+        self.assertEqual(dict(edited.items()), terms)
+        self.assertEqual(len(edited), len(terms))
+
+        text = "cq cq, send qsl card from my qth"
+        for lang in ("zh-cn", "en"):
+            expected = TermIndex(lang, terms)
+            index = CompactTermIndex(self.store, lang, edits)
+            self.assertEqual(len(index), len(expected))
+            self.assertEqual(index.find(text), expected.find(text))
+            self.assertEqual(index.replace(text), expected.replace(text))
+            self.assertEqual(dict(index.translations.items()), dict(expected.translations.items()))
+
+class TestTermManagerCompactBackend(unittest.TestCase):
+    """测试TermManager在术语较多时使用紧凑术语库"""
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.old_threshold = term_manager_module.COMPACT_STORE_MIN_TERMS
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        term_manager_module.COMPACT_STORE_MIN_TERMS = 3
+        # 先创建默认术语文件
+        TermManager()
+
+    def tearDown(self):
+        term_manager_module.COMPACT_STORE_MIN_TERMS = self.old_threshold
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_cache_reused_and_refreshed(self):
+        """测试缓存在术语文件未变化时复用，文件变化后重新编译"""
+        term_manager = TermManager()
+        stats = term_manager.get_load_stats()
+        self.assertEqual(stats["backend"], "compact")
+        self.assertEqual(stats["terms"], 4)
+        self.assertEqual(len(os.listdir(term_manager.cache_dir)), 1)
+        self.assertEqual(term_manager.direct_translate("cq qrz", "zh-cn"), "CQ（通用呼叫） QRZ（谁在呼叫我）")
+
+        # 第二次加载直接映射已有缓存
+        term_manager = TermManager()
+        self.assertEqual(term_manager.get_load_stats()["backend"], "compact")
+        text, replacements = term_manager.preprocess_ham_radio_terms("QRZ? 73", "zh-cn")
+        self.assertEqual(term_manager.restore_ham_radio_terms(text, replacements), "QRZ（谁在呼叫我）? 73（最好的祝福）")
+
+        # 添加术语时不重新编译，修改立即生效并保存到术语文件
+        term_manager.add_term("qth", {"zh-cn": "QTH（位置）"})
+        self.assertEqual(term_manager.direct_translate("QTH", "zh-cn"), "QTH（位置）")
+        self.assertEqual(term_manager.direct_translate("CQ", "zh-cn"), "CQ（通用呼叫）")
+        self.assertEqual(len(term_manager.terms), 5)
+        self.assertEqual(os.listdir(term_manager.cache_dir), [os.path.basename(term_manager.terms.path)])
+        with open(term_manager.term_file, encoding='utf-8') as f:
+            self.assertIn("QTH", json.load(f))
+
+        # 下次加载时重新编译，旧缓存被删除
+        term_manager = TermManager()
+        self.assertEqual(term_manager.get_load_stats()["terms"], 5)
+        self.assertEqual(term_manager.direct_translate("QTH", "zh-cn"), "QTH（位置）")
+        self.assertEqual(os.listdir(term_manager.cache_dir), [os.path.basename(term_manager.terms.path)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from translation.term_index import TermIndex
+from translation.token_normalizer import TokenNormalizer
+from translation.term_manager import TermManager
+
+class TestTokenNormalizer(unittest.TestCase):
+    """测试单次扫描的信号报告、呼号和术语规范化"""
+
+    def setUp(self):
+        """初始化测试环境"""
+        self.normalizer = TokenNormalizer()
+
+    def test_signal_report_and_callsign(self):
+        """测试一次扫描同时处理信号报告和字母解释法呼号"""
+        test_cases = [
+            ("QRZ? This is Victor Echo 5 Alpha Alpha Echo. Signal report five nine nine",
+             "QRZ? This is VE 5 AAE. Signal report 599"),
+            ("Roger, your signal is five by nine. Over.", "Roger, your signal is 59. Over."),
+            ("bravo golf seven yankee yankee kilo five nine", "BG7YYK 59"),
+            ("Victor, Echo 5, Alpha, Alpha Echo", "VE 5 AAE"),
+            ("this is bg7yyk", "this is BG7YYK"),
+            ("one by two by three", "12 by three"),
+        ]
+        for text, expected in test_cases:
+            self.assertEqual(self.normalizer.normalize(text), expected, text)
+
+    def test_term_manager_normalize_text(self):
+        """测试TermManager.normalize_text与先处理信号报告、再处理呼号的结果一致"""
+        term_manager = TermManager()
+        texts = [
+            "alpha bravo two five nine golf",
+            "five by nine kilo x-ray seven",
+            "Golf Echo nine nine by two Alpha",
+        ]
+        expected = ["AB 259 golf", "59 KX7", "GE 992 Alpha"]
+        for text, result in zip(texts, expected):
+            self.assertEqual(self.normalizer.normalize(text), result, text)
+            self.assertEqual(term_manager.normalize_text(text), result, text)
+
+    def test_term_translation_in_same_pass(self):
+        """测试指定术语索引时整词替换为译文"""
+        index = TermIndex("zh-cn", {"73": {"zh-cn": "73（最好的祝福）"}, "CQ": {"zh-cn": "CQ（通用呼叫）"}})
+        self.assertEqual(self.normalizer.normalize("cq seven three", term_index=index),
+                         "CQ（通用呼叫） 73（最好的祝福）")
+        # 带标点的单词与direct_translate一样不做整词替换
+        self.assertEqual(self.normalizer.normalize("cq, 73", term_index=index), "cq, 73（最好的祝福）")
+
+    def test_options(self):
+        """测试单独关闭信号报告或呼号处理"""
+        text = "alpha bravo five nine"
+        self.assertEqual(self.normalizer.normalize(text, signal_reports=False), "AB59")
+        self.assertEqual(self.normalizer.normalize(text, phonetic_callsigns=False), "alpha bravo 59")
+        self.assertEqual(self.normalizer.normalize(""), "")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from translation.term_manager import TermManager
+
+class TestTranslatableContent(unittest.TestCase):
+    """测试只包含术语和呼号的文本跳过翻译API"""
+
+    def setUp(self):
+        """初始化测试环境"""
+        self.term_manager = TermManager()
+
+    def preprocess(self, text, lang):
+        """按SubtitleManager.translate的步骤1-4处理文本"""
+        processed = self.term_manager.extract_and_convert_signal_report(text)
+        processed = self.term_manager.direct_translate(processed, lang)
+        processed = self.term_manager.extract_and_convert_phonetic_callsign(processed)
+        preprocessed, _ = self.term_manager.preprocess_ham_radio_terms(processed, lang)
+        return preprocessed
+
+    def test_term_only_utterances(self):
+        """测试只包含呼号、信号报告和Q简语的文本不需要翻译"""
+        test_cases = [
+            "BG7YYK 59 QSL 73",
+            "QRZ?",
+            "Roger, QSL 73.",
+            "bravo golf seven yankee yankee kilo five nine",
+        ]
+        for lang in ["zh-cn", "en", "ja"]:
+            for text in test_cases:
+                preprocessed = self.preprocess(text, lang)
+                self.assertFalse(self.term_manager.has_translatable_content(preprocessed, lang),
+                                 f"Failed for input: '{text}' ({lang}) -> '{preprocessed}'")
+
+    def test_utterances_with_words(self):
+        """测试包含普通文字的文本仍需要翻译"""
+        test_cases = [
+            "CQ CQ this is BG7YYK calling",
+            "Roger that",
+            "QRZ? Who is calling?",
+        ]
+        for text in test_cases:
+            preprocessed = self.preprocess(text, "zh-cn")
+            self.assertTrue(self.term_manager.has_translatable_content(preprocessed, "zh-cn"),
+                            f"Failed for input: '{text}' -> '{preprocessed}'")
+
+    def test_edge_cases(self):
+        """测试边缘情况"""
+        self.assertFalse(self.term_manager.has_translatable_content("", "zh-cn"))
+        self.assertFalse(self.term_manager.has_translatable_content("599 !!!", "zh-cn"))
+        self.assertFalse(self.term_manager.has_translatable_content("__ term_0_？", "zh-cn"))
+
+if __name__ == "__main__":
+    unittest.main()
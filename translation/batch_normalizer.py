@@ -0,0 +1,105 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from translation.term_snapshot import TermSnapshot
+from translation.term_store import CompactTermStore, EditedTermStore
+from translation.token_normalizer import TokenNormalizer
+
+# 使用多进程时每个进程至少处理的行数，行数较少时进程启动和传输的开销大于收益
+PROCESS_POOL_MIN_LINES_PER_WORKER = 5000
+
+# 工作进程中的规范化器和术语索引，由_init_worker创建
+_worker_state = None
+
+
+def normalize_lines(normalizer, term_index, texts):
+    """
+    用同一个规范化器和术语索引规范化多行文本，重复的行只处理一次
+
+    参数:
+        normalizer (TokenNormalizer): 规范化器
+        term_index: 目标语言的术语索引，为None时不替换术语
+        texts (list): 文本列表
+
+    返回:
+        list: 规范化后的文本，与输入一一对应
+    """
+    seen = {}
+    results = []
+    for text in texts:
+        result = seen.get(text)
+        if result is None:
+            result = normalizer.normalize(text, term_index=term_index) if text else text
+            seen[text] = result
+        results.append(result)
+    return results
+
+
+def _init_worker(terms_source, lang_code):
+    """
+    工作进程初始化：根据术语来源构建快照和术语索引
+
+    参数:
+        terms_source: 术语词典，或紧凑术语库的路径和编译后的修改 ('store', 路径, {术语: 翻译字典或None})
+        lang_code (str): 规范化后的目标语言代码，为None时不替换术语
+    """
+    global _worker_state
+    if isinstance(terms_source, tuple):
+        _, path, edits = terms_source
+        terms_source = CompactTermStore(path)
+        if edits:
+            terms_source = EditedTermStore(terms_source, edits)
+    snapshot = TermSnapshot(terms_source)
+    term_index = snapshot.get_term_index(lang_code) if lang_code and len(snapshot) else None
+    _worker_state = (TokenNormalizer(), term_index)
+
+
+def _normalize_chunk(texts):
+    """在工作进程中规范化一批文本"""
+    normalizer, term_index = _worker_state
+    return normalize_lines(normalizer, term_index, texts)
+
+
+def normalize_in_pool(snapshot, lang_code, texts, workers):
+    """
+    将文本分块后在进程池中规范化，结果保持输入顺序
+
+    每个工作进程只在启动时接收一次术语（紧凑术语库只传递文件路径和编译后的修改，由进程自己映射）。
+
+    参数:
+        snapshot (TermSnapshot): 术语快照
+        lang_code (str): 规范化后的目标语言代码，为None时不替换术语
+        texts (list): 文本列表
+        workers (int): 进程数
+
+    返回:
+        list: 规范化后的文本
+    """
+    if snapshot.is_compact:
+        terms_source = ('store', snapshot.terms.path, getattr(snapshot.terms, 'edits', None))
+    else:
+        terms_source = dict(snapshot.terms)
+    # 每个进程分到约4块，处理快的进程可以多领取
+    chunk_size = max(1, math.ceil(len(texts) / (workers * 4)))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(terms_source, lang_code)) as executor:
+        for chunk_result in executor.map(_normalize_chunk, chunks):
+            results.extend(chunk_result)
+    return results
+
+
+def make_batch_stats(lines, elapsed, workers):
+    """
+    生成批量处理的统计信息
+
+    返回:
+        dict: {"lines": 行数, "seconds": 耗时, "lines_per_second": 每秒行数, "workers": 进程数}
+    """
+    return {
+        "lines": lines,
+        "seconds": elapsed,
+        "lines_per_second": lines / elapsed if elapsed > 0 else float(lines),
+        "workers": workers,
+    }
+
@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import threading
+
+# 随程序发布的ITU呼号前缀分配表
+DEFAULT_PREFIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "itu_prefixes.json")
+
+# 呼号结构：前缀（1-3个字符，至少一个字母）+ 分区数字 + 后缀（1-4个字符，以字母结尾）
+CALLSIGN_SHAPE = re.compile(r'^[A-Z0-9]{3,8}$')
+CALLSIGN_SUFFIX = re.compile(r'[A-Z0-9]{0,3}[A-Z]$')
+# 可能是呼号的单词（字母和数字组成，不与其他字母、数字或下划线相连）
+CALLSIGN_CANDIDATE = re.compile(r'(?<!\w)[A-Za-z0-9]{3,8}(?!\w)')
+
+
+class _TrieNode:
+    """前缀树节点"""
+    __slots__ = ('children', 'entity')
+
+    def __init__(self):
+        self.children = {}
+        self.entity = None
+
+
+class CallsignPrefixIndex:
+    """
+    ITU呼号前缀索引
+
+    用前缀树保存ITU分配给各国家和地区的呼号前缀，按呼号逐个字符查找最长的已分配前缀，
+    一次遍历（O(呼号长度)）完成呼号验证和所属实体查询。
+    """
+
+    def __init__(self, prefixes, entities=None):
+        """
+        参数:
+            prefixes (dict): {前缀或前缀范围: 实体}，范围如 "AA-AL"（两端只有最后一个字符不同）
+            entities (dict): {实体: {语言代码: 名称}}
+        """
+        self.root = _TrieNode()
+        self.entities = entities or {}
+        for series, entity in prefixes.items():
+            for prefix in self._expand(series):
+                self._insert(prefix, entity)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PREFIX_FILE):
+        """
+        从前缀分配表文件加载
+
+        参数:
+            path (str): JSON文件路径，格式为 {"entities": {...}, "prefixes": {...}}
+
+        返回:
+            CallsignPrefixIndex: 前缀索引
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get("prefixes", {}), data.get("entities", {}))
+
+    @staticmethod
+    def _expand(series):
+        """将前缀范围展开为前缀列表，如 "AA-AC" -> ["AA", "AB", "AC"]"""
+        series = series.upper()
+        if '-' not in series:
+            return [series]
+        first, last = series.split('-', 1)
+        if len(first) != len(last) or first[:-1] != last[:-1]:
+            raise ValueError(f"无效的前缀范围: {series}")
+        return [first[:-1] + chr(code) for code in range(ord(first[-1]), ord(last[-1]) + 1)
+                if chr(code).isalnum()]
+
+    def _insert(self, prefix, entity):
+        """添加前缀"""
+        node = self.root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        node.entity = entity
+
+    def longest_prefix(self, text):
+        """
+        查找文本开头最长的已分配前缀
+
+        参数:
+            text (str): 大写的呼号或前缀
+
+        返回:
+            tuple: (前缀, 实体)，没有已分配的前缀时返回 (None, None)
+        """
+        node = self.root
+        match = (None, None)
+        for i, char in enumerate(text):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.entity is not None:
+                match = (text[:i + 1], node.entity)
+        return match
+
+    def lookup(self, callsign):
+        """
+        验证呼号并查询所属实体
+
+        呼号需要符合ITU呼号结构，并且分区数字之前的前缀属于已分配的前缀。
+
+        参数:
+            callsign (str): 呼号（不区分大小写）
+
+        返回:
+            dict: {"callsign": 大写呼号, "prefix": 已分配前缀, "entity": 实体}，不是有效呼号时返回None
+        """
+        callsign = callsign.upper()
+        if not CALLSIGN_SHAPE.match(callsign):
+            return None
+        # 前缀可能是1-3个字符，如 K1A 的前缀是 K，A61XX 的前缀是 A6，3DA0XX 的前缀是 3DA
+        for length in (1, 2, 3):
+            head = callsign[:length]
+            if (len(callsign) < length + 2 or not callsign[length].isdigit() or head.isdigit()
+                    or not CALLSIGN_SUFFIX.match(callsign, length + 1)):
+                continue
+            prefix, entity = self.longest_prefix(head)
+            # 3个字符的前缀需要整个被分配
+            if entity is not None and (length < 3 or prefix == head):
+                return {"callsign": callsign, "prefix": prefix, "entity": entity}
+        return None
+
+    def is_callsign(self, text):
+        """是否是有效的呼号"""
+        return self.lookup(text) is not None
+
+    def get_entity_name(self, entity, lang_code='zh-cn'):
+        """
+        获取实体在指定语言中的名称
+
+        参数:
+            entity (str): 实体
+            lang_code (str): 语言代码（如 'zh-cn', 'en'），没有该语言时使用英文名称
+
+        返回:
+            str: 实体名称
+        """
+        names = self.entities.get(entity, {})
+        return names.get(lang_code) or names.get('en') or entity
+
+    def find_callsigns(self, text):
+        """
+        查找文本中的所有有效呼号
+
+        参数:
+            text (str): 文本
+
+        返回:
+            list: [(开始位置, 结束位置, lookup的结果), ...]
+        """
+        results = []
+        for match in CALLSIGN_CANDIDATE.finditer(text):
+            info = self.lookup(match.group(0))
+            if info is not None:
+                results.append((match.start(), match.end(), info))
+        return results
+
+    def replace(self, text, replace_func):
+        """
+        一次扫描替换文本中的所有有效呼号
+
+        参数:
+            text (str): 文本
+            replace_func (callable): 签名为 (lookup的结果, 匹配到的原文) -> 替换文本
+
+        返回:
+            str: 替换后的文本
+        """
+        def replace(match):
+            info = self.lookup(match.group(0))
+            return match.group(0) if info is None else replace_func(info, match.group(0))
+
+        return CALLSIGN_CANDIDATE.sub(replace, text)
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_callsign_index():
+    """
+    获取使用内置前缀分配表的共享前缀索引，首次调用时加载
+
+    返回:
+        CallsignPrefixIndex: 前缀索引，调用方不应修改
+    """
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = CallsignPrefixIndex.from_file()
+    return _default_index
@@ -0,0 +1,171 @@
+import sys
+import math
+from array import array
+
+
+class CueStore:
+    """
+    按列存储的字幕条目
+
+    每个字段保存在一个数组或列表中，字幕ID就是条目在各列中的位置，按ID读取和修改都是O(1)。
+    时间戳使用单调时钟的纳秒数（array('q')），延迟和置信度使用定长数组，
+    语言代码等重复出现的字符串使用驻留字符串，每条字幕不再创建元组、datetime和字典对象。
+    其他目标语言的译文按语言各占一列，只在该语言第一次出现时创建。
+    已经写入文件、不再需要的字幕可以用 discard_before 丢弃，之后的字幕ID保持不变。
+    """
+
+    # 延迟未知时在数组中保存的值
+    NO_DELAY = -1
+
+    def __init__(self):
+        # 各列第一行的字幕ID，丢弃的字幕不再占用内存
+        self.first_id = 0
+        self.timestamps_ns = array('q')
+        self.originals = []
+        self.translations = []
+        self.languages = []
+        self.recognition_delays = array('i')
+        self.translation_delays = array('i')
+        self.confidences = array('f')
+        # 对应的录音归档路径和其中的采样位置、帧数（没有归档时为None和-1）
+        self.audio_files = []
+        self.audio_offsets = array('q')
+        self.audio_samples = array('i')
+        # {语言代码: [译文, ...]}，长度可能小于字幕条数，缺少的部分视为空
+        self.extra_translations = {}
+
+    def __len__(self):
+        """添加过的字幕总条数（包括已经丢弃的），即下一条字幕的ID"""
+        return self.first_id + len(self.originals)
+
+    def _row(self, cue_id):
+        """字幕ID在各列中的位置，字幕已经丢弃时抛出 IndexError"""
+        row = cue_id - self.first_id
+        if row < 0:
+            raise IndexError(f"字幕 {cue_id} 已经丢弃")
+        return row
+
+    def discard_before(self, cue_id):
+        """
+        丢弃ID小于cue_id的字幕，释放它们占用的内存
+
+        参数:
+            cue_id (int): 保留的第一条字幕的ID
+        """
+        count = min(cue_id, len(self)) - self.first_id
+        if count <= 0:
+            return
+        for column in (self.timestamps_ns, self.originals, self.translations, self.languages,
+                       self.recognition_delays, self.translation_delays, self.confidences,
+                       self.audio_files, self.audio_offsets, self.audio_samples):
+            del column[:count]
+        for track in self.extra_translations.values():
+            del track[:count]
+        self.first_id += count
+
+    def append(self, original, timestamp_ns, translation=""):
+        """
+        添加一条字幕
+
+        参数:
+            original (str): 原文
+            timestamp_ns (int): 单调时钟时间戳（纳秒）
+            translation (str): 主目标语言译文
+
+        返回:
+            int: 字幕ID
+        """
+        self.timestamps_ns.append(timestamp_ns)
+        self.originals.append(original)
+        self.translations.append(translation or "")
+        self.languages.append(None)
+        self.recognition_delays.append(self.NO_DELAY)
+        self.translation_delays.append(self.NO_DELAY)
+        self.confidences.append(math.nan)
+        self.audio_files.append(None)
+        self.audio_offsets.append(-1)
+        self.audio_samples.append(-1)
+        return len(self) - 1
+
+    def get_original(self, cue_id):
+        """获取原文"""
+        return self.originals[self._row(cue_id)]
+
+    def get_translation(self, cue_id):
+        """获取主目标语言译文"""
+        return self.translations[self._row(cue_id)]
+
+    def get_timestamp_ns(self, cue_id):
+        """获取单调时钟时间戳（纳秒）"""
+        return self.timestamps_ns[self._row(cue_id)]
+
+    def set_translation(self, cue_id, translation):
+        """设置主目标语言译文"""
+        self.translations[self._row(cue_id)] = translation or ""
+
+    def set_extra_translation(self, cue_id, lang_code, translation):
+        """设置其他目标语言的译文，该语言的列长度不足时用空值补齐，空译文不覆盖已有的译文"""
+        row = self._row(cue_id)
+        track = self.extra_translations.setdefault(sys.intern(lang_code), [])
+        if len(track) <= row:
+            track.extend([""] * (row + 1 - len(track)))
+        if translation:
+            track[row] = translation
+
+    def get_extra_translations(self, cue_id):
+        """
+        获取其他目标语言的非空译文
+
+        返回:
+            dict: {语言代码: 译文}
+        """
+        row = self._row(cue_id)
+        return {lang_code: track[row] for lang_code, track in self.extra_translations.items()
+                if row < len(track) and track[row]}
+
+    def set_metadata(self, cue_id, metadata):
+        """
+        设置识别信息，只更新提供了的字段
+
+        参数:
+            cue_id (int): 字幕ID
+            metadata (dict): 可包含 language、recognition_delay_ms、translation_delay_ms、confidence，
+                以及录音归档的 audio_file、audio_offset、audio_samples
+        """
+        row = self._row(cue_id)
+        if metadata.get("language"):
+            self.languages[row] = sys.intern(metadata["language"])
+        if metadata.get("recognition_delay_ms") is not None:
+            self.recognition_delays[row] = int(metadata["recognition_delay_ms"])
+        if metadata.get("translation_delay_ms") is not None:
+            self.translation_delays[row] = int(metadata["translation_delay_ms"])
+        if metadata.get("confidence") is not None:
+            self.confidences[row] = metadata["confidence"]
+        if metadata.get("audio_file"):
+            self.audio_files[row] = sys.intern(metadata["audio_file"])
+            self.audio_offsets[row] = int(metadata["audio_offset"])
+            self.audio_samples[row] = int(metadata["audio_samples"])
+
+    def get_metadata(self, cue_id):
+        """
+        获取识别信息
+
+        返回:
+            dict: {"language", "recognition_delay_ms", "translation_delay_ms", "confidence",
+                   "audio_file", "audio_offset", "audio_samples"}，未知的字段为None
+        """
+        row = self._row(cue_id)
+        recognition_delay = self.recognition_delays[row]
+        translation_delay = self.translation_delays[row]
+        confidence = self.confidences[row]
+        audio_file = self.audio_files[row]
+        return {
+            "language": self.languages[row],
+            "recognition_delay_ms": None if recognition_delay == self.NO_DELAY else recognition_delay,
+            "translation_delay_ms": None if translation_delay == self.NO_DELAY else translation_delay,
+            # 单精度保存，保留3位小数
+            "confidence": None if math.isnan(confidence) else round(confidence, 3),
+            "audio_file": audio_file,
+            "audio_offset": None if audio_file is None else self.audio_offsets[row],
+            "audio_samples": None if audio_file is None else self.audio_samples[row],
+        }
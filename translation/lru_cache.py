@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    线程安全的有界LRU缓存
+
+    超过容量时淘汰最久未使用的条目，并统计命中、未命中和淘汰次数。
+    """
+
+    def __init__(self, max_size=1024):
+        """
+        参数:
+            max_size (int): 最大条目数，为0时不缓存
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        获取缓存的值并标记为最近使用
+
+        参数:
+            key: 缓存键，需可哈希
+            default: 未命中时的返回值
+
+        返回:
+            缓存的值，未命中时返回default
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """添加或更新缓存条目，超过容量时淘汰最久未使用的条目"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, func):
+        """
+        获取缓存的值，未命中时调用func计算并缓存
+
+        计算在锁外进行，并发的相同请求可能各自计算一次，结果相同，不影响正确性。
+
+        参数:
+            key: 缓存键
+            func (callable): 无参数的计算函数
+
+        返回:
+            缓存或计算得到的值
+        """
+        missing = _MISSING
+        value = self.get(key, missing)
+        if value is missing:
+            value = func()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """清空缓存（保留统计信息）"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self):
+        """
+        获取缓存统计
+
+        返回:
+            dict: {"size", "max_size", "hits", "misses", "evictions", "hit_rate"}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_MISSING = object()
@@ -0,0 +1,321 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class TranslationTimeoutError(Exception):
+    """翻译请求超过截止时间"""
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+
+class LatencyTracker:
+    """记录最近的请求延迟，用于计算百分位延迟"""
+
+    def __init__(self, window_size=100):
+        self.samples = deque(maxlen=window_size)
+        self.lock = threading.Lock()
+
+    def add(self, latency_ms):
+        """添加一次请求的延迟（毫秒）"""
+        with self.lock:
+            self.samples.append(latency_ms)
+
+    def count(self):
+        """获取当前样本数量"""
+        with self.lock:
+            return len(self.samples)
+
+    def percentile(self, pct):
+        """
+        获取延迟百分位数
+
+        参数:
+            pct (float): 百分位（0-100）
+
+        返回:
+            float: 对应百分位的延迟（毫秒），没有样本时返回None
+        """
+        with self.lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败达到阈值后进入打开状态，直接拒绝请求；经过冷却时间后进入半开状态，
+    只放行一个探测请求，探测成功则恢复关闭状态，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout  # 打开状态持续时间（秒）
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """判断当前是否允许发起请求"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            # 半开状态只允许一个探测请求
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """记录一次成功的请求"""
+        with self.lock:
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败的请求"""
+        with self.lock:
+            self.failure_count += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def get_state(self):
+        """获取熔断器当前状态"""
+        with self.lock:
+            return self.state
+
+
+class BackendBusyError(Exception):
+    """后端调用线程都被尚未返回的请求占用"""
+
+
+class _CallPool:
+    """
+    固定容量的后端调用线程池
+
+    调用线程全部被占用时直接拒绝新的调用而不是排队，
+    避免卡住的后端让后续请求在队列里一直等到超时。
+    """
+
+    def __init__(self, max_workers, thread_name_prefix):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.slots = threading.BoundedSemaphore(max_workers)
+
+    def submit(self, backend, text, dest):
+        """提交一次后端调用，没有空闲线程时抛出 BackendBusyError"""
+        if not self.slots.acquire(blocking=False):
+            raise BackendBusyError("翻译后端的调用线程都被未返回的请求占用")
+        try:
+            future = self.executor.submit(backend, text, dest)
+        except Exception:
+            self.slots.release()
+            raise
+        # 调用结束（包括被取消）后才归还线程名额
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self):
+        """关闭线程池，取消还没开始的调用（不等待卡住的调用）"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class GuardedBackend:
+    """
+    带保护的翻译后端调用
+
+    为同步的翻译后端增加截止时间、对冲请求和熔断：
+    - 每个请求最多等待 timeout 秒，超时后取消还没开始的调用，已在执行的调用被放弃（后端线程自行结束）
+    - 主请求超过近期 p95 延迟仍未返回时，发出第二个对冲请求，取先成功的结果
+    - 连续失败后熔断，熔断期间直接使用备用后端，没有备用后端时抛出 CircuitOpenError
+    - 主后端和备用/对冲调用使用各自的线程池，主后端卡住占满线程时不会拖住备用后端
+    - 延迟统计只记录主后端调用本身的耗时，对冲请求先返回时主请求的耗时仍按实际完成时间记录
+    """
+
+    def __init__(self, primary, secondary=None, timeout=3.0, hedge_enabled=True,
+                 hedge_percentile=95, min_hedge_samples=20, min_hedge_delay=0.2,
+                 breaker=None, max_workers=4, fallback_workers=2):
+        """
+        参数:
+            primary (callable): 主后端，签名为 (text, dest) -> str
+            secondary (callable): 备用后端，签名同上，可为None
+            timeout (float): 单个请求的截止时间（秒）
+            hedge_enabled (bool): 是否启用对冲请求
+            hedge_percentile (float): 触发对冲请求的延迟百分位
+            min_hedge_samples (int): 延迟样本数不足时不触发对冲
+            min_hedge_delay (float): 对冲请求的最小等待时间（秒）
+            breaker (CircuitBreaker): 熔断器，默认新建
+            max_workers (int): 主后端调用线程数
+            fallback_workers (int): 备用后端和对冲请求的调用线程数
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.timeout = timeout
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.primary_pool = _CallPool(max_workers, "translate")
+        self.fallback_pool = _CallPool(fallback_workers, "translate_fallback")
+
+        # 统计信息
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0, "fallbacks": 0, "rejected": 0,
+                      "abandoned": 0, "busy": 0}
+
+    def _count(self, key, amount=1):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def get_hedge_delay(self):
+        """获取发出对冲请求前的等待时间（秒），样本不足时返回None"""
+        if not self.hedge_enabled or self.latency.count() < self.min_hedge_samples:
+            return None
+        p = self.latency.percentile(self.hedge_percentile)
+        return max(self.min_hedge_delay, p / 1000.0)
+
+    def call(self, text, dest):
+        """
+        调用翻译后端
+
+        参数:
+            text (str): 要翻译的文本
+            dest (str): 目标语言代码
+
+        返回:
+            str: 译文
+
+        异常:
+            TranslationTimeoutError: 超过截止时间仍没有结果
+            CircuitOpenError: 熔断期间且没有备用后端
+            BackendBusyError: 调用线程都被卡住的请求占用
+            以及后端本身抛出的异常
+        """
+        self._count("requests")
+
+        if not self.breaker.allow_request():
+            if self.secondary is None:
+                self._count("rejected")
+                raise CircuitOpenError("翻译服务熔断中")
+            self._count("fallbacks")
+            return self._call_with_deadline(self.secondary, text, dest, time.time() + self.timeout)
+
+        deadline = time.time() + self.timeout
+        try:
+            result = self._call_hedged(text, dest, deadline)
+        except Exception:
+            self.breaker.record_failure()
+            if self.secondary is None or time.time() >= deadline:
+                raise
+            # 主后端失败但还有剩余时间，尝试备用后端
+            self._count("fallbacks")
+            return self._call_with_deadline(self.secondary, text, dest, deadline)
+
+        self.breaker.record_success()
+        return result
+
+    def _submit(self, pool, backend, text, dest):
+        """向线程池提交调用，线程被占满时计数后抛出 BackendBusyError"""
+        try:
+            return pool.submit(backend, text, dest)
+        except BackendBusyError:
+            self._count("busy")
+            raise
+
+    def _timed_primary(self, text, dest):
+        """在调用线程中执行主后端并记录它自己的耗时（成功时）"""
+        start_time = time.time()
+        result = self.primary(text, dest)
+        self.latency.add((time.time() - start_time) * 1000)
+        return result
+
+    def _abandon(self, futures):
+        """取消还没开始的调用，已在执行的调用计入放弃数量"""
+        abandoned = sum(1 for future in futures if not future.cancel())
+        if abandoned:
+            self._count("abandoned", abandoned)
+
+    def _call_with_deadline(self, backend, text, dest, deadline):
+        """在截止时间内调用单个后端（使用备用线程池）"""
+        future = self._submit(self.fallback_pool, backend, text, dest)
+        done, _ = wait([future], timeout=max(0, deadline - time.time()))
+        if not done:
+            self._abandon([future])
+            self._count("timeouts")
+            raise TranslationTimeoutError(f"翻译请求超时 ({self.timeout:.1f}s)")
+        return future.result()
+
+    def _call_hedged(self, text, dest, deadline):
+        """调用主后端，必要时发出对冲请求，返回先成功的结果"""
+        primary_future = self._submit(self.primary_pool, self._timed_primary, text, dest)
+        pending = {primary_future}
+        try:
+            hedge_delay = self.get_hedge_delay()
+            if hedge_delay is not None:
+                done, pending = wait(pending, timeout=min(hedge_delay, max(0, deadline - time.time())))
+                if done:
+                    return primary_future.result()
+                if time.time() < deadline:
+                    # 主请求较慢，发出对冲请求（优先使用备用后端），备用线程被占满时继续等主请求
+                    hedge_backend = self.secondary or self.primary
+                    try:
+                        pending.add(self._submit(self.fallback_pool, hedge_backend, text, dest))
+                        self._count("hedged")
+                    except BackendBusyError:
+                        pass
+
+            last_error = None
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is not primary_future:
+                            self._count("hedge_wins")
+                        return future.result()
+                    last_error = future.exception()
+
+            if pending:
+                self._count("timeouts")
+                raise TranslationTimeoutError(f"翻译请求超时 ({self.timeout:.1f}s)")
+            raise last_error
+        finally:
+            # 已经有结果或超时，不再需要的调用：没开始的取消，在执行的放弃
+            self._abandon(pending)
+
+    def get_stats(self):
+        """获取统计信息"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats["circuit_state"] = self.breaker.get_state()
+        stats["p95_ms"] = self.latency.percentile(95)
+        return stats
+
+    def shutdown(self):
+        """关闭后端调用线程池（不等待卡住的请求）"""
+        self.primary_pool.shutdown()
+        self.fallback_pool.shutdown()
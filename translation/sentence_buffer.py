@@ -0,0 +1,186 @@
+import re
+import threading
+import time
+from collections import namedtuple
+
+# 缓冲区输出的完整句子，以及组成句子的片段所属的识别分段ID（按识别顺序）
+Sentence = namedtuple('Sentence', ['text', 'segment_ids'])
+
+
+class SentenceBuffer:
+    """
+    句子缓冲区
+
+    语音分段按静音或最大时长切分，句子经常被截断在半句。缓冲区把识别出的片段拼接起来，
+    直到遇到句子结束标志或等待超时，才输出完整的句子用于翻译，减少翻译调用次数并提高译文质量。
+    """
+
+    # 句子结束标点（可带引号或右括号）
+    SENTENCE_END_PATTERN = re.compile(r'[.?!。？！…]+["\'”’)）]*(?=\s|$)')
+    # 业余无线电通联中表示本段发言结束的词
+    END_WORDS = ("over",)
+
+    def __init__(self, timeout=2.5, max_chars=200):
+        """
+        参数:
+            timeout (float): 片段等待句子结束的最长时间（秒），超时后直接输出
+            max_chars (int): 缓冲文本的最大长度，超过后直接输出
+        """
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.fragments = []
+        self.segment_ids = []  # 缓冲片段所属的识别分段ID
+        self.first_fragment_time = None
+        self.lock = threading.Lock()
+
+        # 统计信息
+        self.fragment_count = 0  # 输入的片段数
+        self.sentence_count = 0  # 输出的句子数（即翻译调用次数）
+
+    def add(self, fragment, now=None):
+        """
+        添加一个识别片段
+
+        参数:
+            fragment (str): 识别出的文本片段
+            now (float): 当前时间，默认使用time.time()
+
+        返回:
+            str: 如果形成了完整的句子则返回该句子（可能包含多个片段），否则返回None
+        """
+        sentence = self.add_segment(fragment, None, now)
+        return sentence.text if sentence else None
+
+    def add_segment(self, fragment, segment_id, now=None):
+        """
+        添加一个识别片段，并记录它所属的识别分段
+
+        参数:
+            fragment (str): 识别出的文本片段
+            segment_id (int): 片段所属的识别分段ID，为None时不记录
+            now (float): 当前时间，默认使用time.time()
+
+        返回:
+            Sentence: 如果形成了完整的句子则返回该句子和组成它的全部识别分段ID，否则返回None
+        """
+        if not fragment or not fragment.strip():
+            return None
+        now = time.time() if now is None else now
+
+        with self.lock:
+            self.fragment_count += 1
+            if not self.fragments:
+                self.first_fragment_time = now
+            self.fragments.append(fragment.strip())
+            if segment_id is not None and segment_id not in self.segment_ids:
+                self.segment_ids.append(segment_id)
+            text = ' '.join(self.fragments)
+
+            # 以结束标志结尾，整段输出
+            if self._ends_sentence(text):
+                return self._emit(text)
+
+            # 中间有句子结束标点，输出到最后一个结束标点为止，其余部分继续等待
+            last_end = None
+            for match in self.SENTENCE_END_PATTERN.finditer(text):
+                last_end = match.end()
+            if last_end is not None:
+                completed = Sentence(text[:last_end].strip(), tuple(self.segment_ids))
+                rest = text[last_end:].strip()
+                # 句子结束标点一定在最新的片段中，剩余部分只属于最新的识别分段
+                self.fragments = [rest] if rest else []
+                self.segment_ids = self.segment_ids[-1:] if rest and segment_id is not None else []
+                self.first_fragment_time = now if rest else None
+                self.sentence_count += 1
+                return completed
+
+            # 缓冲文本过长，直接输出
+            if len(text) >= self.max_chars:
+                return self._emit(text)
+
+            return None
+
+    def pop_expired(self, now=None):
+        """
+        检查缓冲区是否超时
+
+        返回:
+            str: 超时未结束的缓冲文本，未超时或缓冲区为空时返回None
+        """
+        sentence = self.pop_expired_sentence(now)
+        return sentence.text if sentence else None
+
+    def pop_expired_sentence(self, now=None):
+        """
+        检查缓冲区是否超时，同 pop_expired，同时返回缓冲片段所属的识别分段ID
+
+        返回:
+            Sentence: 超时未结束的缓冲文本和识别分段ID，未超时或缓冲区为空时返回None
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            if not self.fragments or now - self.first_fragment_time < self.timeout:
+                return None
+            return self._emit(' '.join(self.fragments))
+
+    def time_until_expired(self, now=None):
+        """
+        距离缓冲区超时还有多长时间，用于安排超时检查，不需要定时轮询
+
+        返回:
+            float: 剩余秒数（已超时时为0），缓冲区为空时返回None
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            if not self.fragments:
+                return None
+            return max(0.0, self.first_fragment_time + self.timeout - now)
+
+    def flush(self):
+        """立即输出缓冲区中的全部文本，缓冲区为空时返回None"""
+        with self.lock:
+            if not self.fragments:
+                return None
+            return self._emit(' '.join(self.fragments)).text
+
+    def get_pending_text(self):
+        """获取尚未形成完整句子的缓冲文本"""
+        with self.lock:
+            return ' '.join(self.fragments)
+
+    def pending_segment_ids(self):
+        """获取缓冲文本所属的识别分段ID"""
+        with self.lock:
+            return tuple(self.segment_ids)
+
+    def clear(self):
+        """清空缓冲区"""
+        with self.lock:
+            self.fragments = []
+            self.segment_ids = []
+            self.first_fragment_time = None
+
+    def _ends_sentence(self, text):
+        """判断文本是否以句子结束标志结尾"""
+        stripped = text.rstrip()
+        match = None
+        for match in self.SENTENCE_END_PATTERN.finditer(stripped):
+            pass
+        if match is not None and match.end() == len(stripped):
+            return True
+        last_word = re.sub(r'[^\w]+$', '', stripped).rsplit(' ', 1)[-1].lower()
+        return last_word in self.END_WORDS
+
+    def _emit(self, text):
+        """输出文本和识别分段ID并清空缓冲区（调用者需持有锁）"""
+        sentence = Sentence(text, tuple(self.segment_ids))
+        self.fragments = []
+        self.segment_ids = []
+        self.first_fragment_time = None
+        self.sentence_count += 1
+        return sentence
+
+    def get_stats(self):
+        """获取统计信息：输入片段数、输出句子数"""
+        with self.lock:
+            return {"fragments": self.fragment_count, "sentences": self.sentence_count}
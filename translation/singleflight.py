@@ -0,0 +1,84 @@
+import threading
+
+
+class _Call:
+    """一次正在进行中的调用，保存结果供所有等待者共享"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.shared = 0  # 共享此次调用结果的额外调用者数量
+
+
+class SingleFlight:
+    """
+    并发请求合并（singleflight）
+
+    同一个键在同一时刻只会执行一次调用，期间到达的相同请求不会重复调用，
+    而是等待第一次调用完成后共享其结果（或异常）。调用完成后键即被释放，
+    之后的请求会重新发起调用，因此这里不做任何结果缓存。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # 统计信息
+        self.executed_count = 0  # 实际执行的调用次数
+        self.shared_count = 0    # 被合并、未实际执行的调用次数
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        执行调用，若相同键的调用正在进行则等待并共享其结果
+
+        参数:
+            key: 请求键，需可哈希（如 (文本, 目标语言代码)）
+            func (callable): 实际执行的函数
+            *args, **kwargs: 传给 func 的参数
+
+        返回:
+            func 的返回值；若 func 抛出异常，所有共享该调用的调用者都会收到同一异常
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.shared += 1
+                self.shared_count += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed_count += 1
+                is_leader = True
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+    def in_flight(self):
+        """获取当前正在进行中的调用数量"""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self):
+        """获取合并统计信息"""
+        with self._lock:
+            return {
+                "executed": self.executed_count,
+                "shared": self.shared_count,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,160 @@
+import io
+import os
+import gzip
+import queue
+import shutil
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 支持的压缩方式 {压缩方式: 扩展名}
+COMPRESSION_EXTENSIONS = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# 压缩和解压时每次读写的字节数
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def split_compression_extension(path):
+    """
+    拆分压缩文件的扩展名
+
+    参数:
+        path (str): 文件路径，如 subtitle_20240101_120000.srt.gz
+
+    返回:
+        tuple: (去掉压缩扩展名的路径, 压缩方式)，未压缩时压缩方式为None
+    """
+    for method, extension in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(extension):
+            return path[:-len(extension)], method
+    return path, None
+
+
+def get_available_compression(method):
+    """
+    获取实际可用的压缩方式，zstd需要安装zstandard，未安装时改用gzip
+
+    参数:
+        method (str): 压缩方式（"gzip"、"zstd"），"none"或None表示不压缩
+
+    返回:
+        str: 可用的压缩方式，不压缩时返回None
+    """
+    if not method or method == "none":
+        return None
+    if method not in COMPRESSION_EXTENSIONS:
+        print(f"不支持的压缩方式: {method}，改用gzip")
+        return "gzip"
+    if method == "zstd" and zstandard is None:
+        print("未安装zstandard，改用gzip压缩字幕文件")
+        return "gzip"
+    return method
+
+
+def open_subtitle_file(path, encoding='utf-8-sig'):
+    """
+    以文本方式打开字幕文件，按扩展名流式解压 .gz 和 .zst 文件
+
+    参数:
+        path (str): 文件路径
+        encoding (str): 文本编码
+
+    返回:
+        文本文件对象，可按行迭代
+    """
+    method = split_compression_extension(path)[1]
+    if method == "gzip":
+        return gzip.open(path, 'rt', encoding=encoding)
+    if method == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"读取 {path} 需要安装zstandard")
+        raw = open(path, 'rb')
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding=encoding)
+    return open(path, 'r', encoding=encoding)
+
+
+def compress_file(path, method="gzip"):
+    """
+    压缩文件并删除原文件
+
+    先写入临时文件，完成后重命名，中途中断时原文件保持不变。
+
+    参数:
+        path (str): 文件路径
+        method (str): 压缩方式（"gzip"、"zstd"）
+
+    返回:
+        str: 压缩后的文件路径
+    """
+    target = path + COMPRESSION_EXTENSIONS[method]
+    temp_path = target + ".tmp"
+    with open(path, 'rb') as source, open(temp_path, 'wb') as raw:
+        if method == "zstd":
+            zstandard.ZstdCompressor().copy_stream(source, raw, read_size=COPY_BUFFER_SIZE)
+        else:
+            # 不在文件头中保存原文件名和时间，相同内容的压缩结果相同
+            with gzip.GzipFile(filename="", mode='wb', fileobj=raw, mtime=0) as compressed:
+                shutil.copyfileobj(source, compressed, COPY_BUFFER_SIZE)
+    os.replace(temp_path, target)
+    os.remove(path)
+    return target
+
+
+class FileCompressor:
+    """
+    后台压缩已关闭的字幕文件
+
+    提交的文件按顺序在一个后台线程中压缩，队列为空时线程退出，有新文件时再启动。
+    线程不是守护线程，程序退出前会压缩完已提交的文件。
+    """
+
+    def __init__(self, method="gzip"):
+        """
+        参数:
+            method (str): 压缩方式（"gzip"、"zstd"）
+        """
+        self.method = method
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.compressed_count = 0
+
+    def submit(self, paths):
+        """
+        提交需要压缩的文件
+
+        参数:
+            paths (list): 文件路径列表
+        """
+        for path in paths:
+            self.queue.put(path)
+        with self._lock:
+            if self._thread is None and not self.queue.empty():
+                self._thread = threading.Thread(target=self._run, name="subtitle_compressor")
+                self._thread.start()
+
+    def _run(self):
+        """压缩线程：处理队列中的文件直到队列为空"""
+        while True:
+            with self._lock:
+                if self.queue.empty():
+                    self._thread = None
+                    return
+            path = self.queue.get()
+            try:
+                compress_file(path, self.method)
+                self.compressed_count += 1
+            except Exception as e:
+                print(f"压缩字幕文件失败: {path}: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def wait(self):
+        """等待已提交的文件全部压缩完成"""
+        self.queue.join()
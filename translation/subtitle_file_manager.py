@@ -1,17 +1,70 @@
 import os
+import time
+import threading
 import datetime
-import re
+from translation.cue_store import CueStore
+from translation.subtitle_archive import COMPRESSION_EXTENSIONS, FileCompressor, get_available_compression
+from translation.subtitle_writers import SUBTITLE_WRITERS, SubtitleCue, SrtWriter
+
+# 按识别分段ID记录时，字幕等待译文的默认最长时间（秒），超时后不再等待译文直接写入文件。
+# 句子由多个识别分段拼成时，译文在句子结束（句子缓冲区超时）并翻译完成（翻译截止时间）后才到达
+TRANSLATION_WAIT_SECONDS = 15.0
+# 等待译文的字幕最多保留的条数，只用于限制内存中未写入的字幕，正常情况下按等待时间写入
+MAX_PENDING_CUES = 200
+# 每个字幕文件最多写入的字幕条数，达到后换用新文件。新出现的语言轨道需要补写当前文件中已写入的字幕，
+# 所以当前文件的字幕保留在内存中，换用新文件时丢弃，长时间连续记录时内存占用不会一直增长
+MAX_FILE_CUES = 5000
 
 class SubtitleFileManager:
-    def __init__(self):
+    def __init__(self, formats=None, index=None, max_file_bytes=0, max_file_seconds=0, compression=None,
+                 translation_wait_seconds=TRANSLATION_WAIT_SECONDS):
+        """
+        参数:
+            formats (list): 同时保存的字幕格式（"srt"、"vtt"、"ass"、"jsonl"），默认只保存SRT
+            index (SubtitleIndex): 字幕全文索引，提供时每条字幕写入文件的同时写入索引
+            max_file_bytes (int): 任一字幕文件达到该大小后换用新文件，0表示不限制
+            max_file_seconds (float): 字幕文件的时长达到该秒数后换用新文件，0表示不限制
+            compression (str): 关闭的字幕文件在后台压缩的方式（"gzip"、"zstd"），None或"none"表示不压缩
+            translation_wait_seconds (float): 按识别分段ID记录时，字幕等待译文的最长时间（秒）
+        """
+        # 识别回调线程添加字幕，界面线程更新译文，修改字幕记录和写入文件都需要持有锁
+        self.lock = threading.RLock()
         # 创建一个英文名的字幕目录
         self.subtitle_dir = "Subtitles"
         self.current_file = None
+        # 字幕格式，第一种格式的文件作为current_file
+        self.formats = [fmt for fmt in (formats or ["srt"]) if fmt in SUBTITLE_WRITERS] or ["srt"]
+        # 当前字幕文件的路径（不含扩展名）和写入器 {(格式, 语言代码): SubtitleWriter}
+        self.base_path = None
+        self.writers = {}
+        # 已经写入文件的字幕条数。最后一条字幕的译文可能还会更新，下一条字幕到达或停止记录时才写入
+        self.written_count = 0
+        # 字幕等待译文的最长时间（纳秒）
+        self.translation_wait_ns = int(translation_wait_seconds * 1_000_000_000)
+        # 字幕全文索引，以及当前文件中已写入的非空字幕条数（与SRT序号一致）
+        self.index = index
+        self.file_cue_count = 0
+        # 字幕文件轮换条件，以及关闭的文件的后台压缩
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        compression = get_available_compression(compression)
+        self.compressor = FileCompressor(compression) if compression else None
         self.create_subtitle_directory()
         self.recording = False
-        self.original_texts = []
-        self.translated_texts = []
+        # 本次记录的字幕条目（原文、各语言译文、时间戳和识别信息），按字幕ID访问
+        self.cues = CueStore()
+        # 识别分段ID到字幕ID的映射 {分段ID: 字幕ID}
+        self.segment_cues = {}
+        # 尚未写入的字幕中：所在句子的译文保存在句子最后一个分段的字幕里的字幕ID，
+        # 以及句子的剩余部分还在句子缓冲区中、译文还会追加的字幕ID
+        self.covered_cues = set()
+        self.continued_cues = set()
         self.start_time = None
+        # 开始记录时的单调时钟时间（纳秒）
+        self.start_ns = 0
+        # 当前字幕文件的起点（单调时钟纳秒），文件中的字幕时间相对于它计算，以及文件中第一条字幕的ID
+        self.file_start_ns = 0
+        self.file_first_cue = 0
         self.time_offset = 0  # 时间偏移，单位为毫秒
         
         # 用于防止重复添加相同内容的字幕
@@ -26,134 +79,379 @@ class SubtitleFileManager:
     
     def start_recording(self):
         """开始记录字幕"""
-        if self.recording:
-            return
+        with self.lock:
+            if self.recording:
+                return
+            
+            self.recording = True
+            self.cues = CueStore()
+            self.segment_cues = {}
+            self.covered_cues = set()
+            self.continued_cues = set()
+            self.written_count = 0
+            self.start_time = datetime.datetime.now()
+            self.start_ns = time.monotonic_ns()
+            self.time_offset = 0
+            
+            # 重置上次记录的文本
+            self.last_original_text = None
+            self.last_translated_text = None
+            
+            # 创建一个新的字幕文件
+            self._start_files(self.start_ns)
+            print(f"Started recording subtitles to {self.current_file}")
+    
+    def stop_recording(self):
+        """停止记录字幕并保存文件"""
+        with self.lock:
+            if not self.recording:
+                return
+            
+            # 保存字幕文件
+            self.recording = False
+            if len(self.cues):
+                self.save_subtitle_file()
+            
+            self.current_file = None
+            self.last_original_text = None
+            self.last_translated_text = None
+            print("Stopped recording subtitles")
+    
+    def add_subtitle(self, original_text, translated_text=None, extra_translations=None, metadata=None,
+                     segment_id=None):
+        """
+        添加字幕条目
         
-        self.recording = True
-        self.original_texts = []
-        self.translated_texts = []
-        self.start_time = datetime.datetime.now()
-        self.time_offset = 0
+        提供识别分段ID时，每个分段是一条字幕（原文相同也不合并），之后用 update_translation 按分段ID更新译文；
+        字幕收到译文，或等待译文超过 translation_wait_seconds 秒时写入文件。
+        不提供分段ID时，仅当原文变化时才添加新记录，新条目到达时上一条字幕已经确定，立即写入所有格式的字幕文件。
         
-        # 重置上次记录的文本
-        self.last_original_text = None
-        self.last_translated_text = None
+        参数:
+            original_text (str): 原文
+            translated_text (str): 主目标语言译文
+            extra_translations (dict): 其他目标语言的译文 {语言代码: 译文}，每种语言保存为单独的字幕轨道
+            metadata (dict): 识别信息，可包含 language、recognition_delay_ms、translation_delay_ms、confidence，
+                以及录音归档的 audio_file、audio_offset、audio_samples
+            segment_id (int): 识别分段ID
+            
+        返回:
+            int: 字幕ID（原文与上一条相同时为上一条的ID），未在记录时返回None
+        """
+        with self.lock:
+            if not self.recording:
+                return None
+            
+            if segment_id is not None:
+                cue_id = self.segment_cues.get(segment_id)
+                if cue_id is not None:
+                    self.update_translation(segment_id, translated_text, extra_translations, metadata)
+                    return cue_id
+                cue_id = self.cues.append(original_text, time.monotonic_ns(), translated_text)
+                self.segment_cues[segment_id] = cue_id
+                self._update_cue(cue_id, extra_translations, metadata)
+                self.last_original_text = original_text
+                self.last_translated_text = translated_text
+                self._flush_cues(self._settled_count())
+                self._rotate_if_needed()
+                return cue_id
+                
+            # 检查原文是否与上次相同
+            if original_text == self.last_original_text:
+                if not len(self.cues):
+                    return None
+                cue_id = len(self.cues) - 1
+                if cue_id < self.written_count:
+                    # 已经写入文件（换用新文件时可能已经丢弃）
+                    return cue_id
+                # 如果原文相同，但有译文且与上次不同，则更新上次记录的译文
+                if translated_text and translated_text != self.last_translated_text:
+                    self.last_translated_text = translated_text
+                    self.cues.set_translation(cue_id, translated_text)
+                self._update_cue(cue_id, extra_translations, metadata)
+                return cue_id
+            
+            # 上一条字幕已经确定，写入文件
+            self._flush_cues(len(self.cues))
+            self._rotate_if_needed()
+            
+            # 记录字幕文本，未翻译时译文为空
+            cue_id = self.cues.append(original_text, time.monotonic_ns(), translated_text)
+            self._update_cue(cue_id, extra_translations, metadata)
+            
+            # 更新上次记录的文本
+            self.last_original_text = original_text
+            self.last_translated_text = translated_text
+            return cue_id
+    
+    def update_translation(self, segment_id, translated_text, extra_translations=None, metadata=None):
+        """
+        按识别分段ID更新字幕的译文和识别信息
         
-        # 创建一个新的字幕文件
-        timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
-        self.current_file = os.path.join(self.subtitle_dir, f"subtitle_{timestamp}.srt")
-        print(f"Started recording subtitles to {self.current_file}")
+        参数:
+            segment_id (int): 识别分段ID
+            translated_text (str): 主目标语言译文
+            extra_translations (dict): 其他目标语言的译文 {语言代码: 译文}
+            metadata (dict): 识别信息，如 translation_delay_ms
+            
+        返回:
+            int: 字幕ID，分段不在本次记录中或字幕已经写入文件时返回None
+        """
+        with self.lock:
+            if not self.recording:
+                return None
+            cue_id = self.segment_cues.get(segment_id)
+            if cue_id is None:
+                print(f"未找到识别分段 {segment_id} 对应的字幕（不在本次记录中或已写入关闭的文件），译文未保存")
+                return None
+            if cue_id < self.written_count:
+                print(f"识别分段 {segment_id} 的字幕等待译文超时，已经写入文件，译文未保存")
+                return None
+            if translated_text:
+                self.cues.set_translation(cue_id, translated_text)
+            self._update_cue(cue_id, extra_translations, metadata)
+            self._flush_cues(self._settled_count())
+            self._rotate_if_needed()
+            return cue_id
     
-    def stop_recording(self):
-        """停止记录字幕并保存文件"""
-        if not self.recording:
-            return
+    def update_sentence_translation(self, segment_ids, translated_text, extra_translations=None, metadata=None,
+                                    continued=False):
+        """
+        保存由一个或多个识别分段拼成的句子的译文
         
-        # 保存字幕文件
-        if self.original_texts or self.translated_texts:
-            self.save_subtitle_file()
+        译文只保存到句子最后一个分段的字幕，之前分段的字幕不再等待译文；
+        最后一个分段的字幕已有上一个句子的译文时（分段中间有句子结束），新译文追加在后面。
         
-        self.recording = False
-        self.current_file = None
-        self.last_original_text = None
-        self.last_translated_text = None
-        print("Stopped recording subtitles")
+        参数:
+            segment_ids (list): 句子所属的识别分段ID，按识别顺序排列
+            translated_text (str): 主目标语言译文
+            extra_translations (dict): 其他目标语言的译文 {语言代码: 译文}
+            metadata (dict): 识别信息，如 translation_delay_ms
+            continued (bool): 最后一个分段的剩余部分还在句子缓冲区中，之后的译文还会追加到这条字幕
+            
+        返回:
+            int: 保存译文的字幕ID，分段不在本次记录中或字幕已经写入文件时返回None
+        """
+        with self.lock:
+            if not self.recording or not segment_ids:
+                return None
+            for segment_id in segment_ids[:-1]:
+                cue_id = self.segment_cues.get(segment_id)
+                if cue_id is not None and cue_id >= self.written_count:
+                    self.covered_cues.add(cue_id)
+                    self.continued_cues.discard(cue_id)
+            
+            segment_id = segment_ids[-1]
+            cue_id = self.segment_cues.get(segment_id)
+            if cue_id is None:
+                print(f"未找到识别分段 {segment_id} 对应的字幕（不在本次记录中或已写入关闭的文件），译文未保存")
+                return None
+            if cue_id < self.written_count:
+                print(f"识别分段 {segment_id} 的字幕等待译文超时，已经写入文件，译文未保存")
+                return None
+            if translated_text:
+                self.cues.set_translation(cue_id, self._join(self.cues.get_translation(cue_id), translated_text))
+            if extra_translations:
+                existing = self.cues.get_extra_translations(cue_id)
+                extra_translations = {lang_code: self._join(existing.get(lang_code), text)
+                                      for lang_code, text in extra_translations.items()}
+            self._update_cue(cue_id, extra_translations, metadata)
+            if continued:
+                self.continued_cues.add(cue_id)
+            else:
+                self.continued_cues.discard(cue_id)
+            self._flush_cues(self._settled_count())
+            self._rotate_if_needed()
+            return cue_id
     
-    def add_subtitle(self, original_text, translated_text=None):
-        """添加字幕条目，仅当文本内容变化时才添加新记录"""
-        if not self.recording:
-            return
+    @staticmethod
+    def _join(existing, text):
+        """把同一分段中后一个句子的译文追加到已有译文之后"""
+        if existing and text:
+            return f"{existing} {text}"
+        return existing or text
+    
+    def _settled_count(self):
+        """
+        计算可以写入文件的字幕条数
+        
+        最后一条字幕的译文还可能更新，始终保留；之前的字幕收到译文（且不再追加）、译文保存在句子的
+        最后一个分段中、原文为空、等待译文超过 translation_wait_seconds 秒，或之后已有 MAX_PENDING_CUES
+        条字幕时视为已确定。字幕按顺序写入，遇到未确定的字幕即停止。
+        """
+        cues = self.cues
+        last = len(cues) - 1
+        end = self.written_count
+        expired_before = time.monotonic_ns() - self.translation_wait_ns
+        while end < last and ((cues.get_translation(end) and end not in self.continued_cues)
+                              or end in self.covered_cues or not cues.get_original(end).strip()
+                              or cues.get_timestamp_ns(end) <= expired_before
+                              or last - end >= MAX_PENDING_CUES):
+            end += 1
+        return end
+    
+    def _update_cue(self, cue_id, extra_translations, metadata):
+        """设置字幕条目的其他语言译文和识别信息"""
+        if extra_translations:
+            for lang_code, text in extra_translations.items():
+                self.cues.set_extra_translation(cue_id, lang_code, text)
+        if metadata:
+            self.cues.set_metadata(cue_id, metadata)
+    
+    def save_subtitle_file(self):
+        """写入所有未写入的字幕并关闭当前的字幕文件，其他目标语言的译文轨道保存为单独的文件"""
+        with self.lock:
+            if not self.current_file:
+                return
             
-        # 检查原文是否与上次相同
-        if original_text == self.last_original_text:
-            # 如果原文相同，但有译文且与上次不同，则更新上次记录的译文
-            if translated_text and translated_text != self.last_translated_text and self.translated_texts:
-                self.last_translated_text = translated_text
-                self.translated_texts[-1] = (translated_text, self.translated_texts[-1][1])
+            self._flush_cues(len(self.cues))
+            self._close_writers()
+            
+            # 生成一个新的文件，以防止覆盖
+            if self.recording:
+                self._start_files(time.monotonic_ns())
+    
+    def _rotate_if_needed(self):
+        """当前字幕文件达到大小或时长限制时关闭它，之后的字幕写入新文件"""
+        if not self.writers:
+            return
+        size_reached = self.max_file_bytes and any(writer.file.tell() >= self.max_file_bytes
+                                                   for writer in self.writers.values())
+        time_reached = (self.max_file_seconds and
+                        time.monotonic_ns() - self.file_start_ns >= self.max_file_seconds * 1_000_000_000)
+        count_reached = self.written_count - self.file_first_cue >= MAX_FILE_CUES
+        if not (size_reached or time_reached or count_reached):
             return
         
-        # 记录字幕文本
-        timestamp = datetime.datetime.now()
-        
-        # 添加到列表
-        self.original_texts.append((original_text, timestamp))
-        # 确保译文列表长度与原文列表相同，未翻译时保存空值
-        if translated_text:
-            self.translated_texts.append((translated_text, timestamp))
+        self._close_writers()
+        # 新文件从第一条未写入的字幕开始计时
+        if self.written_count < len(self.cues):
+            self._start_files(self.cues.get_timestamp_ns(self.written_count))
         else:
-            # 添加空值占位，确保两个列表长度一致
-            self.translated_texts.append(("", timestamp))
+            self._start_files(time.monotonic_ns())
+        print(f"Rotated subtitle file to {self.current_file}")
+    
+    def _start_files(self, start_ns):
+        """
+        设置新的字幕文件路径，文件在写入第一条字幕时才创建
         
-        # 更新上次记录的文本
-        self.last_original_text = original_text
-        self.last_translated_text = translated_text
+        参数:
+            start_ns (int): 文件起点的单调时钟时间（纳秒），文件名使用对应的本地时间
+        """
+        self.file_start_ns = start_ns
+        self.file_first_cue = self.written_count
+        # 之前的字幕都已经写入关闭的文件，丢弃它们和对应的识别分段
+        if self.cues.first_id < self.file_first_cue:
+            self.cues.discard_before(self.file_first_cue)
+            self.segment_cues = {segment_id: cue_id for segment_id, cue_id in self.segment_cues.items()
+                                 if cue_id >= self.file_first_cue}
+        file_time = self.start_time + datetime.timedelta(microseconds=(start_ns - self.start_ns) // 1000)
+        base_path = os.path.join(self.subtitle_dir, f"subtitle_{file_time.strftime('%Y%m%d_%H%M%S')}")
+        # 同一秒内换用新文件时加序号，避免覆盖刚关闭的文件（包括已经压缩的文件）
+        candidate, part = base_path, 1
+        while candidate == self.base_path or self._file_exists(candidate):
+            part += 1
+            candidate = f"{base_path}_{part}"
+        self.base_path = candidate
+        self.current_file = self.base_path + SUBTITLE_WRITERS[self.formats[0]].extension
+        self.writers = {}
+        self.file_cue_count = 0
     
-    def save_subtitle_file(self):
-        """保存字幕文件为SRT格式"""
-        if not self.current_file:
+    def _file_exists(self, base_path):
+        """是否已经存在该路径的字幕文件（未压缩或已压缩）"""
+        path = base_path + SUBTITLE_WRITERS[self.formats[0]].extension
+        return any(os.path.exists(path + suffix) for suffix in [""] + list(COMPRESSION_EXTENSIONS.values()))
+    
+    def _close_writers(self):
+        """关闭所有字幕写入器，启用压缩时在后台压缩关闭的文件"""
+        for writer in self.writers.values():
+            writer.close()
+        if self.compressor and self.writers:
+            self.compressor.submit([writer.path for writer in self.writers.values()])
+        self.writers = {}
+    
+    def _ensure_writers(self):
+        """
+        为每种格式和每条译文轨道创建写入器
+        
+        新出现的语言轨道在创建时补写之前已经写入的字幕（译文为空），
+        使每个文件都包含所有原文条目。
+        """
+        lang_codes = [None] + list(self.cues.extra_translations)
+        for fmt in self.formats:
+            writer_class = SUBTITLE_WRITERS[fmt]
+            for lang_code in (lang_codes if writer_class.per_language else [None]):
+                if (fmt, lang_code) in self.writers:
+                    continue
+                suffix = f".{lang_code}" if lang_code else ""
+                writer = writer_class(f"{self.base_path}{suffix}{writer_class.extension}", lang_code)
+                for i in range(self.file_first_cue, self.written_count):
+                    cue = self._make_cue(i)
+                    if cue:
+                        writer.write(cue)
+                self.writers[(fmt, lang_code)] = writer
+    
+    def _flush_cues(self, end):
+        """
+        将序号小于end、尚未写入的字幕写入所有字幕文件
+        
+        参数:
+            end (int): 写入到该序号为止（不包括）
+        """
+        if self.written_count >= end:
             return
+        self._ensure_writers()
+        indexed_cues = []
+        for i in range(self.written_count, end):
+            cue = self._make_cue(i)
+            if cue:
+                for writer in self.writers.values():
+                    writer.write(cue)
+                self.file_cue_count += 1
+                indexed_cues.append((self.file_cue_count, cue.start_ms, cue.end_ms,
+                                     cue.original, cue.translation, cue.language))
+        self.written_count = end
+        if self.covered_cues or self.continued_cues:
+            self.covered_cues = {cue_id for cue_id in self.covered_cues if cue_id >= end}
+            self.continued_cues = {cue_id for cue_id in self.continued_cues if cue_id >= end}
         
-        with open(self.current_file, 'w', encoding='utf-8') as f:
-            # 合并原文和译文
-            entries = []
-            
-            # 处理所有文本记录
-            for i, (text, timestamp) in enumerate(self.original_texts):
-                if text and text.strip():  # 确保文本不为空
-                    time_diff = (timestamp - self.start_time).total_seconds() * 1000
-                    start_time_ms = self.time_offset + time_diff
-                    end_time_ms = start_time_ms + 3000  # 每个字幕显示3秒
-                    
-                    # 查找对应的译文
-                    trans_text = ""
-                    if i < len(self.translated_texts):
-                        trans_text = self.translated_texts[i][0]
-                    
-                    entries.append({
-                        'index': len(entries) + 1,
-                        'start_time': start_time_ms,
-                        'end_time': end_time_ms,
-                        'original': text,
-                        'translation': trans_text
-                    })
-            
-            # 按时间排序
-            entries.sort(key=lambda x: x['start_time'])
-            
-            # 写入SRT格式
-            for i, entry in enumerate(entries):
-                # 索引
-                f.write(f"{i+1}\n")
-                
-                # 时间码
-                start = self.format_time(entry['start_time'])
-                end = self.format_time(entry['end_time'])
-                f.write(f"{start} --> {end}\n")
-                
-                # 字幕文本
-                f.write(f"{entry['original']}\n")
-                if entry['translation'] and entry['translation'].strip():
-                    f.write(f"{entry['translation']}\n")
-                
-                # 空行分隔
-                f.write("\n")
+        if self.index and indexed_cues:
+            try:
+                self.index.add_cues(os.path.basename(self.base_path), self._file_started_at(), indexed_cues)
+            except Exception as e:
+                print(f"写入字幕索引失败: {str(e)}")
+    
+    def _make_cue(self, cue_id):
+        """
+        根据记录的字幕生成写入文件用的字幕条目
         
-        print(f"Saved subtitle file: {self.current_file}")
+        参数:
+            cue_id (int): 字幕ID
+            
+        返回:
+            SubtitleCue: 字幕条目，原文为空时返回None
+        """
+        cues = self.cues
+        text = cues.get_original(cue_id)
+        if not text or not text.strip():
+            return None
+        time_diff = (cues.get_timestamp_ns(cue_id) - self.file_start_ns) / 1_000_000
+        start_time_ms = self.time_offset + time_diff
+        end_time_ms = start_time_ms + 3000  # 每个字幕显示3秒
         
-        # 生成一个新的文件，以防止覆盖
-        if self.recording:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.current_file = os.path.join(self.subtitle_dir, f"subtitle_{timestamp}.srt")
+        return SubtitleCue(
+            cue_id + 1, start_time_ms, end_time_ms, text,
+            translation=cues.get_translation(cue_id),
+            translations=cues.get_extra_translations(cue_id),
+            **cues.get_metadata(cue_id)
+        )
+    
+    def _file_started_at(self):
+        """当前字幕文件起点的Unix时间戳（秒）"""
+        return self.start_time.timestamp() + (self.file_start_ns - self.start_ns) / 1_000_000_000
     
     def format_time(self, milliseconds):
         """将毫秒转换为SRT时间格式 HH:MM:SS,mmm"""
-        total_seconds = int(milliseconds / 1000)
-        ms = int(milliseconds % 1000)
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+        return SrtWriter.format_time(milliseconds)
     
     def is_recording(self):
         """检查是否正在记录字幕"""
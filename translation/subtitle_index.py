@@ -0,0 +1,330 @@
+"""
+字幕全文索引
+
+将字幕条目写入SQLite FTS5数据库，可以快速查找某个呼号或词语在什么时候出现过。
+录制字幕时由 SubtitleFileManager 在每条字幕写入文件时同步写入索引，
+已有的字幕文件（包括轮换后压缩的 .srt.gz、.srt.zst 文件）可以通过 index_directory 增量导入。
+
+命令行用法:
+    python -m translation.subtitle_index index [字幕目录]
+    python -m translation.subtitle_index search BG7YYK [--limit 20] [--language en] [--session subtitle_20240101_120000]
+"""
+import os
+import re
+import sys
+import sqlite3
+import argparse
+import datetime
+import threading
+from translation.subtitle_archive import open_subtitle_file, split_compression_extension
+
+# 默认的索引数据库路径
+DEFAULT_INDEX_PATH = os.path.join("Subtitles", "subtitle_index.db")
+
+# 录制时生成的主字幕文件名，轮换时同一秒内的文件带序号，可能已经压缩
+# （其他语言轨道如 subtitle_20240101_120000.ja.srt 不导入）
+SESSION_FILE_PATTERN = re.compile(r'^subtitle_(\d{8}_\d{6})(?:_\d+)?\.srt(?:\.gz|\.zst)?$')
+# SRT时间码
+SRT_TIME_PATTERN = re.compile(
+    r'(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})')
+
+# 三字符分词（trigram）支持任意子串查找，包括中文和呼号的一部分，但查询至少需要3个字符
+MIN_FTS_QUERY_LENGTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    started_at REAL
+);
+CREATE TABLE IF NOT EXISTS cues (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    cue_index INTEGER NOT NULL,
+    start_ms INTEGER,
+    end_ms INTEGER,
+    time REAL,
+    language TEXT,
+    original TEXT,
+    translation TEXT,
+    UNIQUE (session_id, cue_index)
+);
+CREATE INDEX IF NOT EXISTS cues_time ON cues(time);
+CREATE VIRTUAL TABLE IF NOT EXISTS cues_fts USING fts5(
+    original, translation, content='cues', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS cues_after_insert AFTER INSERT ON cues BEGIN
+    INSERT INTO cues_fts(rowid, original, translation) VALUES (new.id, new.original, new.translation);
+END;
+CREATE TRIGGER IF NOT EXISTS cues_after_delete AFTER DELETE ON cues BEGIN
+    INSERT INTO cues_fts(cues_fts, rowid, original, translation) VALUES ('delete', old.id, old.original, old.translation);
+END;
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+"""
+
+
+def parse_srt(path):
+    """
+    解析SRT文件，按行流式读取，压缩的文件边读边解压
+
+    参数:
+        path (str): 文件路径（.srt、.srt.gz 或 .srt.zst）
+
+    返回:
+        list: [(序号, 开始毫秒, 结束毫秒, 原文, 译文), ...]，第一行文本作为原文，其余行作为译文
+    """
+    cues = []
+    block = []
+    with open_subtitle_file(path) as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line.strip():
+                block.append(line)
+                continue
+            _parse_srt_block(block, cues)
+            block = []
+    _parse_srt_block(block, cues)
+    return cues
+
+
+def _parse_srt_block(lines, cues):
+    """解析一条SRT字幕的文本行，有效时添加到cues"""
+    lines = '\n'.join(lines).strip().split('\n')
+    if len(lines) < 3 or not lines[0].strip().isdigit():
+        return
+    match = SRT_TIME_PATTERN.search(lines[1])
+    if not match:
+        return
+    h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(value) for value in match.groups())
+    start_ms = ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1
+    end_ms = ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2
+    cues.append((int(lines[0]), start_ms, end_ms, lines[2], '\n'.join(lines[3:])))
+
+
+class SubtitleIndex:
+    """
+    字幕全文索引（SQLite FTS5）
+
+    可以在多个线程中使用，写入和查询通过锁串行化。
+    """
+
+    def __init__(self, db_path=DEFAULT_INDEX_PATH):
+        """
+        参数:
+            db_path (str): 数据库文件路径，目录不存在时自动创建
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._session_ids = {}
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """关闭数据库"""
+        with self._lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+
+    def _session_id(self, session, started_at):
+        """获取会话ID，不存在时创建（需要持有锁）"""
+        session_id = self._session_ids.get(session)
+        if session_id is None:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO sessions(name, started_at) VALUES (?, ?)", (session, started_at))
+            session_id = self.connection.execute(
+                "SELECT id FROM sessions WHERE name = ?", (session,)).fetchone()[0]
+            self._session_ids[session] = session_id
+        return session_id
+
+    def add_cue(self, session, started_at, cue_index, start_ms, end_ms, original, translation="", language=None):
+        """
+        添加一条字幕，同一会话中已有相同序号的字幕时忽略
+
+        参数:
+            session (str): 会话名称（字幕文件名，不含扩展名）
+            started_at (float): 会话开始时间（Unix时间戳）
+            cue_index (int): 字幕序号
+            start_ms (float): 相对会话开始的时间（毫秒）
+            end_ms (float): 结束时间（毫秒）
+            original (str): 原文
+            translation (str): 译文
+            language (str): 识别出的语言代码
+        """
+        self.add_cues(session, started_at, [(cue_index, start_ms, end_ms, original, translation, language)])
+
+    def add_cues(self, session, started_at, cues):
+        """
+        在一个事务中添加多条字幕
+
+        参数:
+            session (str): 会话名称
+            started_at (float): 会话开始时间（Unix时间戳）
+            cues (list): [(序号, 开始毫秒, 结束毫秒, 原文, 译文, 语言代码), ...]
+        """
+        with self._lock, self.connection:
+            session_id = self._session_id(session, started_at)
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO cues(session_id, cue_index, start_ms, end_ms, time, language, original, translation) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(session_id, cue_index, round(start_ms), round(end_ms), started_at + start_ms / 1000.0,
+                  language, original, translation or "")
+                 for cue_index, start_ms, end_ms, original, translation, language in cues])
+
+    def index_file(self, path):
+        """
+        导入一个字幕文件，文件未变化时跳过
+
+        参数:
+            path (str): SRT文件路径，文件名格式为 subtitle_YYYYmmdd_HHMMSS.srt，可以是压缩的 .srt.gz 或 .srt.zst
+
+        返回:
+            int: 导入的字幕条数，跳过时为0
+        """
+        match = SESSION_FILE_PATTERN.match(os.path.basename(path))
+        if not match:
+            return 0
+        stat = os.stat(path)
+        with self._lock:
+            row = self.connection.execute("SELECT mtime_ns, size FROM files WHERE path = ?", (path,)).fetchone()
+        if row and (row["mtime_ns"], row["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return 0
+
+        started_at = datetime.datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+        session = os.path.splitext(split_compression_extension(os.path.basename(path))[0])[0]
+        cues = [cue + (None,) for cue in parse_srt(path)]
+        self.add_cues(session, started_at, cues)
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO files(path, mtime_ns, size) VALUES (?, ?, ?)",
+                                    (path, stat.st_mtime_ns, stat.st_size))
+        return len(cues)
+
+    def index_directory(self, directory="Subtitles"):
+        """
+        增量导入目录中的所有字幕文件
+
+        参数:
+            directory (str): 字幕目录
+
+        返回:
+            tuple: (导入的文件数, 导入的字幕条数)
+        """
+        file_count = cue_count = 0
+        for name in sorted(os.listdir(directory)):
+            count = self.index_file(os.path.join(directory, name))
+            if count:
+                file_count += 1
+                cue_count += count
+        return file_count, cue_count
+
+    def search(self, query, limit=50, session=None, language=None, since=None, until=None):
+        """
+        在原文和译文中查找字幕，按时间从新到旧返回
+
+        查询作为一个短语匹配（不区分大小写，可以匹配单词的一部分）。
+
+        参数:
+            query (str): 查询文本
+            limit (int): 最多返回的条数
+            session (str): 只查找指定会话
+            language (str): 只查找指定识别语言
+            since (float): 开始时间（Unix时间戳）
+            until (float): 结束时间（Unix时间戳）
+
+        返回:
+            list: [{"session", "cue_index", "time", "start_ms", "end_ms", "language", "original", "translation"}, ...]
+        """
+        query = query.strip()
+        if not query:
+            return []
+        conditions, params = [], []
+        if len(query) >= MIN_FTS_QUERY_LENGTH:
+            conditions.append("cues.id IN (SELECT rowid FROM cues_fts WHERE cues_fts MATCH ?)")
+            params.append('"' + query.replace('"', '""') + '"')
+        else:
+            # 太短的查询无法使用三字符索引
+            pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(cues.original LIKE ? ESCAPE '\\' OR cues.translation LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        if session:
+            conditions.append("sessions.name = ?")
+            params.append(session)
+        if language:
+            conditions.append("cues.language = ?")
+            params.append(language)
+        if since is not None:
+            conditions.append("cues.time >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("cues.time < ?")
+            params.append(until)
+        params.append(limit)
+
+        sql = ("SELECT sessions.name AS session, cues.cue_index, cues.time, cues.start_ms, cues.end_ms, "
+               "cues.language, cues.original, cues.translation "
+               "FROM cues JOIN sessions ON sessions.id = cues.session_id "
+               f"WHERE {' AND '.join(conditions)} ORDER BY cues.time DESC LIMIT ?")
+        with self._lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def get_stats(self):
+        """
+        获取索引统计
+
+        返回:
+            dict: {"sessions": 会话数, "cues": 字幕条数}
+        """
+        with self._lock:
+            sessions = self.connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            cues = self.connection.execute("SELECT COUNT(*) FROM cues").fetchone()[0]
+        return {"sessions": sessions, "cues": cues}
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="字幕全文索引")
+    parser.add_argument("--db", default=DEFAULT_INDEX_PATH, help="索引数据库路径")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="导入字幕目录中新增或修改的字幕文件")
+    index_parser.add_argument("directory", nargs="?", default="Subtitles")
+
+    search_parser = commands.add_parser("search", help="查找字幕")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=50)
+    search_parser.add_argument("--session")
+    search_parser.add_argument("--language")
+
+    args = parser.parse_args(argv)
+    index = SubtitleIndex(args.db)
+    try:
+        if args.command == "index":
+            file_count, cue_count = index.index_directory(args.directory)
+            stats = index.get_stats()
+            print(f"导入了 {file_count} 个文件、{cue_count} 条字幕，索引共 {stats['sessions']} 个会话、{stats['cues']} 条字幕")
+        else:
+            start_time = datetime.datetime.now()
+            results = index.search(args.query, args.limit, args.session, args.language)
+            elapsed_ms = (datetime.datetime.now() - start_time).total_seconds() * 1000
+            for result in results:
+                time_text = datetime.datetime.fromtimestamp(result["time"]).strftime("%Y-%m-%d %H:%M:%S")
+                translation = f"  |  {result['translation']}" if result["translation"] else ""
+                print(f"{time_text}  [{result['session']} #{result['cue_index']}]  {result['original']}{translation}")
+            print(f"找到 {len(results)} 条结果，用时 {elapsed_ms:.1f} 毫秒")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
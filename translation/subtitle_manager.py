@@ -2,9 +2,13 @@ from googletrans import Translator
 import time
 import threading
 from translation.term_manager import TermManager
+from translation.singleflight import SingleFlight
+from translation.resilience import GuardedBackend
+from config import config
 import re
 import uuid
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 class SubtitleManager:
     def __init__(self):
@@ -12,8 +16,28 @@ class SubtitleManager:
         self.translation_cache = {}  # 缓存已翻译的文本，减少API调用
         self.lock = threading.Lock()  # 线程锁，防止多线程同时访问缓存
         
+        # 合并并发的相同翻译请求，同一 (文本, 目标语言) 只发起一次后端调用
+        self.inflight_requests = SingleFlight()
+        
+        # 翻译后端保护：截止时间、对冲请求和熔断
+        # 可通过 set_secondary_backend 设置备用后端，熔断时自动切换；否则熔断期间返回原文
+        self.backend = GuardedBackend(
+            primary=self._call_google_translate,
+            timeout=config.get("translation_timeout_ms", 3000) / 1000.0,
+            hedge_enabled=config.get("translation_hedge_enabled", True)
+        )
+        
+        # 多目标语言同时翻译时使用的线程池，总延迟约等于最慢的一次翻译
+        self.fanout_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="translate_fanout")
+        
         # 初始化术语管理器
         self.term_manager = TermManager()
+        # 术语文件保存后自动重新加载，修改立即生效
+        if config.get("term_hot_reload_enabled", True):
+            self.term_manager.start_watching()
+        # 纠正语音识别拆开或拼错的术语和呼号
+        self.term_correction_enabled = config.get("term_correction_enabled", True)
+        self.term_manager.set_known_callsigns(config.get("known_callsigns", []))
         
         # 翻译延迟计时
         self.translation_delay = 0  # 翻译延迟（毫秒）
@@ -76,7 +100,7 @@ class SubtitleManager:
             "cs": "捷克语"
         }
     
-    def translate(self, text, target_language, debug=False):
+    def translate(self, text, target_language, debug=False, source_language=None):
         """
         翻译文本，处理业余无线电术语
         
@@ -84,6 +108,7 @@ class SubtitleManager:
             text (str): 要翻译的文本
             target_language (str): 目标语言
             debug (bool): 是否输出调试信息
+            source_language (str): Whisper检测到的源语言代码（如"en"），与目标语言相同时直接返回原文
             
         返回:
             str: 翻译后的文本
@@ -95,35 +120,145 @@ class SubtitleManager:
         target_code = self.get_language_code(target_language)
         if not target_code:
             return text
+        
+        # 源语言与目标语言相同，无需调用翻译后端
+        if self.is_same_language(source_language, target_code):
+            if debug:
+                print(f"源语言 {source_language} 与目标语言 {target_code} 相同，跳过翻译")
+            self.translation_delay = 0
+            return text
             
         # 记录开始时间
         start_time = time.time()
         
+        prepared_text = text
         try:
-            # 步骤1: 处理信号报告
-            processed_text = self.term_manager.extract_and_convert_signal_report(text)
+            prepared_text = self.prepare_text(text, debug, target_code)
+            final_text = self._translate_prepared(prepared_text, target_code, debug, terms_translated=True)
+        except Exception as e:
             if debug:
-                print(f"步骤1 - 信号报告处理: {processed_text}")
+                print(f"翻译过程出错: {str(e)}")
+                traceback.print_exc()
+            # 发生错误时返回经过信号报告和呼号处理的文本，这样至少保留了基本处理
+            return prepared_text
+        
+        # 计算翻译延迟
+        end_time = time.time()
+        self.translation_delay = int((end_time - start_time) * 1000)
+        
+        return final_text
+    
+    def translate_multi(self, text, target_languages, debug=False, source_language=None):
+        """
+        同时将文本翻译为多种目标语言
+        
+        与语言无关的预处理（信号报告、字母解释法呼号）只执行一次，各目标语言的翻译并发进行，
+        总延迟约等于最慢的一次翻译，而不是所有翻译延迟之和。
+        
+        参数:
+            text (str): 要翻译的文本
+            target_languages (list): 目标语言名称列表
+            debug (bool): 是否输出调试信息
+            source_language (str): Whisper检测到的源语言代码，与某个目标语言相同时该语言直接返回原文
             
-            # 步骤2: 处理特殊术语
-            special_terms_processed = self.term_manager.direct_translate(processed_text, target_code)
+        返回:
+            dict: {目标语言名称: 译文}
+        """
+        if not text:
+            return {language: "" for language in target_languages}
+        
+        start_time = time.time()
+        
+        try:
+            prepared_text = self.prepare_text(text, debug)
+        except Exception as e:
             if debug:
-                print(f"步骤2 - 特殊术语处理: {special_terms_processed}")
+                print(f"预处理出错: {str(e)}")
+            prepared_text = text
+        
+        results = {}
+        futures = {}
+        for language in target_languages:
+            target_code = self.get_language_code(language)
+            if not target_code or self.is_same_language(source_language, target_code):
+                results[language] = text
+            else:
+                futures[language] = self.fanout_executor.submit(
+                    self._translate_prepared, prepared_text, target_code, debug
+                )
+        
+        for language, future in futures.items():
+            try:
+                results[language] = future.result()
+            except Exception as e:
+                if debug:
+                    print(f"翻译到 {language} 出错: {str(e)}")
+                results[language] = prepared_text
+        
+        self.translation_delay = int((time.time() - start_time) * 1000)
+        return results
+    
+    def prepare_text(self, text, debug=False, target_code=None):
+        """
+        预处理：单次扫描完成信号报告和字母解释法呼号的转换
+        
+        参数:
+            text (str): 原始文本
+            debug (bool): 是否输出调试信息
+            target_code (str): 目标语言代码，指定时在同一次扫描中处理特殊术语
             
-            # 步骤3: 处理字母解释法呼号
-            processed_text = self.term_manager.extract_and_convert_phonetic_callsign(special_terms_processed)
-            if debug:
-                print(f"步骤3 - 呼号处理: {processed_text}")
+        返回:
+            str: 预处理后的文本
+        """
+        # 步骤0: 纠正识别错误的术语和呼号
+        if self.term_correction_enabled:
+            corrected_text = self.term_manager.correct_terms(text)
+            if debug and corrected_text != text:
+                print(f"步骤0 - 术语纠正: {corrected_text}")
+            text = corrected_text
+        
+        # 步骤1-2: 处理信号报告和字母解释法呼号（指定目标语言时同时完成步骤3）
+        processed_text = self.term_manager.normalize_text(text, target_code)
+        if debug:
+            print(f"步骤1 - 信号报告、呼号处理: {processed_text}")
+        
+        return processed_text
+    
+    def _translate_prepared(self, prepared_text, target_code, debug=False, terms_translated=False):
+        """
+        翻译经过prepare_text预处理的文本到指定语言
+        
+        参数:
+            prepared_text (str): prepare_text的输出
+            target_code (str): 目标语言代码
+            debug (bool): 是否输出调试信息
+            terms_translated (bool): prepare_text是否已经处理过该语言的特殊术语
             
-            # 步骤4: 预处理术语
-            preprocessed_text, replacements = self.term_manager.preprocess_ham_radio_terms(processed_text, target_code)
+        返回:
+            str: 翻译后的文本，翻译后端出错时返回经过术语处理的文本
+        """
+        # 步骤3: 处理特殊术语
+        processed_text = prepared_text
+        if not terms_translated:
+            processed_text = self.term_manager.direct_translate(prepared_text, target_code)
             if debug:
-                print(f"步骤4 - 术语预处理: {preprocessed_text}")
-                print(f"术语替换表: {replacements}")
-            
-            # 步骤5: 翻译非术语部分
+                print(f"步骤3 - 特殊术语处理: {processed_text}")
+        
+        # 步骤4: 预处理术语
+        preprocessed_text, replacements = self.term_manager.preprocess_ham_radio_terms(processed_text, target_code)
+        if debug:
+            print(f"步骤4 - 术语预处理: {preprocessed_text}")
+            print(f"术语替换表: {replacements}")
+        
+        # 步骤5: 翻译非术语部分
+        if not self.term_manager.has_translatable_content(preprocessed_text, target_code):
+            # 只包含术语、呼号、数字和标点，直接在本地组装结果，不调用翻译API
+            translated_text = preprocessed_text
+            if debug:
+                print(f"步骤5 - 无需翻译，跳过翻译API: {translated_text}")
+        else:
             try:
-                translated_text = self.translator.translate(preprocessed_text, dest=target_code).text
+                translated_text = self._translate_backend(preprocessed_text, target_code)
                 if debug:
                     print(f"步骤5 - 基础翻译: {translated_text}")
             except Exception as e:
@@ -131,44 +266,59 @@ class SubtitleManager:
                     print(f"谷歌翻译API出错: {str(e)}")
                 # 如果翻译失败，返回处理后的文本
                 return processed_text
+        
+        # 步骤6: 还原术语占位符
+        try:
+            final_text = self.term_manager.restore_ham_radio_terms(translated_text, replacements)
             
-            # 步骤6: 还原术语占位符
-            try:
-                final_text = self.term_manager.restore_ham_radio_terms(translated_text, replacements)
-                
-                # 检查是否还有未替换的占位符
-                if '__TERM_' in final_text or '__term_' in final_text:
-                    # 如果还有未替换的占位符，尝试再次执行替换
-                    final_text = self.term_manager.restore_ham_radio_terms(final_text, replacements)
-                
-                if debug:
-                    print(f"步骤6 - 术语还原: {final_text}")
-            except Exception as e:
-                if debug:
-                    print(f"术语还原出错: {str(e)}")
-                    traceback.print_exc()
-                # 如果还原失败，返回翻译后的文本
-                final_text = translated_text
-            
-            # 计算翻译延迟
-            end_time = time.time()
-            self.translation_delay = int((end_time - start_time) * 1000)
-            
-            return final_text
+            # 检查是否还有未替换的占位符
+            if '__TERM_' in final_text or '__term_' in final_text:
+                # 如果还有未替换的占位符，尝试再次执行替换
+                final_text = self.term_manager.restore_ham_radio_terms(final_text, replacements)
             
+            if debug:
+                print(f"步骤6 - 术语还原: {final_text}")
         except Exception as e:
             if debug:
-                print(f"翻译过程出错: {str(e)}")
+                print(f"术语还原出错: {str(e)}")
                 traceback.print_exc()
-            # 发生错误时返回原文或经过处理的文本
-            # 优先返回经过呼号处理的文本，这样至少保留了基本处理
-            try:
-                if 'processed_text' in locals():
-                    return processed_text
-                else:
-                    return text
-            except:
-                return text
+            # 如果还原失败，返回翻译后的文本
+            final_text = translated_text
+        
+        return final_text
+    
+    def _translate_backend(self, text, target_code):
+        """
+        调用翻译后端，合并并发的相同请求
+        
+        参数:
+            text (str): 经过术语预处理的文本
+            target_code (str): 目标语言代码
+            
+        返回:
+            str: 后端返回的译文
+        """
+        return self.inflight_requests.do(
+            (text, target_code),
+            self.backend.call, text, target_code
+        )
+    
+    def _call_google_translate(self, text, target_code):
+        """调用谷歌翻译API"""
+        return self.translator.translate(text, dest=target_code).text
+    
+    def set_secondary_backend(self, backend):
+        """
+        设置备用翻译后端，主后端熔断或失败时使用
+        
+        参数:
+            backend (callable): 签名为 (text, target_code) -> str 的翻译函数，None表示不使用备用后端
+        """
+        self.backend.secondary = backend
+    
+    def get_backend_stats(self):
+        """获取翻译后端统计信息（超时、对冲、熔断状态等）"""
+        return self.backend.get_stats()
     
     def _restore_case(self, translated_text, original_patterns):
         """
@@ -220,6 +370,21 @@ class SubtitleManager:
         
         return result
     
+    def is_same_language(self, source_code, target_code):
+        """
+        判断源语言与目标语言是否相同，只比较主语言部分（如"zh"与"zh-cn"视为相同）
+        
+        参数:
+            source_code (str): 源语言代码，None表示未知
+            target_code (str): 目标语言代码
+            
+        返回:
+            bool: 是否为同一语言
+        """
+        if not source_code or not target_code:
+            return False
+        return source_code.split('-')[0].lower() == target_code.split('-')[0].lower()
+    
     def get_translation_delay(self):
         """获取翻译延迟（毫秒）"""
         return self.translation_delay
@@ -0,0 +1,227 @@
+import json
+
+
+class SubtitleCue:
+    """一条字幕，包括时间、原文、各语言译文和识别信息"""
+    __slots__ = ('index', 'start_ms', 'end_ms', 'original', 'translation', 'translations',
+                 'language', 'recognition_delay_ms', 'translation_delay_ms', 'confidence',
+                 'audio_file', 'audio_offset', 'audio_samples')
+
+    def __init__(self, index, start_ms, end_ms, original, translation="", translations=None,
+                 language=None, recognition_delay_ms=None, translation_delay_ms=None, confidence=None,
+                 audio_file=None, audio_offset=None, audio_samples=None):
+        """
+        参数:
+            index (int): 序号，从1开始
+            start_ms (float): 开始时间（毫秒）
+            end_ms (float): 结束时间（毫秒）
+            original (str): 原文
+            translation (str): 主目标语言译文
+            translations (dict): 其他目标语言的译文 {语言代码: 译文}
+            language (str): 识别出的语言代码
+            recognition_delay_ms (int): 识别延迟（毫秒）
+            translation_delay_ms (int): 翻译延迟（毫秒）
+            confidence (float): 识别置信度（0-1）
+            audio_file (str): 录音归档路径
+            audio_offset (int): 音频在录音归档中的采样位置
+            audio_samples (int): 音频的帧数
+        """
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.original = original
+        self.translation = translation
+        self.translations = translations or {}
+        self.language = language
+        self.recognition_delay_ms = recognition_delay_ms
+        self.translation_delay_ms = translation_delay_ms
+        self.confidence = confidence
+        self.audio_file = audio_file
+        self.audio_offset = audio_offset
+        self.audio_samples = audio_samples
+
+    def get_translation(self, lang_code=None):
+        """获取指定语言的译文，lang_code为None时返回主目标语言译文"""
+        if lang_code is None:
+            return self.translation
+        return self.translations.get(lang_code, "")
+
+
+def split_time(milliseconds):
+    """将毫秒拆分为 (时, 分, 秒, 毫秒)"""
+    total_seconds = int(milliseconds / 1000)
+    ms = int(milliseconds % 1000)
+    return total_seconds // 3600, (total_seconds % 3600) // 60, total_seconds % 60, ms
+
+
+class SubtitleWriter:
+    """
+    流式字幕写入器基类
+
+    打开文件时写入文件头，之后每条字幕确定后立即追加写入并刷新，不在内存中保留整个会话。
+    子类实现 _write_header 和 _write_cue。
+    """
+
+    # 文件扩展名
+    extension = None
+    # 是否每种译文语言写一个文件（否则一个文件包含所有语言）
+    per_language = True
+
+    def __init__(self, path, lang_code=None):
+        """
+        参数:
+            path (str): 输出文件路径
+            lang_code (str): 写入的译文语言，为None时写入主目标语言译文
+        """
+        self.path = path
+        self.lang_code = lang_code
+        self.count = 0
+        self.file = open(path, 'w', encoding='utf-8')
+        self._write_header()
+        self.file.flush()
+
+    def _write_header(self):
+        """写入文件头"""
+
+    def _write_cue(self, cue, translation):
+        """写入一条字幕"""
+        raise NotImplementedError
+
+    def write(self, cue):
+        """
+        追加一条字幕
+
+        参数:
+            cue (SubtitleCue): 字幕
+        """
+        self.count += 1
+        self._write_cue(cue, cue.get_translation(self.lang_code))
+        self.file.flush()
+
+    def close(self):
+        """关闭文件"""
+        if self.file:
+            self.file.close()
+            self.file = None
+            print(f"Saved subtitle file: {self.path}")
+
+
+class SrtWriter(SubtitleWriter):
+    """SRT字幕：原文和译文各占一行"""
+    extension = ".srt"
+
+    @staticmethod
+    def format_time(milliseconds):
+        """将毫秒转换为SRT时间格式 HH:MM:SS,mmm"""
+        return "{:02d}:{:02d}:{:02d},{:03d}".format(*split_time(milliseconds))
+
+    def _write_cue(self, cue, translation):
+        self.file.write(f"{self.count}\n")
+        self.file.write(f"{self.format_time(cue.start_ms)} --> {self.format_time(cue.end_ms)}\n")
+        self.file.write(f"{cue.original}\n")
+        if translation and translation.strip():
+            self.file.write(f"{translation}\n")
+        self.file.write("\n")
+
+
+class WebVttWriter(SubtitleWriter):
+    """WebVTT字幕"""
+    extension = ".vtt"
+
+    @staticmethod
+    def format_time(milliseconds):
+        """将毫秒转换为WebVTT时间格式 HH:MM:SS.mmm"""
+        return "{:02d}:{:02d}:{:02d}.{:03d}".format(*split_time(milliseconds))
+
+    @staticmethod
+    def escape(text):
+        """转义WebVTT中有特殊含义的字符"""
+        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    def _write_header(self):
+        self.file.write("WEBVTT\n\n")
+
+    def _write_cue(self, cue, translation):
+        self.file.write(f"{self.count}\n")
+        self.file.write(f"{self.format_time(cue.start_ms)} --> {self.format_time(cue.end_ms)}\n")
+        self.file.write(f"{self.escape(cue.original)}\n")
+        if translation and translation.strip():
+            self.file.write(f"{self.escape(translation)}\n")
+        self.file.write("\n")
+
+
+class AssWriter(SubtitleWriter):
+    """ASS字幕：原文和译文使用不同样式，分别作为一行对白写入"""
+    extension = ".ass"
+
+    HEADER = (
+        "[Script Info]\n"
+        "ScriptType: v4.00+\n"
+        "WrapStyle: 0\n"
+        "ScaledBorderAndShadow: yes\n"
+        "\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        "Style: Original,Arial,18,&H00C0C0C0,&H000000FF,&H00000000,&H00000000,"
+        "0,0,0,0,100,100,0,0,1,1,0,2,10,10,40,1\n"
+        "Style: Translation,Microsoft YaHei,22,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,"
+        "-1,0,0,0,100,100,0,0,1,1.5,0,2,10,10,12,1\n"
+        "\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+
+    @staticmethod
+    def format_time(milliseconds):
+        """将毫秒转换为ASS时间格式 H:MM:SS.cc"""
+        hours, minutes, seconds, ms = split_time(milliseconds)
+        return f"{hours}:{minutes:02d}:{seconds:02d}.{ms // 10:02d}"
+
+    @staticmethod
+    def escape(text):
+        """换行转为ASS换行符，花括号会被当作样式标签，替换为全角"""
+        return text.replace('\n', '\\N').replace('{', '｛').replace('}', '｝')
+
+    def _write_header(self):
+        self.file.write(self.HEADER)
+
+    def _write_cue(self, cue, translation):
+        start, end = self.format_time(cue.start_ms), self.format_time(cue.end_ms)
+        self.file.write(f"Dialogue: 0,{start},{end},Original,,0,0,0,,{self.escape(cue.original)}\n")
+        if translation and translation.strip():
+            self.file.write(f"Dialogue: 0,{start},{end},Translation,,0,0,0,,{self.escape(translation)}\n")
+
+
+class JsonlWriter(SubtitleWriter):
+    """JSON Lines：每行一条字幕，包含所有语言的译文和识别信息"""
+    extension = ".jsonl"
+    per_language = False
+
+    def _write_cue(self, cue, translation):
+        record = {
+            "index": self.count,
+            "start_ms": round(cue.start_ms),
+            "end_ms": round(cue.end_ms),
+            "original": cue.original,
+            "translation": cue.translation,
+            "translations": cue.translations,
+            "language": cue.language,
+            "recognition_delay_ms": cue.recognition_delay_ms,
+            "translation_delay_ms": cue.translation_delay_ms,
+            "confidence": cue.confidence,
+            "audio_file": cue.audio_file,
+            "audio_offset": cue.audio_offset,
+            "audio_samples": cue.audio_samples,
+        }
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# 支持的字幕格式 {格式名: 写入器类}
+SUBTITLE_WRITERS = {
+    "srt": SrtWriter,
+    "vtt": WebVttWriter,
+    "ass": AssWriter,
+    "jsonl": JsonlWriter,
+}
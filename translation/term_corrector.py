@@ -0,0 +1,309 @@
+import re
+import copy
+from translation.token_normalizer import NUMBER_WORDS, TRAILING_PUNCTUATION
+from translation.callsign_index import get_callsign_index
+
+# 英文字母的读音被识别成的单词（如 "Q are Z" -> "QRZ"）
+LETTER_SOUNDS = {
+    'ay': 'A', 'bee': 'B', 'be': 'B', 'see': 'C', 'sea': 'C', 'dee': 'D',
+    'ef': 'F', 'eff': 'F', 'gee': 'G', 'aitch': 'H', 'eye': 'I', 'jay': 'J',
+    'kay': 'K', 'el': 'L', 'ell': 'L', 'em': 'M', 'en': 'N', 'oh': 'O',
+    'pea': 'P', 'pee': 'P', 'queue': 'Q', 'cue': 'Q', 'are': 'R', 'ess': 'S',
+    'tea': 'T', 'tee': 'T', 'you': 'U', 'vee': 'V', 'double-u': 'W', 'ex': 'X',
+    'why': 'Y', 'zed': 'Z', 'zee': 'Z'
+}
+
+# 合并拆开的术语时最多检查的连续单词数
+MAX_MERGE_TOKENS = 8
+
+# 可作为纠错目标的术语：单个由字母和数字组成的单词
+VOCABULARY_PATTERN = re.compile(r'^[A-Z0-9]{2,}$')
+
+
+def edit_distance(a, b, max_distance):
+    """
+    计算两个字符串的编辑距离（插入、删除、替换和相邻交换各计1）
+
+    参数:
+        a (str): 字符串
+        b (str): 字符串
+        max_distance (int): 超过该距离时提前结束
+
+    返回:
+        int: 编辑距离，超过max_distance时返回max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[len(b)]
+
+
+class SymSpellIndex:
+    """
+    SymSpell 删除字典
+
+    预先为每个单词生成删除最多 max_distance 个字符后的所有变体，查询时只需生成输入的删除变体
+    并查表，再对少量候选计算编辑距离，不需要对整个词典逐个计算。
+    用 updated 增删单词时，新索引与原索引共享基础删除字典，只保存修改过的单词。
+    """
+
+    def __init__(self, words=(), max_distance=1, base=None, removed=()):
+        """
+        参数:
+            words: 单词列表
+            max_distance (int): 最大编辑距离
+            base (SymSpellIndex): 共享的基础索引（只读）
+            removed: 从基础索引中删除的单词
+        """
+        self.max_distance = max_distance
+        self.base = base
+        self.removed = set(removed)
+        # {删除变体: {单词, ...}}
+        self.deletes = {}
+        self.words = set()
+        for word in words:
+            self.add(word)
+
+    def updated(self, added=(), removed=()):
+        """
+        构建增删了单词的新索引，当前索引保持不变
+
+        参数:
+            added: 添加的单词
+            removed: 删除的单词
+
+        返回:
+            SymSpellIndex: 新索引
+        """
+        if self.base is None:
+            index = SymSpellIndex((), self.max_distance, self)
+        else:
+            # 复制本索引修改过的单词，基础索引继续共享
+            index = SymSpellIndex(self.words, self.max_distance, self.base, self.removed)
+        for word in removed:
+            index.discard(word)
+        for word in added:
+            index.add(word)
+        return index
+
+    def __contains__(self, word):
+        return word in self.words or (self.base is not None and word in self.base.words and word not in self.removed)
+
+    def _variants(self, word):
+        """生成删除最多 max_distance 个字符后的所有变体（包括单词本身）"""
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            next_frontier = set()
+            for item in frontier:
+                if len(item) <= 1:
+                    continue
+                for i in range(len(item)):
+                    next_frontier.add(item[:i] + item[i + 1:])
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    def add(self, word):
+        """添加单词"""
+        if not word or word in self.words:
+            return
+        if self.base is not None and word in self.base.words:
+            self.removed.discard(word)
+            return
+        self.words.add(word)
+        for variant in self._variants(word):
+            self.deletes.setdefault(variant, set()).add(word)
+
+    def discard(self, word):
+        """删除单词"""
+        if word in self.words:
+            self.words.remove(word)
+            for variant in self._variants(word):
+                self.deletes[variant].discard(word)
+        elif self.base is not None and word in self.base.words:
+            self.removed.add(word)
+
+    def lookup(self, word):
+        """
+        查找编辑距离最近的单词
+
+        返回:
+            list: [(距离, 单词), ...]，按距离排序，只包含距离最小的单词
+        """
+        if word in self:
+            return [(0, word)]
+        candidates = set()
+        for variant in self._variants(word):
+            candidates |= self.deletes.get(variant, set())
+            if self.base is not None:
+                candidates |= self.base.deletes.get(variant, set())
+        candidates -= self.removed
+
+        best = self.max_distance + 1
+        results = []
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, self.max_distance)
+            if distance < best:
+                best = distance
+                results = [candidate]
+            elif distance == best:
+                results.append(candidate)
+        if best > self.max_distance:
+            return []
+        return [(best, candidate) for candidate in sorted(results)]
+
+
+class TermCorrector:
+    """
+    识别错误的术语和呼号纠正
+
+    在术语处理之前运行，分两步：
+    1. 合并被拆开的术语：连续单词（字母读音、数字单词、单个字母或数字、大写字母数字组合）
+       拼接后正好是已知术语时合并，如 "Q are Z" -> "QRZ"，"BG 7 YYK" -> "BG7YYK"
+    2. 纠正拼写接近的单词：大写字母数字组合的单词不是已知术语时，在删除字典中查找编辑距离为1的术语，
+       只有唯一最近的候选时才替换。纯数字和有效的呼号（可能是其他电台的呼号）不做纠正。
+    """
+
+    def __init__(self, vocabulary, max_distance=1, callsign_index=None):
+        """
+        参数:
+            vocabulary: 已知术语和呼号
+            max_distance (int): 拼写纠正的最大编辑距离
+            callsign_index (CallsignPrefixIndex): 呼号前缀索引，默认使用内置的ITU前缀分配表
+        """
+        self.callsign_index = callsign_index or get_callsign_index()
+        self.vocabulary = {word.upper() for word in vocabulary if VOCABULARY_PATTERN.match(word.upper())}
+        self.index = SymSpellIndex(
+            (word for word in self.vocabulary if not word.isdigit()), max_distance
+        )
+        self.stats = {"merged": 0, "corrected": 0}
+
+    @staticmethod
+    def _piece(core):
+        """单词在拼接时对应的字符，不能参与拼接时返回None"""
+        lower = core.lower()
+        if lower in LETTER_SOUNDS:
+            return LETTER_SOUNDS[lower]
+        if lower in NUMBER_WORDS:
+            return NUMBER_WORDS[lower]
+        if core.isascii() and core.isalnum():
+            return core.upper()
+        return None
+
+    @staticmethod
+    def _is_anchor(core):
+        """单个字母或数字、或大写字母数字组合，说明这里可能是被拆开的术语"""
+        return core.isascii() and core.isalnum() and (len(core) == 1 or core.isupper() or core.isdigit())
+
+    def correct(self, text):
+        """
+        纠正文本中识别错误的术语
+
+        参数:
+            text (str): 识别结果
+
+        返回:
+            str: 纠正后的文本
+        """
+        if not text or not self.vocabulary:
+            return text
+
+        words = text.split()
+        tokens = []
+        for word in words:
+            core, punct = TRAILING_PUNCTUATION.match(word).groups()
+            tokens.append((word, core, punct))
+
+        result = []
+        i = 0
+        while i < len(tokens):
+            merged = self._merge_at(tokens, i)
+            if merged:
+                word, i = merged
+                result.append(word)
+                self.stats["merged"] += 1
+                continue
+            result.append(self._correct_word(*tokens[i]))
+            i += 1
+        return ' '.join(result)
+
+    def _merge_at(self, tokens, start):
+        """
+        从start开始尝试合并被拆开的术语，优先合并最长的
+
+        只由数字组成的合并结果（如 "7 3" -> "73"）不采用：分开说出的数字通常就是分开的数，
+        合并后会被当作术语注释（73 = best regards），改变原文的意思。
+
+        返回:
+            tuple: (合并后的单词, 下一个单词的位置)，无法合并时返回None
+        """
+        pieces = []
+        anchored = False
+        candidates = []
+        for j in range(start, min(len(tokens), start + MAX_MERGE_TOKENS)):
+            word, core, punct = tokens[j]
+            piece = self._piece(core) if core else None
+            if piece is None:
+                break
+            pieces.append(piece)
+            anchored = anchored or self._is_anchor(core)
+            joined = ''.join(pieces)
+            if j > start and anchored and not joined.isdigit() and joined in self.vocabulary:
+                candidates.append((joined + punct, j + 1))
+            if punct:
+                break
+        return candidates[-1] if candidates else None
+
+    def _correct_word(self, word, core, punct):
+        """纠正单个拼写接近已知术语的单词"""
+        if (len(core) < 3 or not core.isascii() or not core.isalnum() or not core.isupper()
+                or core in self.vocabulary or core.isdigit() or self.callsign_index.is_callsign(core)):
+            return word
+        matches = self.index.lookup(core)
+        if len(matches) != 1 or matches[0][0] == 0:
+            return word
+        self.stats["corrected"] += 1
+        return matches[0][1] + punct
+
+    def updated(self, added=(), removed=()):
+        """
+        构建增删了术语的新纠正器，删除字典与当前纠正器共享，当前纠正器保持不变
+
+        参数:
+            added: 添加的术语或呼号
+            removed: 删除的术语或呼号
+
+        返回:
+            TermCorrector: 新纠正器（统计重新计数）
+        """
+        added = {word.upper() for word in added if VOCABULARY_PATTERN.match(word.upper())}
+        removed = {word.upper() for word in removed} - added
+        corrector = copy.copy(self)
+        corrector.vocabulary = (self.vocabulary - removed) | added
+        corrector.index = self.index.updated(
+            (word for word in added if not word.isdigit()), (word for word in removed if not word.isdigit())
+        )
+        corrector.stats = {"merged": 0, "corrected": 0}
+        return corrector
+
+    def get_stats(self):
+        """
+        获取纠正统计
+
+        返回:
+            dict: {"merged": 合并次数, "corrected": 拼写纠正次数}
+        """
+        return dict(self.stats)
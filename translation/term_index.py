@@ -0,0 +1,188 @@
+from translation.term_matcher import AhoCorasickMatcher, FragmentMatcher, LayeredMatcher, _fold
+
+
+def translation_fragments(term, translation):
+    """
+    术语译文中出现在文本里时可以视为已经翻译的片段
+
+    译文以术语本身开头时（如"QSL（确认收到）"），术语部分可能已被替换为占位符，因此同时包含其后缀部分
+
+    参数:
+        term (str): 大写术语
+        translation (str): 译文
+
+    返回:
+        list: 译文片段列表
+    """
+    if not translation:
+        return []
+    fragments = [translation]
+    if translation.upper().startswith(term) and translation[len(term):].strip():
+        fragments.append(translation[len(term):].strip())
+    return fragments
+
+
+class TermIndex:
+    """
+    单一目标语言的术语索引
+
+    在加载术语时构建一次，包含 {大写术语: 译文} 字典和对应的术语匹配自动机，
+    供单词查找和文本中的术语匹配共同使用。添加或删除术语时原地更新，无需重新构建整个索引；
+    已发布到快照中的索引由翻译线程并发读取，修改前先用 copy 复制。
+    加载后的修改只更新匹配器的增量部分（LayeredMatcher），复制时共享构建好的基础自动机。
+    """
+
+    def __init__(self, lang_code, terms=None):
+        """
+        参数:
+            lang_code (str): 规范化后的目标语言代码（如 'zh-cn', 'en'）
+            terms (dict): 术语词典 {术语: {语言代码: 译文}}
+        """
+        self.lang_code = lang_code
+        # {大写术语: 译文}
+        self.translations = {}
+        # {大写术语: 术语词典中的原始键}
+        self.term_keys = {}
+        self.matcher = AhoCorasickMatcher()
+        # 译文片段的匹配自动机，用于判断文本中的译文是否已经翻译
+        self.fragment_matcher = FragmentMatcher()
+        # {折叠后的译文片段: 引用该片段的术语数}，多个术语的译文相同时只在最后一个删除后移除
+        self._fragment_counts = {}
+
+        if terms:
+            for term, translations in terms.items():
+                self.add(term, translations)
+        # 加载的术语构成基础自动机，之后的修改只更新增量部分
+        self.matcher = LayeredMatcher(self.matcher)
+        self.fragment_matcher = LayeredMatcher(self.fragment_matcher)
+        self.build()
+
+    def copy(self):
+        """
+        复制索引（写时复制），修改副本不影响原索引
+
+        匹配器只复制增量部分；术语字典是浅复制（C实现的字典复制，不重建任何结构）。
+
+        返回:
+            TermIndex: 副本
+        """
+        index = TermIndex.__new__(TermIndex)
+        index.lang_code = self.lang_code
+        index.translations = dict(self.translations)
+        index.term_keys = dict(self.term_keys)
+        index.matcher = self.matcher.copy()
+        index.fragment_matcher = self.fragment_matcher.copy()
+        index._fragment_counts = dict(self._fragment_counts)
+        return index
+
+    def build(self):
+        """添加术语后计算自动机的失败指针，索引被多个线程共享之前调用"""
+        for matcher in (self.matcher, self.fragment_matcher):
+            if not matcher.built:
+                matcher.build()
+
+    def add(self, term, translations):
+        """
+        添加或更新术语
+
+        参数:
+            term (str): 术语
+            translations (dict): 该术语的翻译字典 {语言代码: 译文}
+        """
+        if not term:
+            return
+        if not isinstance(translations, dict) or self.lang_code not in translations:
+            # 该术语没有当前语言的译文，确保不在索引中
+            self.remove(term)
+            return
+
+        key = term.upper()
+        if key in self.translations:
+            self._remove_fragments(key, self.translations[key])
+        else:
+            self.matcher.add(key)
+        self.translations[key] = translations[self.lang_code]
+        self.term_keys[key] = term
+        self._add_fragments(key, self.translations[key])
+
+    def remove(self, term):
+        """删除术语"""
+        key = term.upper()
+        if key in self.translations:
+            self._remove_fragments(key, self.translations.pop(key))
+            del self.term_keys[key]
+            self.matcher.remove(key)
+
+    def _add_fragments(self, key, translation):
+        """登记术语译文的片段"""
+        for fragment in translation_fragments(key, translation):
+            folded = _fold(fragment)
+            count = self._fragment_counts.get(folded, 0)
+            if not count:
+                self.fragment_matcher.add(folded)
+            self._fragment_counts[folded] = count + 1
+
+    def _remove_fragments(self, key, translation):
+        """取消登记术语译文的片段"""
+        for fragment in translation_fragments(key, translation):
+            folded = _fold(fragment)
+            count = self._fragment_counts.get(folded, 0) - 1
+            if count > 0:
+                self._fragment_counts[folded] = count
+            elif count == 0:
+                del self._fragment_counts[folded]
+                self.fragment_matcher.remove(folded)
+
+    def lookup(self, word):
+        """
+        查找单词对应的术语译文（大小写不敏感）
+
+        返回:
+            str: 译文，不是术语时返回None
+        """
+        return self.translations.get(word.upper())
+
+    def find(self, text):
+        """
+        查找文本中的术语（单词边界、大小写不敏感、最长优先）
+
+        返回:
+            list: [(开始位置, 结束位置, 大写术语), ...]
+        """
+        return self.matcher.find(text)
+
+    def replace(self, text, replace_func=None):
+        """
+        一次扫描替换文本中的术语
+
+        参数:
+            text (str): 原始文本
+            replace_func (callable): 签名为 (大写术语, 匹配到的原文) -> 替换文本，默认替换为术语译文
+
+        返回:
+            str: 替换后的文本
+        """
+        if replace_func is None:
+            replace_func = lambda term, matched_text: self.translations[term]
+        return self.matcher.replace(text, replace_func)
+
+    def remove_translations(self, text, replacement=' '):
+        """
+        一次扫描去掉文本中已经是该语言术语译文的部分
+
+        译文片段两端不能在单词中间，重叠时优先选择最靠左、最长的片段。
+
+        参数:
+            text (str): 文本
+            replacement (str): 替换译文片段的文本
+
+        返回:
+            str: 去掉译文片段后的文本
+        """
+        return self.fragment_matcher.replace(text, lambda fragment, matched_text: replacement)
+
+    def __contains__(self, word):
+        return word.upper() in self.translations
+
+    def __len__(self):
+        return len(self.translations)
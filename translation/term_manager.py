@@ -1,27 +1,188 @@
 import os
 import json
 import re
+import time
 import uuid
+import threading
+from translation.term_snapshot import TermSnapshot
+from translation.term_store import CompactTermStore, compile_term_store, get_rss_bytes
+from translation.term_watcher import TermFileWatcher
+from translation.term_corrector import TermCorrector
+from translation.lru_cache import LRUCache
+from translation.callsign_index import get_callsign_index
+from translation.batch_normalizer import (normalize_lines, normalize_in_pool, make_batch_stats,
+                                          PROCESS_POOL_MIN_LINES_PER_WORKER)
+from translation.token_normalizer import TokenNormalizer, PHONETIC_LETTERS
+
+# 字母解释法单词，仅用于检测带逗号的呼号片段
+PHONETIC_WORDS = list(PHONETIC_LETTERS) + ['xray']
+# 连续的字母解释法单词（可能有逗号分隔），例如: "Victor, Echo, 5, Alpha, Echo" 或 "Alpha Bravo"
+PHONETIC_SEGMENT_PATTERN = re.compile(
+    r'(?:' + '|'.join(PHONETIC_WORDS) + r')(?:,?\s+(?:' + '|'.join(PHONETIC_WORDS) + r'|\d+))+', re.IGNORECASE)
+# 只有一个逗号的字母解释法单词，例如 "Alpha, Bravo"
+PHONETIC_COMMA_PATTERN = re.compile(
+    r'(?:' + '|'.join(PHONETIC_WORDS) + r'),\s+(?:' + '|'.join(PHONETIC_WORDS) + r')', re.IGNORECASE)
+
+# 术语占位符及翻译后的变形：__TERM_0__、__ term_0 __、__TERM_0_
+PLACEHOLDER_PATTERN = re.compile(r'__\s*TERM_(\d+)(?:\s*__|_)', re.IGNORECASE)
+# preprocess_ham_radio_terms生成的占位符格式
+PLACEHOLDER_KEY_PATTERN = re.compile(r'^__TERM_(\d+)__$')
+# 译文中嵌套占位符的最大展开深度
+MAX_NESTED_PLACEHOLDER_DEPTH = 3
+# 还原后残留在标点前的下划线
+TRAILING_UNDERSCORE_PATTERN = re.compile(r'(\S)_([?？,.，。!！])')
+# 术语数量达到该值时编译为内存映射的紧凑术语库，而不是为每种语言构建内存中的索引
+COMPACT_STORE_MIN_TERMS = 5000
+# 规范化结果缓存的最大条目数（纠正、规范化和术语占位符预处理的结果）
+NORMALIZATION_CACHE_SIZE = 1024
 
 class TermManager:
     """业余无线电术语管理器，用于处理自定义术语翻译"""
     
     def __init__(self):
-        # 术语词典，格式为 {术语: {翻译目标语言代码: 翻译文本}}
-        self.terms = {}
-        # 正则表达式模式，用于匹配术语
-        self.patterns = {}
-        # 按照术语长度排序的术语列表，优先匹配较长的术语
-        self.sorted_terms = []
+        # 当前术语快照：术语词典 {术语: {翻译目标语言代码: 翻译文本}}、按长度排序的术语列表
+        # 和各目标语言的术语索引。更新术语时构建新快照并整体替换，翻译路径无需加锁
+        self._snapshot = TermSnapshot({})
+        # 串行化术语的修改和重新加载（只有写入方使用）
+        self._update_lock = threading.Lock()
+        # 术语文件监视器，调用start_watching后启用
+        self.watcher = None
+        # ITU呼号前缀索引，用于识别呼号和查询所属国家或地区
+        self.callsign_index = get_callsign_index()
+        # 单次扫描完成信号报告、呼号和整词术语替换的规范化器
+        self.token_normalizer = TokenNormalizer(self.callsign_index)
+        # 术语之外的已知呼号（如自己和常联系电台的呼号），也作为纠错目标
+        self.known_callsigns = ()
+        # 规范化结果缓存，键包含快照版本号，术语更新后整体清空
+        self.normalization_cache = LRUCache(NORMALIZATION_CACHE_SIZE)
         # 资源文件路径
         self.resource_dir = "translation/resources"
         self.term_file = os.path.join(self.resource_dir, "ham_radio_terms.json")
+        # 紧凑术语库缓存目录
+        self.cache_dir = os.path.join(self.resource_dir, "cache")
+        # 最近一次加载的统计信息（术语数、后端、耗时、内存）
+        self.load_stats = {}
+        # 最近一次批量规范化的统计信息（行数、耗时、每秒行数、进程数）
+        self.batch_stats = {}
         
         # 确保资源目录存在
         self._ensure_resource_dir()
         # 加载术语资源
         self.load_terms()
     
+    @property
+    def terms(self):
+        """当前术语词典 {术语: {语言代码: 译文}}，只读"""
+        return self._snapshot.terms
+    
+    @property
+    def sorted_terms(self):
+        """按照术语长度从长到短排序的术语列表"""
+        return self._snapshot.sorted_terms
+    
+    @property
+    def term_indexes(self):
+        """各目标语言的术语索引 {语言代码: TermIndex}"""
+        return self._snapshot.term_indexes
+    
+    @property
+    def term_version(self):
+        """术语词典版本号，每次修改或重新加载术语后递增"""
+        return self._snapshot.version
+    
+    def _set_terms(self, terms, source_state=None):
+        """
+        用新的术语词典构建快照并原子地替换当前快照
+        
+        术语数量较多且与术语文件一致（提供了source_state）时，编译为紧凑术语库缓存并使用内存映射。
+        纠正器在这里（加载或重新加载术语的线程中）构建，与快照一起发布，翻译线程不需要等待构建。
+        
+        参数:
+            terms (dict): 新的术语词典或CompactTermStore，之后不应再修改
+            source_state (tuple): terms对应的术语文件状态 (修改时间, 大小)
+        """
+        if (source_state and not isinstance(terms, CompactTermStore)
+                and len(terms) >= COMPACT_STORE_MIN_TERMS):
+            try:
+                terms = self._compile_store(terms, source_state)
+            except Exception as e:
+                print(f"编译术语缓存失败: {str(e)}，使用普通术语索引")
+        snapshot = TermSnapshot(terms, self._snapshot.version + 1)
+        snapshot.corrector = self._build_corrector(snapshot.terms)
+        self._snapshot = snapshot
+        self.normalization_cache.clear()
+    
+    def _term_file_state(self):
+        """获取术语文件状态 (修改时间, 大小)，文件不存在时返回None"""
+        try:
+            stat = os.stat(self.term_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _store_cache_path(self, source_state):
+        """术语文件某一状态对应的紧凑术语库缓存路径"""
+        base_name = os.path.splitext(os.path.basename(self.term_file))[0]
+        return os.path.join(self.cache_dir, f"{base_name}.{source_state[0]}-{source_state[1]}.termstore")
+    
+    def _open_cached_store(self, source_state):
+        """
+        打开与术语文件当前状态一致的紧凑术语库缓存
+        
+        返回:
+            CompactTermStore: 缓存不存在或已过期时返回None
+        """
+        if not source_state:
+            return None
+        path = self._store_cache_path(source_state)
+        if CompactTermStore.read_source_state(path) != tuple(source_state):
+            return None
+        try:
+            return CompactTermStore(path)
+        except (OSError, ValueError) as e:
+            print(f"打开术语缓存失败: {str(e)}")
+            return None
+    
+    def _compile_store(self, terms, source_state):
+        """
+        将术语编译为紧凑术语库缓存并打开，同时删除旧的缓存文件
+        
+        返回:
+            CompactTermStore: 术语库
+        """
+        path = self._store_cache_path(source_state)
+        compile_term_store(terms, path, source_state)
+        
+        # 删除旧的缓存（仍被映射的文件在Windows上无法删除，下次再清理）
+        prefix = os.path.splitext(os.path.basename(self.term_file))[0] + "."
+        for name in os.listdir(self.cache_dir):
+            old_path = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and name.endswith(".termstore") and old_path != path:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return CompactTermStore(path)
+    
+    def _record_load_stats(self, start_time):
+        """记录加载统计信息"""
+        rss = get_rss_bytes()
+        self.load_stats = {
+            "terms": len(self.terms),
+            "backend": "compact" if self._snapshot.is_compact else "dict",
+            "load_ms": round((time.perf_counter() - start_time) * 1000, 1),
+            "rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+        }
+    
+    def get_load_stats(self):
+        """
+        获取最近一次加载术语的统计信息
+        
+        返回:
+            dict: {"terms": 术语数, "backend": "compact"或"dict", "load_ms": 加载耗时, "rss_mb": 进程常驻内存}
+        """
+        return dict(self.load_stats)
+    
     def _ensure_resource_dir(self):
         """确保资源目录存在"""
         if not os.path.exists(self.resource_dir):
@@ -37,39 +198,34 @@ class TermManager:
             return
         
         try:
-            # 读取术语文件
-            with open(self.term_file, 'r', encoding='utf-8') as f:
-                self.terms = json.load(f)
-            
-            # 验证和处理术语
-            valid_terms = {}
-            invalid_terms = []
+            start_time = time.perf_counter()
+            source_state = self._term_file_state()
             
-            for term, translations in self.terms.items():
-                # 确保术语不为空且包含至少一种语言的翻译
-                if term and isinstance(translations, dict) and any(lang in translations for lang in ['zh-cn', 'en']):
-                    valid_terms[term] = translations
+            # 术语文件没有变化时直接映射已编译的紧凑术语库，无需解析JSON
+            store = self._open_cached_store(source_state)
+            if store is not None:
+                self._set_terms(store)
+            else:
+                # 读取术语文件
+                with open(self.term_file, 'r', encoding='utf-8') as f:
+                    terms = json.load(f)
+                
+                # 验证和处理术语
+                valid_terms, invalid_terms = self._validate_terms(terms)
+                
+                # 如果有无效术语，更新术语词典并保存
+                if invalid_terms and verbose:
+                    print(f"警告: 忽略了 {len(invalid_terms)} 个无效术语: {', '.join(invalid_terms)}")
+                    self._replace_terms(valid_terms)
                 else:
-                    invalid_terms.append(term)
-            
-            # 如果有无效术语，更新术语词典并保存
-            if invalid_terms and verbose:
-                print(f"警告: 忽略了 {len(invalid_terms)} 个无效术语: {', '.join(invalid_terms)}")
-                self.terms = valid_terms
-                self.save_terms()
-            
-            # 按照术语长度从长到短排序，确保首先匹配最长的术语
-            self.sorted_terms = sorted(self.terms.keys(), key=len, reverse=True)
-            
-            # 为每个术语创建正则表达式模式
-            for term in self.sorted_terms:
-                # 创建匹配完整词的正则表达式
-                pattern = r'\b' + re.escape(term) + r'\b'
-                self.patterns[term] = re.compile(pattern, re.IGNORECASE)
+                    # 构建术语快照（排序后的术语列表和各语言的术语索引）
+                    self._set_terms(terms, source_state)
             
+            self._record_load_stats(start_time)
             if verbose:
-                term_count = len(self.terms)    
-                print(f"从 {self.term_file} 加载了 {term_count} 个业余无线电术语")
+                stats = self.load_stats
+                print(f"从 {self.term_file} 加载了 {stats['terms']} 个业余无线电术语 "
+                      f"(后端: {stats['backend']}, 耗时: {stats['load_ms']}ms, 内存: {stats['rss_mb']}MB)")
             
             # 检查是否包含关键术语
             key_terms = ['CQ', 'Roger', 'QRZ', '73']
@@ -89,6 +245,22 @@ class TermManager:
                 print(f"将使用默认术语")
             self._create_default_terms()
     
+    def _validate_terms(self, terms):
+        """
+        验证术语定义：术语不为空且包含至少一种语言的翻译
+        
+        返回:
+            tuple: (有效术语词典, 无效术语列表)
+        """
+        valid_terms = {}
+        invalid_terms = []
+        for term, translations in terms.items():
+            if term and isinstance(translations, dict) and any(lang in translations for lang in ['zh-cn', 'en']):
+                valid_terms[term] = translations
+            else:
+                invalid_terms.append(term)
+        return valid_terms, invalid_terms
+    
     def _create_default_terms(self, verbose=False):
         """创建默认的术语定义文件"""
         # 仅包含几个基本术语的最小集合，仅在JSON文件不存在时使用
@@ -119,13 +291,8 @@ class TermManager:
             with open(self.term_file, 'w', encoding='utf-8') as f:
                 json.dump(default_terms, f, ensure_ascii=False, indent=4)
             
-            self.terms = default_terms
-            self.sorted_terms = sorted(self.terms.keys(), key=len, reverse=True)
-            
-            # 为每个术语创建正则表达式模式
-            for term in self.sorted_terms:
-                pattern = r'\b' + re.escape(term) + r'\b'
-                self.patterns[term] = re.compile(pattern, re.IGNORECASE)
+            # 构建术语快照（排序后的术语列表和各语言的术语索引）
+            self._set_terms(default_terms)
                 
             if verbose:
                 print(f"创建了默认术语定义文件: {self.term_file}")
@@ -134,6 +301,27 @@ class TermManager:
             if verbose:
                 print(f"创建默认术语文件时出错: {str(e)}")
     
+    def get_term_index(self, lang_code):
+        """
+        获取当前快照中指定目标语言的术语索引，术语词典中没有该语言时返回空索引
+        
+        参数:
+            lang_code (str): 规范化后的目标语言代码（如 'zh-cn', 'en'）
+            
+        返回:
+            TermIndex: 术语索引，调用方不应修改
+        """
+        return self._snapshot.get_term_index(lang_code)
+    
+    def _normalize_lang_code(self, target_language):
+        """将目标语言代码规范化为术语词典中使用的形式（zh* -> zh-cn, en* -> en）"""
+        lang_code = target_language.lower()
+        if lang_code.startswith('zh'):
+            lang_code = 'zh-cn'
+        elif lang_code.startswith('en'):
+            lang_code = 'en'
+        return lang_code
+    
     def extract_and_convert_signal_report(self, text):
         """
         识别并将信号报告（如five nine、five nine nine、599、59、54等）统一转换为阿拉伯数字。
@@ -142,43 +330,7 @@ class TermManager:
         """
         if not text:
             return text
-            
-        # 支持的数字单词
-        num_map = {
-            'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-            'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9'
-        }
-        
-        # 预处理：将 "five by nine" 这样的格式替换为 "five nine"
-        pattern = r'\b(zero|one|two|three|four|five|six|seven|eight|nine)\s+by\s+(zero|one|two|three|four|five|six|seven|eight|nine)\b'
-        text = re.sub(pattern, r'\1 \2', text, flags=re.IGNORECASE)
-        
-        # 将文本分割成单词
-        words = text.lower().split()
-        result = []
-        i = 0
-        
-        while i < len(words):
-            # 检查是否为信号报告的数字单词序列
-            if words[i] in num_map:
-                digits = []
-                j = i
-                # 收集连续的数字单词
-                while j < len(words) and words[j] in num_map and len(digits) < 3:
-                    digits.append(num_map[words[j]])
-                    j += 1
-                
-                # 如果收集到至少两个数字，则视为信号报告
-                if len(digits) >= 2:
-                    result.append(''.join(digits))
-                    i = j
-                    continue
-            
-            # 如果不是信号报告的一部分，保持原样
-            result.append(words[i])
-            i += 1
-        
-        return ' '.join(result)
+        return self.token_normalizer.normalize(text, phonetic_callsigns=False)
 
     def preprocess_phonetic_callsign(self, text):
         """
@@ -192,35 +344,18 @@ class TermManager:
         """
         if not text:
             return text
-            
-        # 定义字母解释法映射，仅用于检测
-        phonetic_words = [
-            'alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel',
-            'india', 'juliet', 'kilo', 'lima', 'mike', 'november', 'oscar', 'papa',
-            'quebec', 'romeo', 'sierra', 'tango', 'uniform', 'victor', 'whiskey', 
-            'x-ray', 'xray', 'yankee', 'zulu'
-        ]
         
         result = text
         
-        # 正则表达式：匹配连续的字母解释法单词（可能有逗号分隔）
-        # 例如: "Victor, Echo, 5, Alpha, Echo" 或 "Alpha Bravo"
-        phonetic_pattern = r'(?:' + '|'.join(phonetic_words) + r')(?:,?\s+(?:' + '|'.join(phonetic_words) + r'|\d+))+' 
-        
         # 查找所有可能的呼号段
-        matches = re.finditer(phonetic_pattern, text, re.IGNORECASE)
-        
-        for match in matches:
+        for match in PHONETIC_SEGMENT_PATTERN.finditer(text):
             callsign_segment = match.group(0)
             # 去掉逗号，保持空格
             cleaned_segment = re.sub(r',\s*', ' ', callsign_segment)
             result = result.replace(callsign_segment, cleaned_segment)
         
         # 检测并清理类似于 "Alpha, Bravo" 的模式（只有一个逗号）
-        comma_pattern = r'(?:' + '|'.join(phonetic_words) + r'),\s+(?:' + '|'.join(phonetic_words) + r')'
-        comma_matches = re.finditer(comma_pattern, result, re.IGNORECASE)
-        
-        for match in comma_matches:
+        for match in PHONETIC_COMMA_PATTERN.finditer(result):
             comma_segment = match.group(0)
             # 去掉逗号，保持空格
             cleaned_segment = re.sub(r',\s*', ' ', comma_segment)
@@ -240,68 +375,151 @@ class TermManager:
         """
         if not text:
             return text
+        return self.token_normalizer.normalize(text, signal_reports=False)
+
+    def normalize_text(self, text, target_language=None):
+        """
+        单次扫描完成信号报告、字母解释法呼号和标准呼号的规范化，
+        指定目标语言时同时将整词术语替换为译文（等同于direct_translate）
+        
+        参数:
+            text (str): 原始文本
+            target_language (str): 目标语言代码，为None时不替换术语
             
-        # 定义字母解释法映射
-        phonetic_map = {
-            'alpha': 'A', 'bravo': 'B', 'charlie': 'C', 'delta': 'D',
-            'echo': 'E', 'foxtrot': 'F', 'golf': 'G', 'hotel': 'H',
-            'india': 'I', 'juliet': 'J', 'kilo': 'K', 'lima': 'L',
-            'mike': 'M', 'november': 'N', 'oscar': 'O', 'papa': 'P',
-            'quebec': 'Q', 'romeo': 'R', 'sierra': 'S', 'tango': 'T',
-            'uniform': 'U', 'victor': 'V', 'whiskey': 'W', 'x-ray': 'X',
-            'yankee': 'Y', 'zulu': 'Z',
-            # 添加数字词映射
-            'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-            'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9'
-        }
+        返回:
+            str: 规范化后的文本
+        """
+        if not text:
+            return text
+        snapshot = self._snapshot
+        lang_code = self._normalize_lang_code(target_language) if target_language else None
         
-        # 预处理：处理带有逗号和额外空格的字母解释法词
-        processed_text = self.preprocess_phonetic_callsign(text)
+        def normalize():
+            term_index = None
+            if lang_code and snapshot.terms:
+                term_index = snapshot.get_term_index(lang_code)
+            return self.token_normalizer.normalize(text, term_index=term_index)
         
-        # 将文本分割成单词
-        words = processed_text.split()
-        result = []
-        i = 0
+        return self.normalization_cache.get_or_compute(('normalize', snapshot.version, text, lang_code), normalize)
+
+    def normalize_many(self, texts, target_language=None, workers=1, verbose=False):
+        """
+        批量规范化多行文本（如处理字幕文件、回放记录），结果与逐行调用normalize_text相同
         
-        # 简化版本：只处理连续的字母解释法单词
-        while i < len(words):
-            word = words[i].lower()
+        所有行共用同一个术语快照、术语索引和规范化器，重复的行只处理一次。
+        workers大于1且行数足够多时分块交给进程池处理。
+        
+        参数:
+            texts (list): 文本列表
+            target_language (str): 目标语言代码，为None时不替换术语
+            workers (int): 进程数，1表示在当前进程中处理
+            verbose (bool): 是否输出处理速度
             
-            # 检查是否是字母解释法单词
-            if word in phonetic_map:
-                # 查找连续的字母解释法单词
-                j = i + 1
-                consecutive_count = 1
-                callsign_parts = [phonetic_map[word]]
-                
-                while j < len(words) and words[j].lower() in phonetic_map:
-                    callsign_parts.append(phonetic_map[words[j].lower()])
-                    consecutive_count += 1
-                    j += 1
-                
-                # 仅当连续出现两个或以上的字母解释法单词时才转换
-                if consecutive_count >= 2:
-                    # 组合成呼号并添加到结果中
-                    callsign = ''.join(callsign_parts).upper()  # 确保呼号为大写
-                    result.append(callsign)
-                    i = j  # 跳过已处理的单词
-                else:
-                    # 单独的字母解释法单词保持原样
-                    result.append(words[i])
-                    i += 1
-                continue
+        返回:
+            list: 规范化后的文本，与输入一一对应
+        """
+        texts = list(texts)
+        start_time = time.perf_counter()
+        snapshot = self._snapshot
+        lang_code = self._normalize_lang_code(target_language) if target_language else None
+        
+        # 每个进程分到的行数太少时在当前进程中处理
+        workers = max(1, min(workers, len(texts) // PROCESS_POOL_MIN_LINES_PER_WORKER))
+        if workers > 1:
+            results = normalize_in_pool(snapshot, lang_code, texts, workers)
+        else:
+            term_index = snapshot.get_term_index(lang_code) if lang_code and snapshot.terms else None
+            results = normalize_lines(self.token_normalizer, term_index, texts)
+        
+        self.batch_stats = make_batch_stats(len(texts), time.perf_counter() - start_time, workers)
+        if verbose:
+            print(f"批量规范化 {self.batch_stats['lines']} 行，用时 {self.batch_stats['seconds']:.2f} 秒，"
+                  f"{self.batch_stats['lines_per_second']:.0f} 行/秒（{workers} 个进程）")
+        return results
+
+    def get_batch_stats(self):
+        """
+        获取最近一次批量规范化的统计信息
+        
+        返回:
+            dict: {"lines": 行数, "seconds": 耗时, "lines_per_second": 每秒行数, "workers": 进程数}
+        """
+        return dict(self.batch_stats)
+
+    def set_known_callsigns(self, callsigns):
+        """
+        设置术语之外的已知呼号，用于纠正识别错误的呼号
+        
+        参数:
+            callsigns (list): 呼号列表
+        """
+        with self._update_lock:
+            self.known_callsigns = tuple(callsign.strip().upper() for callsign in callsigns
+                                         if callsign and callsign.strip())
+            snapshot = self._snapshot
+            self._snapshot = TermSnapshot(snapshot.terms, snapshot.version + 1, snapshot.term_indexes,
+                                          self._build_corrector(snapshot.terms))
+            self.normalization_cache.clear()
+
+    def _build_corrector(self, terms):
+        """根据术语词典和已知呼号构建纠正器（耗时与术语数成正比，不在翻译线程中调用）"""
+        return TermCorrector(list(terms.keys()) + list(self.known_callsigns), callsign_index=self.callsign_index)
+
+    def correct_terms(self, text):
+        """
+        纠正语音识别拆开或拼错的术语和呼号，在术语处理之前调用
+        例如: "Q are Z" -> "QRZ"，"BG 7 YYK" -> "BG7YYK"
+        
+        参数:
+            text (str): 识别结果
             
-            # 检查是否是标准呼号格式(使其大写)
-            if re.match(r'^[A-Z0-9]{2,}[0-9][A-Z]{1,3}$', words[i], re.IGNORECASE):
-                result.append(words[i].upper())
-                i += 1
-                continue
+        返回:
+            str: 纠正后的文本
+        """
+        snapshot = self._snapshot
+        if not text or snapshot.corrector is None:
+            return text
+        key = ('correct', snapshot.version, text, None)
+        return self.normalization_cache.get_or_compute(key, lambda: snapshot.corrector.correct(text))
+
+    def get_correction_stats(self):
+        """
+        获取纠正统计（术语更新后重新计数）
+        
+        返回:
+            dict: {"merged": 合并次数, "corrected": 拼写纠正次数}
+        """
+        corrector = self._snapshot.corrector
+        return corrector.get_stats() if corrector is not None else {"merged": 0, "corrected": 0}
+
+    def lookup_callsigns(self, text, target_language='zh-cn'):
+        """
+        查找文本中的有效呼号及其所属国家或地区，供字幕显示电台信息
+        
+        参数:
+            text (str): 文本（通常是normalize_text的结果，呼号已合并和大写）
+            target_language (str): 国家或地区名称使用的语言代码
             
-            # 如果不是呼号相关，保持原样
-            result.append(words[i])
-            i += 1
+        返回:
+            list: [{"callsign": 呼号, "prefix": 已分配前缀, "entity": 实体, "name": 名称}, ...]，同一呼号只返回一次
+        """
+        if not text:
+            return []
+        lang_code = self._normalize_lang_code(target_language)
+        stations = {}
+        for _, _, info in self.callsign_index.find_callsigns(text):
+            if info["callsign"] not in stations:
+                stations[info["callsign"]] = dict(info, name=self.callsign_index.get_entity_name(info["entity"], lang_code))
+        return list(stations.values())
+
+    def get_cache_stats(self):
+        """
+        获取规范化结果缓存的统计信息
         
-        return ' '.join(result)
+        返回:
+            dict: {"size", "max_size", "hits", "misses", "evictions", "hit_rate"}
+        """
+        return self.normalization_cache.get_stats()
 
     def translate_terms(self, text, target_lang_code=None):
         """
@@ -329,42 +547,15 @@ class TermManager:
             target_lang_code = target_lang_code.split('-')[0].lower()
         
         # 如果没有术语，则返回原文
-        if not self.terms:
+        snapshot = self._snapshot
+        if not snapshot.terms:
             return text
         
-        # 处理业余无线电术语
-        words = text.split()
-        translated_words = []
+        index = snapshot.get_term_index(target_lang_code)
         
-        for word in words:
-            # 检查是否是呼号（全大写字母和数字组成）
-            if re.match(r'^[A-Z0-9]+$', word):
-                translated_words.append(word)  # 呼号直接保留
-            else:
-                # 非呼号部分，检查是否是特定术语
-                translated = False
-                for term in self.sorted_terms:
-                    if term.lower() == word.lower():
-                        translation = self.terms[term].get(target_lang_code, term)
-                        translated_words.append(translation)
-                        translated = True
-                        break
-                
-                # 如果不是特定术语，直接添加
-                if not translated:
-                    translated_words.append(word)
-        
-        result = ' '.join(translated_words)
-        
-        # 处理特殊术语组合，比如 "please. roger" -> "请。收到，明白"
-        for term in self.sorted_terms:
-            # 对于大写或首字母大写的术语，使用大小写不敏感的正则表达式
-            pattern = r'\b' + re.escape(term) + r'\b'
-            if term in self.terms and target_lang_code in self.terms[term]:
-                translation = self.terms[term][target_lang_code]
-                result = re.sub(pattern, translation, result, flags=re.IGNORECASE)
-            
-        return result
+        # 一次扫描替换整词术语和术语组合（比如 "please. roger" -> "请。收到，明白"），
+        # 不在术语词典中的呼号不会被匹配，保持原样
+        return index.replace(text)
 
     def translate_text(self, text, target_lang_code):
         """
@@ -395,21 +586,10 @@ class TermManager:
         # 确保术语是大写的
         term = term.upper()
         
-        # 更新术语词典
-        if term in self.terms:
-            # 更新现有术语的翻译
-            self.terms[term].update(translations)
-        else:
-            # 添加新术语
-            self.terms[term] = translations
-            # 更新排序的术语列表
-            self.sorted_terms = sorted(self.terms.keys(), key=len, reverse=True)
-            # 创建正则表达式模式
-            pattern = r'\b' + re.escape(term) + r'\b'
-            self.patterns[term] = re.compile(pattern, re.IGNORECASE)
-        
-        # 保存到文件
-        self.save_terms()
+        with self._update_lock:
+            updated = dict(self.terms.get(term, {}))
+            updated.update(translations)
+            self._update_term(term, updated)
     
     def remove_term(self, term):
         """
@@ -419,23 +599,66 @@ class TermManager:
             term (str): 要删除的术语
         """
         term = term.upper()
-        if term in self.terms:
-            del self.terms[term]
-            if term in self.patterns:
-                del self.patterns[term]
-            self.sorted_terms = sorted(self.terms.keys(), key=len, reverse=True)
-            self.save_terms()
+        with self._update_lock:
+            if term not in self.terms:
+                return
+            self._update_term(term, None)
+    
+    def _update_term(self, term, translations):
+        """
+        修改一个术语并替换快照，只更新受影响语言的术语索引，然后保存到文件
+        
+        参数:
+            term (str): 术语
+            translations (dict): 新的翻译字典，为None时删除该术语
+        """
+        snapshot = self._snapshot
+        corrector = snapshot.corrector
+        if corrector is not None:
+            # 纠正器同样只增删这一个术语，删除字典与之前的纠正器共享
+            added = (term,) if translations is not None else ()
+            removed = (term,) if translations is None and term not in self.known_callsigns else ()
+            corrector = corrector.updated(added, removed)
+        self._snapshot = snapshot.with_term(term, translations, corrector)
+        self.normalization_cache.clear()
+        self.save_terms()
+    
+    def _replace_terms(self, terms):
+        """
+        保存新的术语词典并替换当前快照
+        
+        参数:
+            terms (dict): 新的术语词典
+        """
+        saved = self.save_terms(terms=terms)
+        self._set_terms(terms, self._term_file_state() if saved else None)
     
-    def save_terms(self, verbose=False):
-        """保存术语到JSON文件"""
+    def save_terms(self, verbose=False, terms=None):
+        """
+        保存术语到JSON文件
+        
+        参数:
+            verbose (bool): 是否输出信息
+            terms (dict): 要保存的术语词典，默认为当前术语
+            
+        返回:
+            bool: 是否保存成功
+        """
+        if terms is None:
+            terms = self.terms
         try:
             with open(self.term_file, 'w', encoding='utf-8') as f:
-                json.dump(self.terms, f, ensure_ascii=False, indent=4)
+                json.dump(dict(terms.items()), f, ensure_ascii=False, indent=4)
+            # 程序自身保存的文件不需要重新加载
+            if self.watcher:
+                self.watcher.mark_current()
             if verbose:
                 print(f"保存术语定义到: {self.term_file}")
+            return True
         except Exception as e:
             if verbose:
                 print(f"保存术语文件时出错: {str(e)}")
+            return False
 
     def convert_phonetic_callsign(self, text):
         """
@@ -496,123 +719,155 @@ class TermManager:
         """直接翻译特殊术语"""
         if not text:
             return text
-        terms = self.terms
-        if not terms:
+        snapshot = self._snapshot
+        if not snapshot.terms:
             return text
-        # 获取目标语言的术语映射
+        # 获取目标语言的术语索引
         # 兼容zh-cn/en等
-        lang_code = target_language.lower()
-        if lang_code.startswith('zh'):
-            lang_code = 'zh-cn'
-        elif lang_code.startswith('en'):
-            lang_code = 'en'
+        index = snapshot.get_term_index(self._normalize_lang_code(target_language))
         # 将文本分割成单词
         words = text.split()
         result = []
         for word in words:
-            key = word.upper()
-            if key in terms and lang_code in terms[key]:
-                result.append(terms[key][lang_code])
-            else:
-                result.append(word)
+            translation = index.lookup(word)
+            result.append(translation if translation is not None else word)
         return ' '.join(result)
 
+    def has_translatable_content(self, text, target_language):
+        """
+        判断预处理后的文本中是否还有需要翻译的内容
+        
+        术语占位符、已替换为目标语言的术语译文、呼号、数字和标点都不需要翻译，
+        去掉这些内容后如果没有剩余的文字，则无需调用翻译API。
+        
+        参数:
+            text (str): 经过术语预处理的文本
+            target_language (str): 目标语言代码
+            
+        返回:
+            bool: 是否包含需要翻译的内容
+        """
+        if not text:
+            return False
+        index = self._snapshot.get_term_index(self._normalize_lang_code(target_language))
+        
+        # 移除术语占位符（包括翻译时可能出现的变形）
+        remainder = re.sub(r'__\s*term_\d+_*', ' ', text, flags=re.IGNORECASE)
+        
+        # 一次扫描移除已经是目标语言的术语译文（两端不在单词中间），优先移除较长的译文
+        # 译文以术语本身开头时（如"QSL（确认收到）"），术语部分可能已被替换为占位符，因此同时移除其后缀部分
+        remainder = index.remove_translations(remainder)
+        
+        # 移除呼号（大写字母和数字组合，至少包含一个数字）和纯数字
+        remainder = re.sub(r'\b[A-Z0-9]*[0-9][A-Z0-9]*\b', ' ', remainder)
+        
+        # 剩余部分只有标点和空白时，无需翻译
+        return bool(re.sub(r'[\W_]+', '', remainder))
+
     def preprocess_ham_radio_terms(self, text, target_language):
-        """预处理业余无线电术语"""
+        """
+        预处理业余无线电术语，将术语替换为占位符
+        
+        使用目标语言的术语索引，一次扫描完成所有术语的匹配和替换；
+        同一术语的多次出现使用同一个占位符。不在术语词典中的有效呼号（根据ITU前缀分配表判断）
+        也替换为占位符，还原时保持原样。
+        
+        参数:
+            text (str): 原始文本
+            target_language (str): 目标语言代码
+            
+        返回:
+            tuple: (替换后的文本, {占位符: 术语译文})
+        """
         if not text:
             return text, {}
-        terms = self.terms
-        if not terms:
+        snapshot = self._snapshot
+        if not snapshot.terms:
             return text, {}
-        lang_code = target_language.lower()
-        if lang_code.startswith('zh'):
-            lang_code = 'zh-cn'
-        elif lang_code.startswith('en'):
-            lang_code = 'en'
+        lang_code = self._normalize_lang_code(target_language)
+        processed_text, replacements = self.normalization_cache.get_or_compute(
+            ('preprocess', snapshot.version, text, lang_code),
+            lambda: self._replace_with_placeholders(snapshot, text, lang_code))
+        # 返回副本，调用方修改不影响缓存
+        return processed_text, dict(replacements)
+
+    def _replace_with_placeholders(self, snapshot, text, lang_code):
+        """使用快照中目标语言的术语索引将术语和有效呼号替换为占位符，返回 (替换后的文本, {占位符: 术语译文或呼号})"""
+        index = snapshot.get_term_index(lang_code)
+        
         replacements = {}
-        processed_text = text
-        for term, translations in terms.items():
-            if lang_code in translations:
-                translation = translations[lang_code]
-                pattern = r'\b' + re.escape(term) + r'\b'
-                if re.search(pattern, processed_text, re.IGNORECASE):
-                    placeholder = f"__TERM_{len(replacements)}__"
-                    replacements[placeholder] = translation
-                    processed_text = re.sub(pattern, placeholder, processed_text, flags=re.IGNORECASE)
+        placeholders = {}
+        
+        def add_placeholder(term, translation):
+            placeholder = placeholders.get(term)
+            if placeholder is None:
+                placeholder = f"__TERM_{len(replacements)}__"
+                placeholders[term] = placeholder
+                replacements[placeholder] = translation
+            return placeholder
+        
+        def replace_term(term, matched_text):
+            return add_placeholder(term, index.translations[term])
+        
+        def replace_callsign(info, matched_text):
+            # 不在术语词典中的有效呼号也替换为占位符，避免被翻译后端改写
+            return add_placeholder(info["callsign"], info["callsign"])
+        
+        processed_text = index.replace(text, replace_term)
+        processed_text = self.callsign_index.replace(processed_text, replace_callsign)
         return processed_text, replacements
 
     def restore_ham_radio_terms(self, text, replacements):
-        """还原业余无线电术语"""
-        if not text or not replacements:
-            return text
-            
-        result = text
-        
-        # 按占位符长度降序排序，避免部分替换问题
-        sorted_placeholders = sorted(replacements.keys(), key=len, reverse=True)
+        """
+        还原业余无线电术语
         
-        # 设置最大迭代次数，避免可能的无限循环
-        max_iterations = 3
-        iterations = 0
+        使用一个预编译的宽松正则一次替换所有占位符，包括翻译后产生的变形：
+        带空格（__ TERM_0 __）、小写（__term_0__）和下划线结尾（__TERM_0_）。
+        译文中嵌套的占位符（如 "CQ（呼叫__TERM_1__）"）在替换时展开。
         
-        # 迭代处理，直到所有占位符都被替换完毕或达到最大迭代次数
-        while iterations < max_iterations:
-            iterations += 1
-            replaced = False
-            
-            # 先处理精确匹配的占位符
-            for placeholder in sorted_placeholders:
-                replacement = replacements[placeholder]
-                original_result = result
-                
-                # 使用正则表达式进行精确匹配替换，确保只替换完整的占位符
-                pattern = re.compile(re.escape(placeholder), re.IGNORECASE)
-                result = pattern.sub(replacement, result)
-                
-                if result != original_result:
-                    replaced = True
-            
-            # 处理带变形的占位符
-            for placeholder in sorted_placeholders:
-                replacement = replacements[placeholder]
-                placeholder_id = placeholder.replace("__TERM_", "").replace("__", "")
-                
-                # 处理各种变形格式
-                patterns = [
-                    # 处理带空格的占位符形式 (__TERM_0__)
-                    r'__\s*TERM_' + re.escape(placeholder_id) + r'\s*__',
-                    # 处理小写的变形 (__term_0__)
-                    r'__\s*term_' + re.escape(placeholder_id) + r'\s*__',
-                ]
-                
-                for pattern_str in patterns:
-                    original_result = result
-                    pattern = re.compile(pattern_str, re.IGNORECASE)
-                    result = pattern.sub(replacement, result)
-                    
-                    if result != original_result:
-                        replaced = True
-                
-                # 单独处理带下划线结尾的变形格式 (__TERM_0_)
-                pattern_str = r'__\s*(?:TERM|term)_' + re.escape(placeholder_id) + r'_'
-                pattern = re.compile(pattern_str, re.IGNORECASE)
-                
-                # 查找所有匹配
-                matches = list(pattern.finditer(result))
-                if matches:
-                    replaced = True
-                    # 从后向前替换，避免位置偏移
-                    for match in reversed(matches):
-                        begin, end = match.span()
-                        # 直接替换，不加下划线
-                        result = result[:begin] + replacement + result[end:]
+        参数:
+            text (str): 翻译后的文本
+            replacements (dict): 占位符到译文的映射 {"__TERM_0__": 译文}
             
-            # 如果本次迭代没有进行任何替换，说明所有占位符已经替换完毕，退出循环
-            if not replaced:
-                break
+        返回:
+            str: 还原后的文本
+        """
+        if not text or not replacements:
+            return text
+        
+        # {占位符编号: 译文}
+        values = {}
+        for placeholder, replacement in replacements.items():
+            match = PLACEHOLDER_KEY_PATTERN.match(placeholder)
+            if match:
+                values[match.group(1)] = replacement
+            else:
+                # 非标准格式的占位符按原样（大小写不敏感）替换
+                text = re.sub(re.escape(placeholder), lambda m, r=replacement: r, text, flags=re.IGNORECASE)
+        
+        expanded = {}
+        
+        def expand(placeholder_id, depth):
+            # 展开译文中嵌套的占位符，限制深度避免循环引用
+            if placeholder_id in expanded:
+                return expanded[placeholder_id]
+            replacement = values[placeholder_id]
+            if depth < MAX_NESTED_PLACEHOLDER_DEPTH and '_' in replacement:
+                replacement = PLACEHOLDER_PATTERN.sub(lambda m: replace(m, depth + 1), replacement)
+            expanded[placeholder_id] = replacement
+            return replacement
+        
+        def replace(match, depth=0):
+            placeholder_id = match.group(1)
+            if placeholder_id not in values:
+                # 未知的占位符保持原样
+                return match.group(0)
+            return expand(placeholder_id, depth)
+        
+        result = PLACEHOLDER_PATTERN.sub(replace, text)
         
         # 最终清理：移除可能产生的多余下划线 (如：QRZ（谁在呼叫我）_？)
-        result = re.sub(r'(\S)_([?？,.，。!！])', r'\1\2', result)
+        result = TRAILING_UNDERSCORE_PATTERN.sub(r'\1\2', result)
         
         return result
 
@@ -641,7 +896,10 @@ class TermManager:
                 subprocess.run(["xdg-open", self.term_file])
                 
             print(f"已打开术语文件进行编辑: {self.term_file}")
-            print("编辑完成后请保存，程序将在下次启动时加载更新后的术语。")
+            if self.watcher and self.watcher.is_running():
+                print("编辑完成后请保存，程序会自动加载更新后的术语。")
+            else:
+                print("编辑完成后请保存，然后重新加载术语使修改生效。")
             return True
         except Exception as e:
             print(f"打开术语文件失败: {str(e)}")
@@ -652,31 +910,53 @@ class TermManager:
         """
         重新加载术语定义
         
+        在后台构建新的术语快照后原子地替换，正在进行的翻译继续使用旧快照；
+        文件格式错误或没有有效术语时保留之前的术语定义。
+        
         返回:
             bool: 是否成功重新加载
         """
         try:
-            # 备份当前术语以防加载失败
-            old_terms = self.terms.copy()
-            old_sorted_terms = self.sorted_terms.copy()
-            old_patterns = self.patterns.copy()
-            
-            # 重新加载术语
-            self.terms = {}
-            self.sorted_terms = []
-            self.patterns = {}
-            self.load_terms()
+            start_time = time.perf_counter()
+            source_state = self._term_file_state()
+            terms = self._open_cached_store(source_state)
+            if terms is None:
+                with open(self.term_file, 'r', encoding='utf-8') as f:
+                    terms, invalid_terms = self._validate_terms(json.load(f))
+                
+                if not terms:
+                    print("重新加载术语失败，已还原为之前的术语定义。")
+                    return False
+                if invalid_terms:
+                    print(f"警告: 忽略了 {len(invalid_terms)} 个无效术语: {', '.join(invalid_terms)}")
             
-            if not self.terms:
-                # 加载失败，还原备份
-                self.terms = old_terms
-                self.sorted_terms = old_sorted_terms
-                self.patterns = old_patterns
-                print("重新加载术语失败，已还原为之前的术语定义。")
-                return False
+            with self._update_lock:
+                self._set_terms(terms, source_state)
+                self._record_load_stats(start_time)
                 
-            print(f"已重新加载 {len(self.terms)} 个术语。")
+            print(f"已重新加载 {len(terms)} 个术语。")
             return True
         except Exception as e:
-            print(f"重新加载术语时出错: {str(e)}")
-            return False 
\ No newline at end of file
+            print(f"重新加载术语时出错: {str(e)}，继续使用之前的术语定义。")
+            return False
+    
+    def start_watching(self, interval=1.0):
+        """
+        启动术语文件监视，文件保存后自动重新加载术语
+        
+        参数:
+            interval (float): 检查文件变化的间隔（秒）
+        """
+        if self.watcher is None:
+            self.watcher = TermFileWatcher(self.term_file, self._on_term_file_changed, interval)
+        self.watcher.start()
+    
+    def stop_watching(self):
+        """停止术语文件监视"""
+        if self.watcher:
+            self.watcher.stop()
+    
+    def _on_term_file_changed(self):
+        """术语文件发生变化时重新加载"""
+        print(f"检测到术语文件变化: {self.term_file}")
+        self.reload_terms()
@@ -0,0 +1,347 @@
+def _is_word_char(char):
+    """判断字符是否属于正则表达式中的\\w（字母、数字或下划线）"""
+    return char.isalnum() or char == '_'
+
+
+def _fold(text):
+    """
+    逐字符转为小写，保持长度不变，使匹配位置可以直接对应回原文
+
+    个别字符（如'İ'）转小写后长度会变化，这类字符保持原样。
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class _MatchSelection:
+    """从 find_all 的结果中选择不重叠的匹配并替换，子类实现 find_all"""
+
+    def find(self, text):
+        """
+        查找文本中不重叠的术语匹配，优先选择最靠左、最长的匹配
+
+        返回:
+            list: 按位置排序的 [(开始位置, 结束位置, 术语), ...]
+        """
+        matches = self.find_all(text)
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        selected = []
+        last_end = 0
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+    def replace(self, text, replace_func):
+        """
+        一次扫描替换文本中的所有术语
+
+        参数:
+            text (str): 原始文本
+            replace_func (callable): 签名为 (术语, 匹配到的原文) -> 替换文本
+
+        返回:
+            str: 替换后的文本
+        """
+        matches = self.find(text)
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for start, end, term in matches:
+            parts.append(text[position:start])
+            parts.append(replace_func(term, text[start:end]))
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+
+class AhoCorasickMatcher(_MatchSelection):
+    """
+    Aho-Corasick 多模式匹配自动机
+
+    一次线性扫描找出文本中所有术语，匹配规则与 re.compile(r'\\b' + re.escape(term) + r'\\b', re.IGNORECASE)
+    相同：大小写不敏感，且术语两端必须在单词边界上。多个术语重叠时优先选择最靠左、最长的匹配。
+    """
+
+    def __init__(self, terms=None):
+        # 状态转移表，每个状态一个 {字符: 下一状态} 字典
+        self.goto = [{}]
+        # 失败指针
+        self.fail = [0]
+        # 在该状态结束的术语（原始形式），没有则为None
+        self.output = [None]
+        # 沿失败指针可以到达的下一个有输出的状态，没有则为0
+        self.output_link = [0]
+        self.term_count = 0
+        self.built = False
+
+        if terms:
+            for term in terms:
+                self.add(term)
+            self.build()
+
+    def copy(self):
+        """
+        复制自动机，修改副本不影响正在被其他线程使用的原自动机
+
+        返回:
+            AhoCorasickMatcher: 副本
+        """
+        matcher = type(self)()
+        matcher.goto = [dict(transitions) for transitions in self.goto]
+        matcher.fail = list(self.fail)
+        matcher.output = list(self.output)
+        matcher.output_link = list(self.output_link)
+        matcher.term_count = self.term_count
+        matcher.built = self.built
+        return matcher
+
+    def add(self, term):
+        """添加术语，字典树原地更新，失败指针在下一次匹配前重新计算"""
+        if not term:
+            return
+        state = 0
+        for char in _fold(term):
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.output_link.append(0)
+            state = next_state
+        if self.output[state] is None:
+            self.term_count += 1
+        self.output[state] = term
+        self.built = False
+
+    def remove(self, term):
+        """
+        删除术语，只取消该术语在字典树中的输出标记，无需重新构建自动机
+        
+        返回:
+            bool: 术语是否存在
+        """
+        state = 0
+        for char in _fold(term):
+            state = self.goto[state].get(char)
+            if state is None:
+                return False
+        if self.output[state] is None:
+            return False
+        self.output[state] = None
+        self.term_count -= 1
+        return True
+
+    def __contains__(self, term):
+        """术语是否在自动机中（未删除）"""
+        state = 0
+        for char in _fold(term):
+            state = self.goto[state].get(char)
+            if state is None:
+                return False
+        return self.output[state] == term
+
+    def terms(self):
+        """
+        自动机中的全部术语
+
+        返回:
+            list: 术语（原始形式）
+        """
+        return [term for term in self.output if term is not None]
+
+    def build(self):
+        """按广度优先顺序计算失败指针和输出链接"""
+        queue = []
+        for next_state in self.goto[0].values():
+            self.fail[next_state] = 0
+            self.output_link[next_state] = 0
+            queue.append(next_state)
+
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                failed = self.fail[next_state]
+                self.output_link[next_state] = failed if self.output[failed] is not None else self.output_link[failed]
+        self.built = True
+
+    def find_all(self, text):
+        """
+        查找文本中所有符合单词边界的术语匹配（可能重叠）
+
+        返回:
+            list: [(开始位置, 结束位置, 术语), ...]
+        """
+        if not self.built:
+            self.build()
+        matches = []
+        if not text or self.term_count == 0:
+            return matches
+
+        folded = _fold(text)
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        output_link = self.output_link
+        length = len(text)
+        state = 0
+
+        for index, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            candidate = state if output[state] is not None else output_link[state]
+            while candidate:
+                term = output[candidate]
+                # 已删除的术语保留在输出链接中，跳过即可
+                if term is not None:
+                    end = index + 1
+                    start = end - len(term)
+                    if self._at_boundary(text, start, length) and self._at_boundary(text, end, length):
+                        matches.append((start, end, term))
+                candidate = output_link[candidate]
+        return matches
+
+    @staticmethod
+    def _at_boundary(text, position, length):
+        """判断位置是否为\\b单词边界"""
+        before = position > 0 and _is_word_char(text[position - 1])
+        after = position < length and _is_word_char(text[position])
+        return before != after
+
+
+class FragmentMatcher(AhoCorasickMatcher):
+    """
+    术语译文片段的多模式匹配自动机
+
+    与 AhoCorasickMatcher 相同，但译文片段可能以标点开头或结尾（如"（确认收到）"），
+    因此不要求两端在\\b单词边界上，只要求不把一个单词从中间切开。
+    """
+
+    @staticmethod
+    def _at_boundary(text, position, length):
+        """判断位置是否不在单词中间"""
+        return not (0 < position < length and _is_word_char(text[position - 1]) and _is_word_char(text[position]))
+
+
+class LayeredMatcher(_MatchSelection):
+    """
+    支持增量修改的术语匹配器
+
+    由构建后不再修改的基础自动机、记录新增术语的小型增量自动机和被删除的基础术语集合组成。
+    添加或删除一个术语只修改增量部分，复制时共享基础自动机，开销与术语总数无关；
+    增量部分超过术语总数的 1/COMPACT_RATIO 时合并为新的基础自动机，合并的开销分摊到之前的修改上。
+    匹配结果与包含同样术语的单个自动机相同。
+    """
+
+    # 增量部分达到术语总数的 1/COMPACT_RATIO（且不少于 MIN_COMPACT_SIZE 个）时合并
+    COMPACT_RATIO = 8
+    MIN_COMPACT_SIZE = 64
+
+    def __init__(self, base):
+        """
+        参数:
+            base (AhoCorasickMatcher): 包含初始术语的自动机（AhoCorasickMatcher 或 FragmentMatcher），
+                作为基础自动机后不再修改，增量自动机使用相同的类型
+        """
+        self.matcher_class = type(base)
+        self.base = base
+        if not base.built:
+            base.build()
+        self.delta = self.matcher_class()
+        self.delta.build()
+        # 已删除但仍在基础自动机中的术语
+        self.removed = set()
+
+    @property
+    def term_count(self):
+        return self.base.term_count - len(self.removed) + self.delta.term_count
+
+    @property
+    def built(self):
+        return self.delta.built
+
+    def copy(self):
+        """
+        复制匹配器，副本共享基础自动机，只复制增量部分
+
+        返回:
+            LayeredMatcher: 副本
+        """
+        matcher = LayeredMatcher.__new__(LayeredMatcher)
+        matcher.matcher_class = self.matcher_class
+        matcher.base = self.base
+        matcher.delta = self.delta.copy()
+        matcher.removed = set(self.removed)
+        return matcher
+
+    def add(self, term):
+        """添加术语，只修改增量部分"""
+        if not term:
+            return
+        if term in self.removed:
+            self.removed.discard(term)
+        elif term not in self.base:
+            self.delta.add(term)
+        self._compact_if_needed()
+
+    def remove(self, term):
+        """
+        删除术语
+
+        返回:
+            bool: 术语是否存在
+        """
+        if self.delta.remove(term):
+            return True
+        if term in self.removed or term not in self.base:
+            return False
+        self.removed.add(term)
+        self._compact_if_needed()
+        return True
+
+    def build(self):
+        """计算增量自动机的失败指针，匹配器被多个线程共享之前调用"""
+        if not self.delta.built:
+            self.delta.build()
+
+    def _compact_if_needed(self):
+        """增量部分过大时合并为新的基础自动机"""
+        pending = self.delta.term_count + len(self.removed)
+        if pending < max(self.MIN_COMPACT_SIZE, self.term_count // self.COMPACT_RATIO):
+            return
+        terms = [term for term in self.base.terms() if term not in self.removed] + self.delta.terms()
+        self.base = self.matcher_class(terms)
+        self.base.build()
+        self.delta = self.matcher_class()
+        self.delta.build()
+        self.removed = set()
+
+    def find_all(self, text):
+        """
+        查找文本中所有符合单词边界的术语匹配（可能重叠）
+
+        返回:
+            list: [(开始位置, 结束位置, 术语), ...]
+        """
+        matches = self.base.find_all(text)
+        if self.removed:
+            matches = [match for match in matches if match[2] not in self.removed]
+        if self.delta.term_count:
+            matches.extend(self.delta.find_all(text))
+        return matches
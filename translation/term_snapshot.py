@@ -0,0 +1,126 @@
+from translation.term_index import TermIndex
+from translation.term_store import CompactTermStore, CompactTermIndex, EditedTermStore, _language_codes
+
+
+class TermSnapshot:
+    """
+    术语词典的不可变快照
+
+    包含术语词典、按长度排序的术语列表和各目标语言的术语索引，构建完成后不再修改。
+    TermManager 通过替换整个快照对象来更新术语（单次引用赋值是原子的），
+    翻译线程在一次处理中只读取一次快照引用，因此无需加锁，也不会看到构建了一半的索引。
+    术语词典也可以是内存映射的 CompactTermStore（或加上之后修改的 EditedTermStore），此时各语言使用 CompactTermIndex。
+    """
+
+    def __init__(self, terms, version=0, term_indexes=None, corrector=None):
+        """
+        参数:
+            terms (dict): 术语词典 {术语: {语言代码: 译文}}、CompactTermStore 或 EditedTermStore，
+                快照持有该对象，调用方之后不应再修改
+            version (int): 快照版本号，每次替换快照时递增
+            term_indexes (dict): 已经构建好的各语言术语索引，为None时为每种语言构建
+            corrector (TermCorrector): 与术语词典对应的纠正器，和快照一起发布
+        """
+        self.terms = terms
+        self.version = version
+        self.corrector = corrector
+        self.is_compact = isinstance(terms, (CompactTermStore, EditedTermStore))
+        self._sorted_terms = None
+        if term_indexes is not None:
+            self.term_indexes = term_indexes
+            return
+
+        # 为术语词典中出现的每种目标语言构建术语索引
+        if self.is_compact:
+            lang_codes = set(terms.languages)
+        else:
+            lang_codes = set()
+            for translations in terms.values():
+                if isinstance(translations, dict):
+                    lang_codes.update(code for code in translations if code != 'description')
+        self.term_indexes = {code: self._create_index(code) for code in lang_codes}
+
+    @property
+    def sorted_terms(self):
+        """按照术语长度从长到短排序的术语，首次访问时计算"""
+        if self._sorted_terms is None:
+            self._sorted_terms = tuple(sorted(self.terms.keys(), key=len, reverse=True))
+        return self._sorted_terms
+
+    def _create_index(self, lang_code, terms=None):
+        """为指定语言创建术语索引，terms默认为快照的术语词典"""
+        terms = self.terms if terms is None else terms
+        if isinstance(terms, EditedTermStore):
+            return CompactTermIndex(terms.store, lang_code, terms.edits)
+        if isinstance(terms, CompactTermStore):
+            return CompactTermIndex(terms, lang_code)
+        return TermIndex(lang_code, terms)
+
+    def with_term(self, term, translations, corrector=None):
+        """
+        构建修改了一个术语的新快照，当前快照保持不变
+
+        只有该术语新旧译文涉及的语言重新生成索引：内存中的索引复制后原地添加或删除该术语（写时复制），
+        紧凑术语库的修改记录在 EditedTermStore 中，不重新编译；其他语言的索引与当前快照共享。
+
+        参数:
+            term (str): 术语
+            translations (dict): 新的翻译字典，为None时删除该术语
+            corrector (TermCorrector): 新快照使用的纠正器
+
+        返回:
+            TermSnapshot: 新快照，版本号加1
+        """
+        old_translations = self.terms.get(term)
+        if self.is_compact:
+            store = self.terms.store if isinstance(self.terms, EditedTermStore) else self.terms
+            edits = dict(getattr(self.terms, 'edits', {}))
+            edits[term] = translations
+            terms = EditedTermStore(store, edits)
+        else:
+            terms = dict(self.terms)
+            if translations is None:
+                terms.pop(term, None)
+            else:
+                terms[term] = translations
+
+        affected = set()
+        for value in (old_translations, translations):
+            if isinstance(value, dict):
+                affected.update(_language_codes(value))
+
+        term_indexes = dict(self.term_indexes)
+        for lang_code in affected:
+            index = term_indexes.get(lang_code)
+            if self.is_compact or index is None:
+                index = self._create_index(lang_code, terms)
+            else:
+                index = index.copy()
+                if translations is None:
+                    index.remove(term)
+                else:
+                    index.add(term, translations)
+                index.build()
+            term_indexes[lang_code] = index
+        return TermSnapshot(terms, self.version + 1, term_indexes, corrector)
+
+    def get_term_index(self, lang_code):
+        """
+        获取指定目标语言的术语索引
+
+        术语词典中没有该语言时返回一个空索引并缓存，多个线程同时创建时得到的索引等价，不影响结果。
+
+        参数:
+            lang_code (str): 规范化后的目标语言代码（如 'zh-cn', 'en'）
+
+        返回:
+            TermIndex: 术语索引，调用方不应修改
+        """
+        index = self.term_indexes.get(lang_code)
+        if index is None:
+            index = self._create_index(lang_code)
+            self.term_indexes[lang_code] = index
+        return index
+
+    def __len__(self):
+        return len(self.terms)
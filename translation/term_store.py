@@ -0,0 +1,667 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from translation.term_index import translation_fragments
+from translation.term_matcher import AhoCorasickMatcher, FragmentMatcher, _fold, _is_word_char
+
+# 缓存文件格式标识和版本
+STORE_MAGIC = b'HAMTERM2'
+# 文件头: 标识(8字节) + 元数据长度(4字节)
+HEADER_FORMAT = '<8sI'
+
+
+def get_rss_bytes():
+    """
+    获取当前进程的常驻内存（RSS）
+
+    返回:
+        int: 字节数，无法获取时返回None
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss 是峰值，Linux上单位为KB，macOS上为字节
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+def _language_codes(translations):
+    """术语翻译字典中的语言代码（不包括说明等非译文字段）"""
+    return [code for code, value in translations.items() if code != 'description' and isinstance(value, str)]
+
+
+def compile_term_store(terms, path, source_state=None):
+    """
+    将术语词典编译为紧凑的二进制缓存文件
+
+    文件由若干连续的数组组成：按折叠后（小写）术语排序的键、排序位置到原始条目的映射、
+    按原始顺序保存的条目（原始术语和完整翻译字典的JSON）、每种语言的译文列，
+    以及每种语言排序后的译文片段（判断文本中的译文是否已经翻译时使用）。
+    文件先写入临时文件再重命名，读取方不会看到写了一半的文件。
+
+    参数:
+        terms (dict): 术语词典 {术语: {语言代码: 译文}}
+        path (str): 缓存文件路径
+        source_state (tuple): 来源JSON文件的 (修改时间, 大小)，用于判断缓存是否过期
+    """
+    entries = [(term, translations) for term, translations in terms.items() if term]
+    # 稳定排序：折叠后相同的术语保持原始顺序，匹配时使用最后一个（与TermIndex相同）
+    keys = [_fold(term.upper()) for term, _ in entries]
+    order = sorted(range(len(entries)), key=lambda i: keys[i].encode('utf-8'))
+
+    languages = sorted({code for _, translations in entries if isinstance(translations, dict)
+                        for code in _language_codes(translations)})
+
+    sections = []
+
+    def add_blob(name, values):
+        offsets = array('I', [0])
+        blob = bytearray()
+        for value in values:
+            blob += value
+            offsets.append(len(blob))
+        sections.append((name, bytes(blob)))
+        sections.append((name + '.offsets', offsets.tobytes()))
+
+    add_blob('keys', (keys[i].encode('utf-8') for i in order))
+    sections.append(('order', array('I', order).tobytes()))
+    add_blob('entries', (json.dumps([term, translations], ensure_ascii=False).encode('utf-8')
+                         for term, translations in entries))
+
+    language_counts = {}
+    for code in languages:
+        present = bytearray(len(order))
+        values = []
+        for position, i in enumerate(order):
+            translations = entries[i][1]
+            value = translations.get(code) if isinstance(translations, dict) else None
+            if isinstance(value, str):
+                present[position] = 1
+                values.append(value.encode('utf-8'))
+            else:
+                values.append(b'')
+        # 每个折叠后的术语只计最后一个条目
+        last_positions = [p for p in range(len(order))
+                          if p + 1 == len(order) or keys[order[p + 1]] != keys[order[p]]]
+        language_counts[code] = sum(present[p] for p in last_positions)
+        sections.append((f'lang.{code}.present', bytes(present)))
+        add_blob(f'lang.{code}', values)
+
+        fragments = set()
+        for p in last_positions:
+            if present[p]:
+                term = entries[order[p]][0].upper()
+                fragments.update(_fold(fragment).encode('utf-8')
+                                 for fragment in translation_fragments(term, values[p].decode('utf-8')))
+        add_blob(f'lang.{code}.fragments', sorted(fragments))
+
+    # 计算各数组在文件中的位置（4字节对齐）
+    layout = {}
+    position = 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data) + (-len(data)) % 4
+    metadata = json.dumps({
+        'count': len(entries),
+        'languages': languages,
+        'language_counts': language_counts,
+        'source_state': list(source_state) if source_state else None,
+        'sections': layout,
+    }).encode('utf-8')
+    metadata += b' ' * ((-len(metadata) - struct.calcsize(HEADER_FORMAT)) % 4)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, STORE_MAGIC, len(metadata)))
+        f.write(metadata)
+        for name, data in sections:
+            f.write(data)
+            f.write(b'\0' * ((-len(data)) % 4))
+    os.replace(temp_path, path)
+
+
+class _SortedKeys:
+    """映射内存中按UTF-8字节升序排列的一列键，支持二分查找和最长匹配"""
+
+    def __init__(self, data, offsets):
+        """
+        参数:
+            data (memoryview): 键数据
+            offsets (memoryview): 每个键在数据中的开始位置，最后一项为数据长度
+        """
+        self.data = data
+        self.offsets = offsets
+        self.count = len(offsets) - 1
+
+    def key(self, position):
+        """排序位置上的键（UTF-8字节）"""
+        return bytes(self.data[self.offsets[position]:self.offsets[position + 1]])
+
+    def search(self, key):
+        """二分查找第一个不小于key的排序位置"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def longest_match(self, folded, start, ends, accept=None):
+        """
+        查找从start开始、在ends中的某个位置结束的最长的键
+
+        参数:
+            folded (str): 逐字符转小写后的文本
+            start (int): 开始位置
+            ends (list): 允许的结束位置（升序）
+            accept (callable): 接受某个排序位置的判断函数，为None时接受所有键
+
+        返回:
+            tuple: (结束位置, 排序位置)，相同的键有多个时取最后一个，没有匹配时返回None
+        """
+        best = None
+        for end in ends:
+            if end <= start:
+                continue
+            candidate = folded[start:end].encode('utf-8')
+            position = self.search(candidate)
+            if position == self.count or not self.key(position).startswith(candidate):
+                # 没有以此开头的键，更长的候选也不会匹配
+                break
+            if self.key(position) == candidate:
+                last = position
+                while last + 1 < self.count and self.key(last + 1) == candidate:
+                    last += 1
+                if accept is None or accept(last):
+                    best = (end, last)
+        return best
+
+
+class CompactTermStore(Mapping):
+    """
+    内存映射的紧凑术语库
+
+    打开 compile_term_store 生成的缓存文件，所有数组直接引用映射的内存，
+    不需要解析JSON或为每个术语创建对象，数万条术语也能快速加载。
+    支持大小写不敏感的术语查找（二分查找）和文本中的最长匹配；
+    同时作为只读的 {术语: 翻译字典} 映射使用，条目在访问时才解码。
+    """
+
+    def __init__(self, path):
+        """
+        参数:
+            path (str): 缓存文件路径
+
+        异常:
+            ValueError: 文件格式无效
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header_size = struct.calcsize(HEADER_FORMAT)
+            magic, metadata_length = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+            if magic != STORE_MAGIC:
+                raise ValueError(f"不是有效的术语缓存文件: {path}")
+            metadata = json.loads(self._mmap[header_size:header_size + metadata_length])
+        except Exception:
+            self._mmap.close()
+            raise
+
+        self.count = metadata['count']
+        self.languages = metadata['languages']
+        self.language_counts = metadata['language_counts']
+        self.source_state = tuple(metadata['source_state']) if metadata['source_state'] else None
+
+        self._view = memoryview(self._mmap)
+        base = header_size + metadata_length
+        self._sections = {}
+        for name, (offset, length) in metadata['sections'].items():
+            self._sections[name] = self._view[base + offset:base + offset + length]
+
+        self._keys = self._sections['keys']
+        self._key_offsets = self._sections['keys.offsets'].cast('I')
+        self._sorted_keys = _SortedKeys(self._keys, self._key_offsets)
+        self._order = self._sections['order'].cast('I')
+        self._entries = self._sections['entries']
+        self._entry_offsets = self._sections['entries.offsets'].cast('I')
+        # {语言代码: (是否有译文, 译文偏移, 译文数据)}
+        self._language_columns = {
+            code: (self._sections[f'lang.{code}.present'],
+                   self._sections[f'lang.{code}.offsets'].cast('I'),
+                   self._sections[f'lang.{code}'])
+            for code in self.languages
+        }
+        # {语言代码: 排序后的折叠译文片段}
+        self._fragment_columns = {
+            code: _SortedKeys(self._sections[f'lang.{code}.fragments'],
+                              self._sections[f'lang.{code}.fragments.offsets'].cast('I'))
+            for code in self.languages
+        }
+
+    @staticmethod
+    def read_source_state(path):
+        """
+        读取缓存文件记录的来源文件状态，不映射整个文件
+
+        返回:
+            tuple: (修改时间, 大小)，文件无效时返回None
+        """
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(struct.calcsize(HEADER_FORMAT))
+                magic, metadata_length = struct.unpack(HEADER_FORMAT, header)
+                if magic != STORE_MAGIC:
+                    return None
+                state = json.loads(f.read(metadata_length))['source_state']
+                return tuple(state) if state else None
+        except (OSError, ValueError, struct.error, KeyError):
+            return None
+
+    def close(self):
+        """释放内存映射"""
+        views = [self._key_offsets, self._order, self._entry_offsets]
+        views += [offsets for _, offsets, _ in self._language_columns.values()]
+        views += [column.offsets for column in self._fragment_columns.values()]
+        views += list(self._sections.values())
+        for view in views:
+            view.release()
+        self._sections = {}
+        self._language_columns = {}
+        self._fragment_columns = {}
+        self._view.release()
+        self._mmap.close()
+
+    def _key(self, position):
+        """排序位置上的折叠后术语（UTF-8字节）"""
+        return self._sorted_keys.key(position)
+
+    def _search(self, key):
+        """二分查找第一个不小于key的排序位置"""
+        return self._sorted_keys.search(key)
+
+    def _find_run(self, key):
+        """
+        查找折叠后等于key的所有条目
+
+        返回:
+            tuple: (开始排序位置, 结束排序位置)，没有时两者相等
+        """
+        start = self._search(key)
+        end = start
+        while end < self.count and self._key(end) == key:
+            end += 1
+        return start, end
+
+    def _entry(self, index):
+        """按原始顺序读取条目 (术语, 翻译字典)"""
+        data = self._entries[self._entry_offsets[index]:self._entry_offsets[index + 1]]
+        term, translations = json.loads(bytes(data).decode('utf-8'))
+        return term, translations
+
+    def translation_at(self, position, lang_code):
+        """
+        读取排序位置上术语的指定语言译文
+
+        返回:
+            str: 译文，该术语没有此语言的译文时返回None
+        """
+        column = self._language_columns.get(lang_code)
+        if column is None or not column[0][position]:
+            return None
+        present, offsets, data = column
+        return bytes(data[offsets[position]:offsets[position + 1]]).decode('utf-8')
+
+    def position_of(self, term):
+        """
+        大小写不敏感地查找术语，折叠后相同的多个术语取最后一个
+
+        返回:
+            int: 排序位置，不存在时返回None
+        """
+        start, end = self._find_run(_fold(term.upper()).encode('utf-8'))
+        return end - 1 if end > start else None
+
+    def term_at(self, position):
+        """排序位置上的术语（大写形式）"""
+        return self._entry(self._order[position])[0].upper()
+
+    def longest_match(self, folded, start, boundaries, accept=None):
+        """
+        查找从start开始、在单词边界结束的最长术语
+
+        参数:
+            folded (str): 逐字符转小写后的文本
+            start (int): 开始位置（必须是单词边界）
+            boundaries (list): 文本中所有单词边界位置（升序）
+            accept (callable): 接受某个排序位置的判断函数，为None时接受所有术语
+
+        返回:
+            tuple: (结束位置, 排序位置)，没有匹配时返回None
+        """
+        return self._sorted_keys.longest_match(folded, start, boundaries, accept)
+
+    def find(self, text, accept=None, extra=None):
+        """
+        查找文本中不重叠的术语匹配，规则与AhoCorasickMatcher.find相同：
+        大小写不敏感、术语两端在单词边界上、优先选择最靠左和最长的匹配
+
+        参数:
+            text (str): 原始文本
+            accept (callable): 接受某个排序位置的判断函数
+            extra (dict): 术语库之外的候选匹配 {开始位置: (结束位置, 值)}，与术语库中的匹配一起按最长优先选择
+
+        返回:
+            list: [(开始位置, 结束位置, 排序位置或extra中的值), ...]
+        """
+        if not text or not self.count:
+            return []
+        length = len(text)
+        folded = _fold(text)
+        boundaries = [p for p in range(length + 1)
+                      if (p > 0 and _is_word_char(text[p - 1])) != (p < length and _is_word_char(text[p]))]
+        matches = []
+        last_end = 0
+        for i, start in enumerate(boundaries):
+            if start < last_end or start == length:
+                continue
+            match = self.longest_match(folded, start, boundaries[i + 1:], accept)
+            if extra and start in extra and (match is None or extra[start][0] >= match[0]):
+                match = extra[start]
+            if match:
+                matches.append((start, match[0], match[1]))
+                last_end = match[0]
+        return matches
+
+    def find_fragments(self, text, lang_code):
+        """
+        查找文本中该语言的术语译文片段，片段两端不能在单词中间，优先选择最靠左和最长的片段
+
+        参数:
+            text (str): 文本
+            lang_code (str): 规范化后的目标语言代码
+
+        返回:
+            list: [(开始位置, 结束位置), ...]
+        """
+        column = self._fragment_columns.get(lang_code)
+        if not text or column is None or not column.count:
+            return []
+        length = len(text)
+        folded = _fold(text)
+        edges = [p for p in range(length + 1)
+                 if not (0 < p < length and _is_word_char(text[p - 1]) and _is_word_char(text[p]))]
+        matches = []
+        last_end = 0
+        for i, start in enumerate(edges):
+            if start < last_end or start == length:
+                continue
+            match = column.longest_match(folded, start, edges[i + 1:])
+            if match:
+                matches.append((start, match[0]))
+                last_end = match[0]
+        return matches
+
+    # Mapping 接口：{原始术语: 翻译字典}，保持术语文件中的顺序
+
+    def __getitem__(self, term):
+        start, end = self._find_run(_fold(term.upper()).encode('utf-8'))
+        for position in range(start, end):
+            entry_term, translations = self._entry(self._order[position])
+            if entry_term == term:
+                return translations
+        raise KeyError(term)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self._entry(index)[0]
+
+    def items(self):
+        for index in range(self.count):
+            yield self._entry(index)
+
+    def __len__(self):
+        return self.count
+
+
+class EditedTermStore(Mapping):
+    """
+    紧凑术语库加上编译之后对单个术语的修改
+
+    添加、修改或删除术语时不重新编译术语库，修改记录在 edits 中覆盖术语库里的条目，
+    下次从术语文件加载时再编译为新的术语库。与 CompactTermStore 一样作为只读的 {术语: 翻译字典} 映射使用。
+    """
+
+    def __init__(self, store, edits):
+        """
+        参数:
+            store (CompactTermStore): 术语库
+            edits (dict): {术语: 翻译字典}，翻译字典为None表示删除该术语，之后不应再修改
+        """
+        self.store = store
+        self.edits = edits
+        self.path = store.path
+        languages = set(store.languages)
+        for translations in edits.values():
+            if isinstance(translations, dict):
+                languages.update(_language_codes(translations))
+        self.languages = sorted(languages)
+        self._count = len(store)
+        for term, translations in edits.items():
+            if (translations is None) == (term in store):
+                self._count += -1 if translations is None else 1
+
+    def __getitem__(self, term):
+        if term in self.edits:
+            translations = self.edits[term]
+            if translations is None:
+                raise KeyError(term)
+            return translations
+        return self.store[term]
+
+    def __iter__(self):
+        for term in self.store:
+            if self.edits.get(term, True) is not None:
+                yield term
+        for term, translations in self.edits.items():
+            if translations is not None and term not in self.store:
+                yield term
+
+    def items(self):
+        for term in self:
+            yield term, self[term]
+
+    def __len__(self):
+        return self._count
+
+
+class _StoreTranslations(Mapping):
+    """CompactTermIndex 的 {大写术语: 译文} 只读视图，与 TermIndex.translations 用法相同"""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __getitem__(self, term):
+        translation = self._index.lookup(term)
+        if translation is None:
+            raise KeyError(term)
+        return translation
+
+    def __iter__(self):
+        store = self._index.store
+        for position in range(store.count):
+            if position + 1 < store.count and store._key(position + 1) == store._key(position):
+                continue
+            if self._index._accept(position):
+                yield store.term_at(position)
+        for key, value in self._index.edits.items():
+            if value is not None:
+                yield key
+
+    def items(self):
+        for term in self:
+            yield term, self._index.lookup(term)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class CompactTermIndex:
+    """
+    基于 CompactTermStore 的单一目标语言术语索引
+
+    提供与 TermIndex 相同的只读接口（lookup、find、replace、translations），供大型术语库使用。
+    编译之后修改过的术语（EditedTermStore.edits）保存在一个小的内存索引中，优先于术语库中的条目。
+    """
+
+    def __init__(self, store, lang_code, edits=None):
+        """
+        参数:
+            store (CompactTermStore): 术语库
+            lang_code (str): 规范化后的目标语言代码
+            edits (dict): 编译之后修改过的术语 {术语: 翻译字典或None}
+        """
+        self.store = store
+        self.lang_code = lang_code
+        self.translations = _StoreTranslations(self)
+        # {大写术语: 译文}，没有当前语言的译文或已删除时为None
+        self.edits = {}
+        for term, translations in (edits or {}).items():
+            value = translations.get(lang_code) if isinstance(translations, dict) else None
+            self.edits[term.upper()] = value if isinstance(value, str) else None
+        # 被修改覆盖的术语库条目（排序位置）
+        self._excluded = set()
+        self._count = store.language_counts.get(lang_code, 0)
+        for key, value in self.edits.items():
+            position = store.position_of(key)
+            in_store = position is not None and store.translation_at(position, lang_code) is not None
+            if position is not None:
+                self._excluded.add(position)
+            self._count += (value is not None) - in_store
+        self._matcher = AhoCorasickMatcher([key for key, value in self.edits.items() if value is not None])
+        self._fragment_matcher = FragmentMatcher({_fold(fragment) for key, value in self.edits.items()
+                                                  for fragment in translation_fragments(key, value)})
+
+    def _accept(self, position):
+        """该排序位置上的术语是否有当前语言的译文（且没有被修改覆盖）"""
+        return position not in self._excluded and self.store.translation_at(position, self.lang_code) is not None
+
+    def _matches(self, text):
+        """
+        查找文本中的术语，修改过的术语与术语库中的术语一起按最长优先选择
+
+        返回:
+            list: [(开始位置, 结束位置, 排序位置或修改过的大写术语), ...]
+        """
+        extra = None
+        if self._matcher.term_count:
+            extra = {}
+            for start, end, key in self._matcher.find_all(text):
+                if start not in extra or end > extra[start][0]:
+                    extra[start] = (end, key)
+        return self.store.find(text, self._accept, extra)
+
+    def lookup(self, word):
+        """
+        查找单词对应的术语译文（大小写不敏感）
+
+        返回:
+            str: 译文，不是术语时返回None
+        """
+        key = word.upper()
+        if key in self.edits:
+            return self.edits[key]
+        position = self.store.position_of(word)
+        if position is None:
+            return None
+        return self.store.translation_at(position, self.lang_code)
+
+    def find(self, text):
+        """
+        查找文本中的术语（单词边界、大小写不敏感、最长优先）
+
+        返回:
+            list: [(开始位置, 结束位置, 大写术语), ...]
+        """
+        return [(start, end, item if isinstance(item, str) else self.store.term_at(item))
+                for start, end, item in self._matches(text)]
+
+    def replace(self, text, replace_func=None):
+        """
+        一次扫描替换文本中的术语
+
+        参数:
+            text (str): 原始文本
+            replace_func (callable): 签名为 (大写术语, 匹配到的原文) -> 替换文本，默认替换为术语译文
+
+        返回:
+            str: 替换后的文本
+        """
+        matches = self._matches(text)
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for start, end, item in matches:
+            parts.append(text[position:start])
+            if replace_func is None:
+                parts.append(self.edits[item] if isinstance(item, str) else self.store.translation_at(item, self.lang_code))
+            else:
+                term = item if isinstance(item, str) else self.store.term_at(item)
+                parts.append(replace_func(term, text[start:end]))
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def remove_translations(self, text, replacement=' '):
+        """
+        去掉文本中已经是该语言术语译文的部分，规则与 TermIndex.remove_translations 相同
+
+        译文片段在术语库中按字节排序保存，直接在映射的内存中查找，不需要解码条目。
+        编译之后修改或删除的术语，其旧译文仍在术语库的片段中，下次编译后才去掉。
+
+        参数:
+            text (str): 文本
+            replacement (str): 替换译文片段的文本
+
+        返回:
+            str: 去掉译文片段后的文本
+        """
+        if self._fragment_matcher.term_count:
+            text = self._fragment_matcher.replace(text, lambda fragment, matched_text: replacement)
+        matches = self.store.find_fragments(text, self.lang_code)
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for start, end in matches:
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def __contains__(self, word):
+        return self.lookup(word) is not None
+
+    def __len__(self):
+        return self._count
+
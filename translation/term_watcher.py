@@ -0,0 +1,89 @@
+import os
+import threading
+
+
+class TermFileWatcher:
+    """
+    术语文件监视器
+
+    在后台线程中定期检查文件的修改时间和大小，发现变化并且连续两次检查结果相同
+    （文件已经写完）后调用回调函数。使用轮询而不是系统文件通知，不依赖额外的库，
+    在所有平台上行为一致。
+    """
+
+    def __init__(self, path, callback, interval=1.0):
+        """
+        参数:
+            path (str): 要监视的文件路径
+            callback (callable): 文件变化后调用的函数，无参数
+            interval (float): 检查间隔（秒）
+        """
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._known_state = self._stat()
+        self._pending_state = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        """获取文件状态 (修改时间, 大小)，文件不存在时返回None"""
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def start(self):
+        """启动监视线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="term_file_watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止监视线程"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval * 2)
+        self._thread = None
+
+    def is_running(self):
+        """监视线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def mark_current(self):
+        """将文件当前状态记为已知状态，用于忽略程序自身保存文件引起的变化"""
+        self._known_state = self._stat()
+        self._pending_state = None
+
+    def check(self):
+        """
+        检查一次文件状态
+
+        返回:
+            bool: 是否调用了回调函数
+        """
+        state = self._stat()
+        if state is None or state == self._known_state:
+            self._pending_state = None
+            return False
+
+        # 文件刚发生变化，等待下一次检查确认已写完
+        if state != self._pending_state:
+            self._pending_state = state
+            return False
+
+        self._known_state = state
+        self._pending_state = None
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"处理术语文件变化时出错: {str(e)}")
+        return True
+
+    def _run(self):
+        """监视线程主循环"""
+        while not self._stop_event.wait(self.interval):
+            self.check()
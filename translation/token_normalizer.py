@@ -0,0 +1,226 @@
+import re
+from translation.callsign_index import get_callsign_index
+
+# 数字单词
+NUMBER_WORDS = {
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9'
+}
+
+# 字母解释法单词
+PHONETIC_LETTERS = {
+    'alpha': 'A', 'bravo': 'B', 'charlie': 'C', 'delta': 'D',
+    'echo': 'E', 'foxtrot': 'F', 'golf': 'G', 'hotel': 'H',
+    'india': 'I', 'juliet': 'J', 'kilo': 'K', 'lima': 'L',
+    'mike': 'M', 'november': 'N', 'oscar': 'O', 'papa': 'P',
+    'quebec': 'Q', 'romeo': 'R', 'sierra': 'S', 'tango': 'T',
+    'uniform': 'U', 'victor': 'V', 'whiskey': 'W', 'x-ray': 'X',
+    'yankee': 'Y', 'zulu': 'Z'
+}
+
+# 呼号中可以出现的单词（字母解释法单词和数字单词）
+CALLSIGN_WORDS = dict(PHONETIC_LETTERS, **NUMBER_WORDS)
+
+# 字母解释法单词之间的逗号会被去掉（如 "Victor, Echo"），'xray' 只用于这里的检测
+COMMA_JOINABLE_WORDS = set(PHONETIC_LETTERS) | {'xray'}
+
+# 拆分单词末尾的标点
+TRAILING_PUNCTUATION = re.compile(r'^(.*?)([,.!?;:，。！？；：]*)$', re.DOTALL)
+
+
+class _Token:
+    """分词结果：单词主体、末尾标点及小写形式"""
+
+    __slots__ = ('text', 'core', 'punct', 'lower')
+
+    def __init__(self, text):
+        self.text = text
+        core, punct = TRAILING_PUNCTUATION.match(text).groups()
+        if not core:
+            core, punct = text, ''
+        self.core = core
+        self.punct = punct
+        self.lower = core.lower()
+
+
+class TokenNormalizer:
+    """
+    单次扫描的文本规范化器
+
+    分词时合并信号报告（连续2-3个数字单词转为数字，如 "five by nine" -> "59"），
+    再用一个有限状态转换器逐个处理单词，一次完成以下规范化：
+    - 字母解释法呼号：连续2个及以上的字母解释法/数字单词转为呼号（"Bravo Golf Two" -> "BG2"），
+      去掉其间的逗号（"Victor, Echo" -> "VE"）
+    - 标准格式呼号（符合ITU呼号结构且前缀已分配）转为大写
+    - 可选：整词替换为目标语言的术语译文（与 TermManager.direct_translate 相同）
+
+    数字单词优先作为信号报告处理，因此 "bravo golf seven yankee yankee kilo five nine" 得到 "BG7YYK 59"。
+    单词末尾的标点不影响识别，转换后保留在结果末尾（"five nine." -> "59."）。
+    """
+
+    def __init__(self, callsign_index=None):
+        """
+        参数:
+            callsign_index (CallsignPrefixIndex): 呼号前缀索引，默认使用内置的ITU前缀分配表
+        """
+        self.callsign_index = callsign_index or get_callsign_index()
+
+    def normalize(self, text, signal_reports=True, phonetic_callsigns=True, term_index=None):
+        """
+        规范化文本
+
+        参数:
+            text (str): 原始文本
+            signal_reports (bool): 是否转换信号报告
+            phonetic_callsigns (bool): 是否转换字母解释法呼号和标准呼号大写
+            term_index (TermIndex): 目标语言的术语索引，提供时将整词替换为术语译文
+
+        返回:
+            str: 规范化后的文本，单词之间以单个空格分隔
+        """
+        if not text:
+            return text
+
+        tokens = self._tokenize(text, signal_reports)
+        count = len(tokens)
+        result = []
+        i = 0
+
+        while i < count:
+            token = tokens[i]
+            word = token.text
+
+            if phonetic_callsigns:
+                # 连续的字母解释法单词转为呼号
+                if token.lower in CALLSIGN_WORDS:
+                    parts, end, punct = self._callsign_run(tokens, i)
+                    if len(parts) >= 2:
+                        self._emit(result, ''.join(parts) + punct, term_index)
+                        i = end
+                        continue
+
+                # 去掉呼号片段中的逗号，标准呼号转为大写
+                if self._drops_comma(tokens, i):
+                    word = token.core
+                elif self.callsign_index.is_callsign(token.core):
+                    word = token.core.upper() + token.punct
+
+            self._emit(result, word, term_index)
+            i += 1
+
+        return ' '.join(result)
+
+    def _tokenize(self, text, signal_reports):
+        """
+        按空白分词，需要时将信号报告合并为一个数字单词
+
+        返回:
+            list: _Token列表
+        """
+        tokens = [_Token(word) for word in text.split()]
+        if not signal_reports:
+            return tokens
+
+        merged = []
+        i = 0
+        while i < len(tokens):
+            run = self._number_run(tokens, i)
+            if run:
+                digits, i = run
+                merged.append(_Token(digits))
+            else:
+                merged.append(tokens[i])
+                i += 1
+        return merged
+
+    def _emit(self, result, word, term_index):
+        """输出一个单词，需要时替换为术语译文"""
+        if term_index is not None:
+            translation = term_index.lookup(word)
+            if translation is not None:
+                word = translation
+        result.append(word)
+
+    def _number_run(self, tokens, start):
+        """
+        从start开始识别信号报告
+
+        返回:
+            tuple: (数字字符串加末尾标点, 下一个单词的位置)，不足两个数字单词时返回None
+        """
+        token = tokens[start]
+        if token.lower not in NUMBER_WORDS:
+            return None
+
+        digits = [NUMBER_WORDS[token.lower]]
+        punct = token.punct
+        j = start + 1
+        joined_by_by = False  # 上一个数字是否通过 "by" 连接，"by" 不能连续使用
+        count = len(tokens)
+
+        while not punct and j < count and len(digits) < 3:
+            current = tokens[j]
+            if (current.lower == 'by' and not current.punct and not joined_by_by
+                    and j + 1 < count and tokens[j + 1].lower in NUMBER_WORDS):
+                current = tokens[j + 1]
+                j += 1
+                joined_by_by = True
+            elif current.lower in NUMBER_WORDS:
+                joined_by_by = False
+            else:
+                break
+            digits.append(NUMBER_WORDS[current.lower])
+            punct = current.punct
+            j += 1
+
+        if len(digits) < 2:
+            return None
+        return ''.join(digits) + punct, j
+
+    def _callsign_run(self, tokens, start):
+        """
+        从start开始收集连续的呼号单词
+
+        返回:
+            tuple: (呼号字符列表, 下一个单词的位置, 末尾标点)
+        """
+        parts = []
+        j = start
+        count = len(tokens)
+        while j < count:
+            current = tokens[j]
+            if current.lower not in CALLSIGN_WORDS:
+                break
+            parts.append(CALLSIGN_WORDS[current.lower])
+            j += 1
+            if current.punct and not self._drops_comma(tokens, j - 1):
+                return parts, j, current.punct
+        return parts, j, ''
+
+    def _drops_comma(self, tokens, index):
+        """
+        判断单词末尾的逗号是否应去掉
+
+        与字母解释法呼号片段的规则一致：片段以字母解释法单词开头，由字母解释法单词或数字组成，
+        片段内单词之间的逗号被去掉，如 "Victor, Echo 5, Alpha" -> "Victor Echo 5 Alpha"。
+        """
+        token = tokens[index]
+        if token.punct != ',' or index + 1 >= len(tokens):
+            return False
+        following = tokens[index + 1]
+        if not (following.lower in COMMA_JOINABLE_WORDS or following.lower.isdigit()):
+            return False
+        return self._in_segment(tokens, index)
+
+    def _in_segment(self, tokens, index):
+        """判断单词是否位于以字母解释法单词开头的片段中"""
+        while index >= 0:
+            token = tokens[index]
+            if token.lower in COMMA_JOINABLE_WORDS:
+                return True
+            if not token.lower.isdigit() or index == 0:
+                return False
+            index -= 1
+            if tokens[index].punct not in ('', ','):
+                return False
+        return False